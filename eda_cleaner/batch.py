@@ -0,0 +1,211 @@
+"""
+batch.py
+
+Batch mode: profiles many datasets (files matching glob patterns, tables
+of a database, or the jobs listed in a manifest) in one run. The
+datasets are spread over a shared pool of warm worker processes, each
+writes its outputs to its own subdirectory, and an index of the results
+and timings of all of them is written next to the subdirectories.
+
+A manifest is a JSON list of jobs (see pipeline.py), each optionally
+with a "name" for its output subdirectory:
+    [{"csv": "a.csv", "top_k": 10}, {"db": "postgresql://...", "table": "t"}]
+
+Public Functions:
+- batch_jobs(patterns, db, tables, manifest, options): The jobs of the
+  given datasets.
+- run_batch(jobs, workers, output_root): Runs the jobs on a process pool
+  and writes the index.
+"""
+
+from .log_setup.setup import setup, logging, banner
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import glob
+import json
+import os
+import re
+import time
+from .pipeline import run_job, validate_job, warm_up
+from .governor import governed_map
+from .writer import OUTPUT_DIR
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+BATCH_OUTPUT_ROOT = OUTPUT_DIR + "/batch"
+INDEX_FIELDS = (
+    "name",
+    "source",
+    "status",
+    "seconds",
+    "rows",
+    "columns",
+    "output_dir",
+    "error",
+)
+_UNSAFE_NAME_PATTERN = re.compile(r"[^\w.-]+")
+
+
+def batch_jobs(
+    patterns: list = None,
+    db: str = None,
+    tables: list = None,
+    manifest: str = None,
+    options: dict = None,
+) -> list:
+    """
+    Collects the jobs of a batch.
+
+    Args:
+        patterns (list, optional): Glob patterns of CSV files.
+        db (str, optional): Database URI of `tables`.
+        tables (list, optional): Tables of `db`.
+        manifest (str, optional): Path of a JSON list of jobs.
+        options (dict, optional): `run_pipeline` options of every job,
+            overridden by those set in the manifest.
+
+    Returns:
+        list: The jobs, each with a unique "name".
+
+    Raises:
+        ValueError: If tables are given without a database, or a job of
+            the manifest is invalid.
+    """
+    options = options or {}
+    jobs = []
+    for pattern in patterns or []:
+        files = sorted(glob.glob(pattern, recursive=True))
+        if not files:
+            logger.warning("No files match %s", pattern)
+        jobs.extend({**options, "csv": path} for path in files)
+    if tables:
+        if not db:
+            raise ValueError("Tables need a database URI")
+        jobs.extend(
+            {**options, "db": db, "table": table} for table in tables
+        )
+    if manifest:
+        with open(manifest) as f:
+            jobs.extend({**options, **job} for job in json.load(f))
+
+    names = set()
+    for job in jobs:
+        validate_job(job)
+        name = _output_name(job)
+        unique, n = name, 1
+        while unique in names:
+            n += 1
+            unique = f"{name}_{n}"
+        names.add(unique)
+        job["name"] = unique
+    return jobs
+
+
+def run_batch(
+    jobs: list, workers: int = None, output_root: str = None
+) -> list:
+    """
+    Runs the jobs on a shared process pool, each writing its outputs to
+    `output_root/<name>/`, and writes the index of the batch to
+    `output_root/index.json` and `output_root/index.csv`.
+
+    Args:
+        jobs (list): Jobs from `batch_jobs`.
+        workers (int, optional): Worker processes. Defaults to the number
+            of CPUs.
+        output_root (str, optional): Defaults to BATCH_OUTPUT_ROOT.
+
+    Returns:
+        list: The index entries (INDEX_FIELDS), in the order of the jobs.
+            A failed job is reported there, it does not stop the batch.
+    """
+    output_root = output_root or BATCH_OUTPUT_ROOT
+    os.makedirs(output_root, exist_ok=True)
+    banner()
+    logger.info("Running a batch of %s datasets", len(jobs))
+    banner()
+
+    start = time.perf_counter()
+    workers = workers or os.cpu_count()
+    output_dirs = [
+        os.path.join(output_root, job["name"]) for job in jobs
+    ]
+    entries = []
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=warm_up
+    ) as pool:
+        # fewer datasets at a time under memory pressure, see governor.py
+        results = governed_map(
+            pool,
+            _timed_job,
+            jobs,
+            output_dirs,
+            [output_root] * len(jobs),
+            max_workers=workers,
+        )
+        for job, output_dir, result in zip(jobs, output_dirs, results):
+            entry = {
+                "name": job["name"],
+                "source": job.get("csv") or job.get("table"),
+                "output_dir": output_dir,
+                **result,
+            }
+            entries.append(entry)
+            logger.info(
+                "%s/%s %s: %s in %ss",
+                len(entries),
+                len(jobs),
+                entry["name"],
+                entry["status"],
+                entry["seconds"],
+            )
+
+    with open(os.path.join(output_root, "index.json"), "w") as f:
+        json.dump(entries, f, indent=4, default=str)
+    with open(
+        os.path.join(output_root, "index.csv"), "w", newline=""
+    ) as f:
+        table = csv.DictWriter(
+            f, fieldnames=INDEX_FIELDS, extrasaction="ignore"
+        )
+        table.writeheader()
+        table.writerows(entries)
+
+    failed = sum(entry["status"] == "failed" for entry in entries)
+    logger.info(
+        "Batch finished in %.2fs, %s done, %s failed",
+        time.perf_counter() - start,
+        len(entries) - failed,
+        failed,
+    )
+    return entries
+
+
+def _timed_job(job: dict, output_dir: str, cache_dir: str) -> dict:
+    """Runs a job in a worker, reporting a failure instead of raising."""
+    start = time.perf_counter()
+    try:
+        result = run_job(job, output_dir, cache_dir)
+    except Exception as e:
+        logger.error("%s failed: %s", job["name"], e)
+        result = {
+            "status": "failed",
+            "error": f"{type(e).__name__}: {e}",
+        }
+    else:
+        result["status"] = "done"
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _output_name(job: dict) -> str:
+    """Subdirectory name of a job: its name, file name or table name."""
+    name = job.get("name") or (
+        os.path.basename(job["csv"]).split(".")[0]
+        if "csv" in job
+        else job["table"]
+    )
+    return (
+        _UNSAFE_NAME_PATTERN.sub("_", str(name)).strip(".") or "dataset"
+    )
@@ -0,0 +1,207 @@
+"""
+catalog.py
+
+Whole-schema PostgreSQL profiling. The tables of a schema, their
+estimated row counts and sizes are read from the system catalog
+(`pg_class`), and the planner statistics of their columns (`pg_stats`:
+null fraction, number of distinct values, average width) give a first
+summary of every table before any row is read. The tables are then
+profiled concurrently, largest first, by the worker processes of the
+batch mode, each reusing its pooled database connections from table to
+table.
+
+Public Functions:
+- pg_tables(uri, schema): Tables of a schema with estimated rows and sizes.
+- pg_column_stats(uri, schema): Catalog statistics of the columns of a
+  schema.
+- catalog_summary(tables, column_stats): First-pass summary of the tables
+  from the catalog.
+- profile_schema(uri, schema, workers, output_root, options): Profiles
+  every table of a schema.
+"""
+
+from .log_setup.setup import setup, logging, banner
+from sqlalchemy import text
+import json
+import os
+from .batch import batch_jobs, run_batch
+from .loader import sql_engine
+from .writer import OUTPUT_DIR
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+SCHEMA_OUTPUT_ROOT = OUTPUT_DIR + "/schema"
+# ordinary and partitioned tables, partitions are read through their parent
+_TABLES_QUERY = """
+SELECT c.relname AS table_name,
+       CASE WHEN c.reltuples < 0 THEN NULL
+            ELSE c.reltuples::bigint END AS estimated_rows,
+       pg_total_relation_size(c.oid) AS total_bytes
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = :schema
+  AND c.relkind IN ('r', 'p')
+  AND NOT c.relispartition
+ORDER BY total_bytes DESC, c.relname
+"""
+# own statistics first, then those including child tables
+_COLUMN_STATS_QUERY = """
+SELECT c.table_name, c.column_name, c.data_type,
+       s.null_frac, s.n_distinct, s.avg_width
+FROM information_schema.columns c
+LEFT JOIN pg_stats s
+  ON s.schemaname = c.table_schema
+ AND s.tablename = c.table_name
+ AND s.attname = c.column_name
+WHERE c.table_schema = :schema
+ORDER BY c.table_name, c.ordinal_position, s.inherited
+"""
+
+
+def pg_tables(uri: str, schema: str = "public") -> list:
+    """
+    Lists the tables of a schema from `pg_class`, largest first.
+
+    Returns:
+        list: Dicts of 'table_name', 'estimated_rows' (None if the table
+        was never analyzed) and 'total_bytes'.
+    """
+    with sql_engine(uri).connect() as conn:
+        rows = conn.execute(text(_TABLES_QUERY), {"schema": schema})
+        return [dict(row._mapping) for row in rows]
+
+
+def pg_column_stats(uri: str, schema: str = "public") -> dict:
+    """
+    Reads the planner statistics of every column of a schema.
+
+    Returns:
+        dict: Table names mapped to lists of dicts of 'column_name',
+        'data_type', 'null_frac', 'n_distinct' and 'avg_width' (None for
+        columns without statistics), in column order.
+    """
+    stats = {}
+    with sql_engine(uri).connect() as conn:
+        rows = conn.execute(
+            text(_COLUMN_STATS_QUERY), {"schema": schema}
+        )
+        for row in rows:
+            columns = stats.setdefault(row.table_name, [])
+            if (
+                columns
+                and columns[-1]["column_name"] == row.column_name
+            ):
+                continue
+            columns.append(
+                {
+                    k: v
+                    for k, v in row._mapping.items()
+                    if k != "table_name"
+                }
+            )
+    return stats
+
+
+def catalog_summary(tables: list, column_stats: dict) -> dict:
+    """
+    Builds a summary of every table from the catalog alone.
+
+    Args:
+        tables (list): Output of `pg_tables`.
+        column_stats (dict): Output of `pg_column_stats`.
+
+    Returns:
+        dict: Table names mapped to summaries shaped like those of
+        `generate_summary`: a '_dataset_' entry with the estimated rows and
+        size, and per column its SQL type, 'null_frac', 'missing_estimate',
+        'n_unique_estimate' and 'avg_width'. Estimates are None when the
+        table has no statistics yet (run ANALYZE).
+    """
+    summary = {}
+    for table in tables:
+        name, rows = table["table_name"], table["estimated_rows"]
+        columns = column_stats.get(name, [])
+        table_summary = {
+            "_dataset_": {
+                "estimated_rows": rows,
+                "total_bytes": table["total_bytes"],
+                "n_columns": len(columns),
+            }
+        }
+        for column in columns:
+            null_frac = column["null_frac"]
+            table_summary[column["column_name"]] = {
+                "dtype": column["data_type"],
+                "null_frac": null_frac,
+                "missing_estimate": (
+                    round(null_frac * rows)
+                    if null_frac is not None and rows is not None
+                    else None
+                ),
+                "n_unique_estimate": _distinct_estimate(
+                    column["n_distinct"], rows
+                ),
+                "avg_width": column["avg_width"],
+            }
+        summary[name] = table_summary
+    return summary
+
+
+def profile_schema(
+    uri: str,
+    schema: str = "public",
+    workers: int = None,
+    output_root: str = None,
+    options: dict = None,
+) -> list:
+    """
+    Profiles every table of a schema without prompting for table names.
+
+    The catalog summary of all tables is written first, to
+    `output_root/catalog.json`. Then every table is profiled by `run_batch`
+    into `output_root/<table>/`, largest tables first so the long ones do
+    not end up last, with the index of the batch in `output_root`.
+
+    Args:
+        uri (str): SQLAlchemy URI of the PostgreSQL database.
+        schema (str): Schema to profile.
+        workers (int, optional): Tables profiled at the same time.
+        output_root (str, optional): Defaults to SCHEMA_OUTPUT_ROOT.
+        options (dict, optional): `run_pipeline` options of every table.
+
+    Returns:
+        list: The index entries of the tables, see `run_batch`.
+    """
+    output_root = output_root or SCHEMA_OUTPUT_ROOT
+    os.makedirs(output_root, exist_ok=True)
+    banner()
+    logger.info("Reading the catalog of schema '%s'", schema)
+    tables = pg_tables(uri, schema)
+    if not tables:
+        logger.warning("No tables in schema '%s'", schema)
+        return []
+    summary = catalog_summary(tables, pg_column_stats(uri, schema))
+    with open(os.path.join(output_root, "catalog.json"), "w") as f:
+        json.dump(summary, f, indent=4, default=str)
+    logger.info(
+        "Saved the catalog summary of %s tables, ~%s rows",
+        len(tables),
+        sum(t["estimated_rows"] or 0 for t in tables),
+    )
+
+    jobs = batch_jobs(
+        db=uri,
+        tables=[table["table_name"] for table in tables],
+        options={**(options or {}), "schema": schema},
+    )
+    return run_batch(jobs, workers, output_root)
+
+
+def _distinct_estimate(n_distinct, rows):
+    """pg_stats stores distinct counts above 10% of rows as -fraction."""
+    if n_distinct is None:
+        return None
+    if n_distinct >= 0:
+        return round(n_distinct)
+    return round(-n_distinct * rows) if rows is not None else None
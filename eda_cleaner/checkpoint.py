@@ -0,0 +1,266 @@
+"""
+checkpoint.py
+
+Stage checkpoints of a pipeline run, so that a run that died part way
+can be resumed instead of starting over from loading the dataset. Every
+stage records its completion in a manifest as soon as it finishes; the
+cleaned DataFrame is kept as Parquet (as a pickle without pyarrow) and
+the summary as JSON, which is all the later stages need.
+
+The manifest also holds a fingerprint of the input (path, size and
+modification time of a CSV file; the database URI, schema and table,
+with the row change counters PostgreSQL keeps for the table) and of the
+options of the run. A run is only resumed if both are unchanged.
+
+Layout, in `<output_dir>/checkpoint/`:
+    manifest.json   fingerprint, options and the finished stages
+    clean.parquet   the cleaned DataFrame (or clean.pkl)
+    summary.json    the summary
+
+Public Functions:
+- open_checkpoint(output_dir, source, options, resume): Starts a new
+  checkpoint, or reopens the one of an interrupted run.
+- stage_done(checkpoint, stage): Whether a stage already finished.
+- mark_done(checkpoint, stage, **details): Records a finished stage.
+- save_frame(checkpoint, df) / load_frame(checkpoint): The cleaned
+  DataFrame.
+- save_summary(checkpoint, summary) / load_summary(checkpoint): The
+  summary.
+"""
+
+from .log_setup.setup import setup, logging
+from .loader import sql_engine
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+try:
+    import pyarrow  # noqa: F401
+
+    FRAME_FORMAT = "parquet"
+except ImportError:
+    FRAME_FORMAT = "pickle"
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+CHECKPOINT_DIR = "checkpoint"
+MANIFEST_FILE = "manifest.json"
+SUMMARY_FILE = "summary.json"
+# bumped when the layout changes, older checkpoints are not resumed
+MANIFEST_VERSION = 1
+# changes to the rows of a table: inserts, updates and deletes counted by
+# the statistics collector, and the file node replaced by TRUNCATE
+_TABLE_VERSION_QUERY = """
+SELECT s.n_tup_ins, s.n_tup_upd, s.n_tup_del, c.relfilenode
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_stat_all_tables s ON s.relid = c.oid
+WHERE c.relname = :table
+  AND n.nspname = COALESCE(:schema, current_schema())
+"""
+
+
+def open_checkpoint(
+    output_dir: str, source: dict, options: dict, resume: bool = False
+) -> dict:
+    """
+    Opens the checkpoint of a run.
+
+    Args:
+        output_dir (str): Output directory of the run.
+        source (dict): The input, {"csv": path} or {"db": uri,
+            "table": name, "schema": name (optional)}.
+        options (dict): The `run_pipeline` options of the run.
+        resume (bool): Reopen the checkpoint of a previous run with the
+            same input and options. Otherwise, or if there is none, any
+            previous checkpoint is discarded.
+
+    Returns:
+        dict: The manifest, with the 'dir' of the checkpoint.
+
+    Raises:
+        ValueError: If resuming, when the input or the options changed
+            since the checkpoint was written.
+    """
+    # compared with the options of the manifest, as read back from JSON
+    options = json.loads(json.dumps(options, default=str))
+    directory = os.path.join(output_dir, CHECKPOINT_DIR)
+    fingerprint = _fingerprint(source, options)
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+
+    if resume and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(
+                "The checkpoint was written by another version, "
+                "rerun without --resume"
+            )
+        if manifest["fingerprint"] != fingerprint:
+            changed = sorted(
+                key
+                for key in set(options) | set(manifest["options"])
+                if manifest["options"].get(key) != options.get(key)
+            )
+            raise ValueError(
+                f"Options changed since the checkpoint: {', '.join(changed)}"
+                if changed
+                else "The input changed since the checkpoint"
+            )
+        manifest["dir"] = directory
+        logger.info(
+            "Resuming, stages already done: %s",
+            ", ".join(manifest["stages"]) or "none",
+        )
+        return manifest
+    if resume:
+        logger.warning("No checkpoint to resume from, starting over")
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "fingerprint": fingerprint,
+        "source": _describe(source),
+        "options": options,
+        "stages": {},
+        "dir": directory,
+    }
+    _write_manifest(manifest)
+    return manifest
+
+
+def stage_done(checkpoint: dict, stage: str) -> bool:
+    """Whether `stage` finished in the run of the checkpoint."""
+    return stage in checkpoint["stages"]
+
+
+def mark_done(checkpoint: dict, stage: str, **details) -> None:
+    """Records that `stage` finished, with any JSON-able details."""
+    checkpoint["stages"][stage] = {
+        "finished": datetime.datetime.now().isoformat(
+            timespec="seconds"
+        ),
+        **details,
+    }
+    _write_manifest(checkpoint)
+
+
+def save_frame(checkpoint: dict, df: pd.DataFrame) -> None:
+    """Keeps the cleaned DataFrame and marks the 'clean' stage done."""
+    path = os.path.join(checkpoint["dir"], "clean")
+    if FRAME_FORMAT == "parquet":
+        try:
+            df.to_parquet(path + ".parquet")
+            path += ".parquet"
+        except Exception:
+            # mixed-type object columns are not representable in Arrow
+            pass
+    if not path.endswith(".parquet"):
+        path += ".pkl"
+        df.to_pickle(path)
+    # reports of the cleaning steps, not kept by Parquet
+    mark_done(
+        checkpoint,
+        "clean",
+        path=os.path.basename(path),
+        attrs=json.loads(json.dumps(df.attrs, default=str)),
+    )
+
+
+def load_frame(checkpoint: dict) -> pd.DataFrame:
+    """The cleaned DataFrame kept by `save_frame`."""
+    clean = checkpoint["stages"]["clean"]
+    path = os.path.join(checkpoint["dir"], clean["path"])
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_pickle(path)
+    df.attrs.update(clean["attrs"])
+    logger.info("Loaded the cleaned dataset from %s", path)
+    return df
+
+
+def save_summary(checkpoint: dict, summary: dict) -> None:
+    """Keeps the summary and marks the 'summary' stage done."""
+    with open(os.path.join(checkpoint["dir"], SUMMARY_FILE), "w") as f:
+        json.dump(summary, f, default=str)
+    mark_done(checkpoint, "summary")
+
+
+def load_summary(checkpoint: dict) -> dict:
+    """The summary kept by `save_summary`."""
+    with open(os.path.join(checkpoint["dir"], SUMMARY_FILE)) as f:
+        return json.load(f)
+
+
+def _fingerprint(source: dict, options: dict) -> str:
+    """Hash of the input and the options of a run."""
+    if "csv" in source:
+        stat = os.stat(source["csv"])
+        identity = {
+            "csv": os.path.abspath(source["csv"]),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+    else:
+        identity = {
+            "db": source["db"],
+            "table": source["table"],
+            "schema": source.get("schema"),
+            "version": _table_version(source),
+        }
+    data = json.dumps(
+        {"source": identity, "options": options},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _table_version(source: dict) -> list:
+    """
+    Change counters of the table of a database input, None when they
+    cannot be read (e.g. not PostgreSQL), then only its name counts.
+    """
+    try:
+        with sql_engine(source["db"]).connect() as conn:
+            row = conn.execute(
+                text(_TABLE_VERSION_QUERY),
+                {
+                    "table": source["table"],
+                    "schema": source.get("schema"),
+                },
+            ).first()
+    except Exception as e:
+        logger.debug("No change counters of the table: %s", e)
+        return None
+    return None if row is None else list(row)
+
+
+def _describe(source: dict) -> dict:
+    """The input as written to the manifest, without passwords."""
+    if "db" in source:
+        return {
+            "db": make_url(source["db"]).render_as_string(
+                hide_password=True
+            ),
+            "table": source["table"],
+            "schema": source.get("schema"),
+        }
+    return {"csv": os.path.abspath(source["csv"])}
+
+
+def _write_manifest(checkpoint: dict) -> None:
+    """Replaces the manifest in one step, a crash never leaves half of it."""
+    path = os.path.join(checkpoint["dir"], MANIFEST_FILE)
+    manifest = {k: v for k, v in checkpoint.items() if k != "dir"}
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=4, default=str)
+    os.replace(path + ".tmp", path)
@@ -7,20 +7,53 @@ Includes:
 - Column name standardization
 - Duplicate row removal
 - Type coercion (booleans, IDs, numerics, dates)
+- Recovery of numbers stored as text
 - Missing value handling (dropping or imputation)
 """
 
+import numpy as np
 import pandas as pd
-from .log_setup.setup import setup, logging
+from .log_setup.setup import setup, logging, banner
 import re
 import pandas.api.types as pd_types
-
+from .external import external_remove_duplicates
+from .engines import get_engine
+from .dates import parse_datetimes
+from .kernels import column_stats
 
 logger = logging.getLogger(__name__)
 setup(logger)
 
-
-def clean_pipeline(df: pd.DataFrame) -> pd.DataFrame:
+# compiled once, these are applied to every column name / value
+_ID_COLUMN_PATTERN = re.compile(
+    r"(?:(?:(?<=_)|^)id(?=_))|.*id$", re.IGNORECASE
+)
+# nullable integer dtypes tried by downcast_types, keyed by "min >= 0"
+_INTEGER_WIDTHS = {
+    True: ("UInt8", "UInt16", "UInt32", "UInt64"),
+    False: ("Int8", "Int16", "Int32", "Int64"),
+}
+# index types that support the .str accessor
+_STRING_INDEX_TYPES = {"string", "mixed", "mixed-integer"}
+# renames listed individually in the standardization log record
+_MAX_LOGGED_RENAMES = 20
+# values checked before a string column is parsed as numbers
+_NUMERIC_SAMPLE_SIZE = 1000
+# zero-padded codes (zip codes, account numbers) are kept as text
+_ZERO_PADDED_PATTERN = re.compile(r"\s*0\d+\s*")
+# share of the values that must be numbers to recover a column
+_NUMERIC_MIN_RATE = 0.99
+
+
+def clean_pipeline(
+    df: pd.DataFrame,
+    dedup_memory=None,
+    dedup_workers: int = 1,
+    engine: str = "pandas",
+    downcast: bool = False,
+    category_ratio: float = 0.5,
+    recover_numbers: bool = True,
+) -> pd.DataFrame:
     """
     Main orchestration function for the cleaning pipeline.
 
@@ -28,29 +61,50 @@ def clean_pipeline(df: pd.DataFrame) -> pd.DataFrame:
     1. Standardize column names (e.g., lowercase, snake_case)
     2. Remove exact duplicate rows
     3. Coerce nullable data types on columns
-    4. Coerce eda types data types on columns
-    5. Handle missing values (drop columns with >50% missing, impute others)
+    4. Optionally, convert numbers stored as text to numeric columns
+    5. Coerce eda types data types on columns
+    6. Handle missing values (drop columns with >50% missing, impute others)
+    7. Optionally, downcast columns to their smallest safe dtype
 
     Parameters:
         df (pd.DataFrame): The input DataFrame to be cleaned.
+        dedup_memory (int or str, optional): Memory budget for duplicate
+            removal (e.g. '4G'). When set, duplicates are removed
+            out-of-core by spilling hash buckets to disk.
+        dedup_workers (int): Processes used for out-of-core duplicate
+            removal.
+        engine (str): Compute engine for name normalization and type
+            inference, 'pandas' or 'arrow' (see engines/).
+        downcast (bool): Whether to run `downcast_types` last.
+        category_ratio (float): Distinct/non-null ratio under which
+            `downcast_types` turns string columns into categories.
+        recover_numbers (bool): Whether to run `recover_numeric_strings`.
 
     Returns:
         pd.DataFrame: The cleaned DataFrame.
     """
-    print("*" * 90)
-    df = standardize_column_names(df)
-    print("*" * 90)
-    df = remove_duplicates(df)
-    print("*" * 90)
-    df = coerce_nullable_data_types(df)
-    print("*" * 90)
+    banner()
+    df = standardize_column_names(df, engine)
+    banner()
+    df = remove_duplicates(df, dedup_memory, dedup_workers)
+    banner()
+    df = coerce_nullable_data_types(df, engine)
+    banner()
+    if recover_numbers:
+        df = recover_numeric_strings(df, engine)
+        banner()
     df = coerce_eda_types(df)
-    print("*" * 90)
+    banner()
     df = handle_missing_values(df)
+    if downcast:
+        banner()
+        df = downcast_types(df, category_ratio)
     return df
 
 
-def standardize_column_names(df: pd.DataFrame) -> pd.DataFrame:
+def standardize_column_names(
+    df: pd.DataFrame, engine: str = "pandas"
+) -> pd.DataFrame:
     """
     Standardizes DataFrame column names by:
     - Removing leading/trailing whitespace
@@ -62,41 +116,50 @@ def standardize_column_names(df: pd.DataFrame) -> pd.DataFrame:
 
     Parameters:
         df (pd.DataFrame): The input DataFrame.
+        engine (str): Compute engine performing the string operations.
 
     Returns:
         pd.DataFrame: DataFrame with standardized column names.
     """
     logger.info("Standardizing column names")
-    print("*" * 90)
+    banner()
     if df.iloc[:, 0].name.startswith("Unnamed"):
         logger.info("Removing pandas index column")
         df = df.iloc[:, 1:]
         logger.info("Index column removed")
 
     columns_nr = df.shape[1]
-    logger.info(f"Found {columns_nr} columns")
+    logger.info("Found %s columns", columns_nr)
     logger.info(
         "replacing whitespaces with '_', lowering case, and removing invalid characters"
     )
-    original_columns = df.columns.to_list()
-    df.columns = (
-        df.columns.str.strip()
-        .str.lower()
-        .str.replace(r"[ -]", "_", regex=True)
-        .str.replace(r"[^\w]", "", regex=True)
+    original_columns = df.columns
+    df.columns = get_engine(engine).normalize_column_names(df.columns)
+    changed = original_columns != df.columns
+    renames = [
+        f"{original_col} -> {new_col}"
+        for original_col, new_col in zip(
+            original_columns[changed][:_MAX_LOGGED_RENAMES],
+            df.columns[changed][:_MAX_LOGGED_RENAMES],
+        )
+    ]
+    if changed.sum() > _MAX_LOGGED_RENAMES:
+        renames.append(
+            f"and {changed.sum() - _MAX_LOGGED_RENAMES} more"
+        )
+    logger.info(
+        "%d of %d column names changed%s",
+        changed.sum(),
+        columns_nr,
+        ": " + ", ".join(renames) if renames else "",
     )
-    for original_col, new_col in zip(
-        original_columns, df.columns.to_list()
-    ):
-        if original_col == new_col:
-            logger.info(f"{original_col} remained unchanged")
-        else:
-            logger.info(f"{original_col} changed to {new_col}")
     logger.info("Finished standardizing column names")
     return df
 
 
-def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+def remove_duplicates(
+    df: pd.DataFrame, memory_budget=None, workers: int = 1
+) -> pd.DataFrame:
     """
     Function that removes duplicate rows, but also removes a row by following the procedure below:
     (Rest is deprecated)
@@ -104,28 +167,46 @@ def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     2) Check for duplication, excluding the 'id' columns in the subset
     3) Remove duplication, keep in the first occurrence.
     In any case we are removing duplicates with the 'keep-first' strategy
+
+    If `memory_budget` is given (bytes or a size such as '4G'), rows are
+    hash partitioned into on-disk buckets that are deduplicated one at a
+    time, by `workers` processes (see external.py). Frames loaded by
+    `external.external_dedup_csv` are returned as they are.
     """
     logger.info("Removing duplicate rows")
-    print("*" * 90)
-    logger.info(f"{df.shape[0]} rows before operation")
+    banner()
+    if "deduplicated" in df.attrs:
+        logger.info(
+            "%d duplicate rows were removed while loading",
+            df.attrs["deduplicated"],
+        )
+        return df
+    logger.info("%s rows before operation", df.shape[0])
     logger.info("Removing...")
     try:
-        no_dup_df = df.drop_duplicates(keep="first")
+        if memory_budget is not None:
+            no_dup_df = external_remove_duplicates(
+                df, memory_budget, workers=workers
+            )
+        else:
+            no_dup_df = df.drop_duplicates(keep="first")
     except TypeError:
         logger.error(
             "Dataset contains unhashable type columns, cannot remove rows based on full row duplication."
         )
         no_dup_df = df
 
-    logger.info(f"{df.shape[0] - no_dup_df.shape[0]} rows removed")
-    logger.info(f"{no_dup_df.shape[0]} rows remaining.")
-    logger.info(f"Finished removing duplicate rows")
+    logger.info("%s rows removed", df.shape[0] - no_dup_df.shape[0])
+    logger.info("%s rows remaining.", no_dup_df.shape[0])
+    logger.info("Finished removing duplicate rows")
     return no_dup_df
 
 
 # will rename to coerce nullable data types
 # This one is done for compatibility
-def coerce_nullable_data_types(df: pd.DataFrame) -> pd.DataFrame:
+def coerce_nullable_data_types(
+    df: pd.DataFrame, engine: str = "pandas"
+) -> pd.DataFrame:
     """
     Processes column series, and applies casts them to the appropriate
     pandas nullable data type.
@@ -133,16 +214,18 @@ def coerce_nullable_data_types(df: pd.DataFrame) -> pd.DataFrame:
 
     Parameters:
         df (pd.DataFrame): The source Dataframe
+        engine (str): Compute engine inferring the column types.
 
     Returns:
         df (pd.DataFrame): The source dataframe with updated
         column series
     """
     logger.info("Converting columns to nullable data types")
-    print("*" * 90)
+    banner()
+    infer_kind = get_engine(engine).infer_kind
     nullable_df = pd.DataFrame()
     for col in df.columns:
-        logger.info(f"Processing column {col}")
+        logger.debug("Processing column %s", col)
         series = df[col]
         non_null_series = series.dropna()
 
@@ -151,39 +234,118 @@ def coerce_nullable_data_types(df: pd.DataFrame) -> pd.DataFrame:
             nullable_df[col] = series.astype("object")
             continue
 
-        inferred_dtype = pd.api.types.infer_dtype(
-            non_null_series, skipna=True
-        )
+        inferred_dtype = infer_kind(non_null_series)
 
         # Map inferred dtype to a pandas nullable type
         if inferred_dtype in {"integer"}:
             nullable_df[col] = series.astype("Int64")
-            logger.info(f"Changed {col} to Int64")
         elif inferred_dtype in {"floating"}:
             try:
                 nullable_df[col] = series.astype("Int64")
-                logger.info(f"Changed {col} to Int64")
             except:
                 nullable_df[col] = series.astype("Float64")
-                logger.info(f"Changed {col} to Float64")
         elif inferred_dtype in {"boolean"}:
             nullable_df[col] = series.astype("boolean")
-            logger.info(f"Changed {col} to boolean")
         elif inferred_dtype in {"string", "unicode", "datetime"}:
             try:
-                nullable_df[col] = series.astype("datetime64[ns]")
-                logger.info(f"Changed {col} to datetime64[ns]")
-            except:
+                nullable_df[col] = parse_datetimes(series, column=col)
+            except ValueError:
                 nullable_df[col] = series.astype("string")
-                logger.info(f"Changed {col} to string")
         else:
             nullable_df[col] = series.astype("object")
-            logger.info(f"Changed {col} to object")
+        logger.debug("Changed %s to %s", col, nullable_df[col].dtype)
 
+    logger.info("Column types: %s", _dtype_counts(nullable_df.dtypes))
     logger.info("Finished converting columns to nullable data types")
     return nullable_df
 
 
+def recover_numeric_strings(
+    df: pd.DataFrame,
+    engine: str = "pandas",
+    min_rate: float = _NUMERIC_MIN_RATE,
+) -> pd.DataFrame:
+    """
+    Converts string columns holding numbers written as text, such as
+    "1,234", "$5.00", "12%" or " 42 ", to Int64 or Float64 (percentages
+    are divided by 100).
+
+    A sample of every string column is parsed first, so text columns are
+    skipped after a few values; the others are parsed whole with
+    vectorized string operations. Values that are not numbers become
+    missing. The share of converted values is logged and stored in
+    `df.attrs["numeric_recovery"]`.
+
+    Parameters:
+        df (pd.DataFrame): The DataFrame with nullable dtypes.
+        engine (str): Compute engine parsing the text, 'pandas' or
+            'arrow'.
+        min_rate (float): Minimum share of the non-null values that must
+            be numbers for a column to be converted.
+
+    Returns:
+        pd.DataFrame: The DataFrame with the recovered numeric columns.
+    """
+    logger.info("Recovering numbers stored as text")
+    banner()
+    parse = get_engine(engine).parse_numeric_text
+    report = {}
+    id_like_names = _id_column_mask(df.columns)
+    for col, id_like_name in zip(df.columns, id_like_names):
+        series = df[col]
+        if id_like_name or series.dtype.name not in {"string"}:
+            continue
+        recovered = _recover_column(series, parse, min_rate)
+        if recovered is None:
+            continue
+        df[col], rate = recovered
+        report[col] = {
+            "dtype": df[col].dtype.name,
+            "conversion_rate": round(float(rate), 4),
+        }
+        logger.debug(
+            "Changed %s from string to %s, %.2f%% of values converted",
+            col,
+            df[col].dtype,
+            rate * 100,
+        )
+    if report:
+        df.attrs["numeric_recovery"] = report
+    logger.info("Recovered %d columns of numbers as text", len(report))
+    logger.info("Finished recovering numbers stored as text")
+    return df
+
+
+def _recover_column(series: pd.Series, parse, min_rate: float):
+    """
+    The numbers of a string column, as Int64 or Float64, and the share of
+    its non-null values they hold, or None when it does not hold numbers.
+    """
+    non_null = series.dropna()
+    if non_null.empty:
+        return None
+    positions = np.linspace(
+        0,
+        len(non_null) - 1,
+        min(len(non_null), _NUMERIC_SAMPLE_SIZE),
+    )
+    sample = non_null.iloc[positions.astype(int)]
+    if (
+        sample.str.fullmatch(_ZERO_PADDED_PATTERN).any()
+        or parse(sample).notna().mean() < min_rate
+    ):
+        return None
+
+    values = parse(series)
+    rate = values.notna().sum() / len(non_null)
+    if rate < min_rate:
+        return None
+    try:
+        return values.astype("Int64"), rate
+    except (TypeError, ValueError):
+        return values.astype("Float64"), rate
+
+
 def coerce_eda_types(df: pd.DataFrame) -> pd.DataFrame:
     """
     Processes column series, and  casts them to a type more suitable
@@ -198,21 +360,31 @@ def coerce_eda_types(df: pd.DataFrame) -> pd.DataFrame:
         column series.
     """
     logger.info("Converting columns to EDA-ready nullable types")
-    print("*" * 90)
-    for col in df.columns:
-        logger.info(f"Processing column {col}")
+    banner()
+    id_like_names = _id_column_mask(df.columns)
+    changed = []
+    for col, id_like_name in zip(df.columns, id_like_names):
+        logger.debug("Processing column %s", col)
         series = df[col]
-        if _is_id_column(series):
+        if id_like_name and pd_types.is_numeric_dtype(series):
             df[col] = series.astype("string")
-            logger.info(f"Changed {col} from numeric to string")
+            logger.debug("Changed %s from numeric to string", col)
         elif _is_binary_string(series):
             df[col] = _validate_binary_col(series)
         elif _is_numeric_boolean(series):
             df[col] = series.astype("boolean")
-            logger.info(f"Changed {col} from numeric to boolean")
+            logger.debug("Changed %s from numeric to boolean", col)
         elif _is_categorical(series):
             df[col] = series.astype("category")
-            logger.info(f"Changed {col} to category data type")
+            logger.debug("Changed %s to category data type", col)
+        else:
+            continue
+        changed.append(col)
+    logger.info(
+        "Changed %d columns, to %s",
+        len(changed),
+        _dtype_counts(df.dtypes[changed]),
+    )
     logger.info(
         "Finished converting columns to RDA-ready nullable types"
     )
@@ -240,43 +412,207 @@ def handle_missing_values(
         pd.DataFrame: The DataFrame with missing values either dropped or imputed.
     """
     logger.info("Handling missing Values")
-    print("*" * 90)
+    banner()
+    dropped, imputed = [], []
     for column in df.columns:
-        missing_values_prc = df[column].isnull().mean() * 100
-        if missing_values_prc == 0:
-            logger.info(
-                f"{df[column].name} column has none of its values missing, skipping"
-            )
-            continue
+        action, series = _handle_missing(df[column])
+        if action == "dropped":
+            df = df.drop(column, axis=1)
+            dropped.append(column)
+        elif action == "imputed":
+            df[column] = series
+            imputed.append(column)
+    logger.info(
+        "Dropped %d columns with most values missing, imputed %d",
+        len(dropped),
+        len(imputed),
+    )
+    if dropped:
         logger.info(
-            f"{df[column].name} column has {round(missing_values_prc)}% of its values missing"
+            "Dropped: %s",
+            ", ".join(map(str, dropped[:_MAX_LOGGED_RENAMES])),
         )
-        if missing_values_prc >= 50:
-            logger.info(f"Dropping column {df[column].name}")
-            df = df.drop(column, axis=1)
-        else:
-            df[column] = _impute(df[column])
     logger.info("Finished Handling Missing Values")
     return df
 
 
-def _is_binary_string(col_series: pd.Series) -> bool:
-    return (
-        pd_types.is_string_dtype(col_series)
-        and col_series.dropna().apply(str).str.lower().nunique() == 2
+def _handle_missing(series: pd.Series) -> tuple:
+    """
+    The decision of `handle_missing_values` for one column: ("dropped",
+    None), ("imputed", the imputed column) or (None, the column).
+    """
+    missing_values_prc = series.isnull().mean() * 100
+    if missing_values_prc == 0:
+        logger.debug(
+            "%s column has none of its values missing, skipping",
+            series.name,
+        )
+        return None, series
+    logger.debug(
+        "%s column has %d%% of its values missing",
+        series.name,
+        round(missing_values_prc),
+    )
+    if missing_values_prc >= 50:
+        logger.debug("Dropping column %s", series.name)
+        return "dropped", None
+    return "imputed", _impute(series)
+
+
+def downcast_types(
+    df: pd.DataFrame,
+    category_ratio: float = 0.5,
+    float_tolerance: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Shrinks every column to the smallest dtype that holds its values:
+    - integers to the narrowest nullable (U)Int8/16/32/64 covering their
+      observed min/max
+    - floats to Float32 when no value changes by more than
+      `float_tolerance` (relative) on the round trip
+    - string columns to category when their number of distinct values
+      is at most `category_ratio` times their number of non-null values
+
+    The per-column memory before and after the operation is logged and
+    stored in `df.attrs["memory_report"]`.
+
+    Parameters:
+        df (pd.DataFrame): The cleaned DataFrame.
+        category_ratio (float): Cardinality ratio cut-off for categories.
+        float_tolerance (float): Relative error allowed for Float32.
+
+    Returns:
+        pd.DataFrame: The DataFrame with downcast columns.
+    """
+    logger.info("Downcasting columns to their smallest safe data type")
+    banner()
+    report = {}
+    for col in df.columns:
+        df[col], report[col] = _downcast_column(
+            df[col], category_ratio, float_tolerance
+        )
+    total_before = sum(r["bytes_before"] for r in report.values())
+    total_after = sum(r["bytes_after"] for r in report.values())
+    logger.info(
+        "Memory usage reduced from %s to %s MB's",
+        round(total_before / 10**6, 2),
+        round(total_after / 10**6, 2),
     )
+    df.attrs["memory_report"] = report
+    logger.info("Finished downcasting columns")
+    return df
+
+
+def _downcast_column(
+    series: pd.Series, category_ratio: float, float_tolerance: float
+) -> tuple:
+    """
+    The column of `downcast_types`, downcast when that saves memory, and
+    its entry of the memory report.
+    """
+    before = series.memory_usage(index=False, deep=True)
+    downcast = _downcast(series, category_ratio, float_tolerance)
+    after = downcast.memory_usage(index=False, deep=True)
+    if after < before:
+        logger.debug(
+            "Changed %s from %s to %s: %d -> %d bytes",
+            series.name,
+            series.dtype,
+            downcast.dtype,
+            before,
+            after,
+        )
+    else:
+        downcast, after = series, before
+    return downcast, {
+        "dtype_before": series.dtype.name,
+        "dtype_after": downcast.dtype.name,
+        "bytes_before": int(before),
+        "bytes_after": int(after),
+    }
+
+
+def _downcast(
+    col_series: pd.Series, category_ratio: float, float_tolerance: float
+) -> pd.Series:
+    """Returns `col_series` cast to its smallest safe dtype."""
+    non_null = col_series.dropna()
+    if non_null.empty or pd_types.is_bool_dtype(col_series):
+        return col_series
+
+    if pd_types.is_integer_dtype(col_series):
+        low, high = non_null.min(), non_null.max()
+        for dtype in _INTEGER_WIDTHS[low >= 0]:
+            info = np.iinfo(dtype.lower())
+            if info.min <= low and high <= info.max:
+                return col_series.astype(dtype)
+        return col_series
+
+    if pd_types.is_float_dtype(col_series):
+        values = non_null.to_numpy(dtype="float64")
+        narrowed = values.astype("float32").astype("float64")
+        with np.errstate(invalid="ignore", over="ignore"):
+            error = np.abs(narrowed - values)
+            allowed = float_tolerance * np.abs(values)
+        if np.all((error <= allowed) | (narrowed == values)):
+            return col_series.astype("Float32")
+        return col_series
+
+    if pd_types.is_string_dtype(col_series) and (
+        col_series.dtype.name != "category"
+    ):
+        try:
+            n_unique = non_null.nunique()
+        except TypeError:
+            return col_series
+        if n_unique <= category_ratio * len(non_null):
+            return col_series.astype("category")
+    return col_series
+
+
+def _is_binary_string(col_series: pd.Series) -> bool:
+    if not pd_types.is_string_dtype(col_series):
+        return False
+    # lowercases the distinct values only, stopping at the third one
+    try:
+        values = col_series.dropna().unique()
+    except (
+        TypeError
+    ):  # unhashable values (lists, dicts) compared as text
+        values = col_series.dropna().apply(str).unique()
+    lowered = set()
+    for value in values:
+        lowered.add(str(value).lower())
+        if len(lowered) > 2:
+            return False
+    return len(lowered) == 2
 
 
 def _is_numeric_boolean(col_series: pd.Series) -> bool:
-    return pd_types.is_integer_dtype(col_series) and set(
-        col_series.dropna().unique()
-    ).issubset({0, 1})
+    return (
+        pd_types.is_integer_dtype(col_series)
+        and column_stats(col_series)["binary"]
+    )
 
 
 def _is_id_column(col_series: pd.Series) -> bool:
     col_name = col_series.name
-    return pd_types.is_numeric_dtype(col_series) and re.search(
-        r"((?:(?<=_)|^)id(?=_))|.*id$", col_name, re.IGNORECASE
+    return pd_types.is_numeric_dtype(col_series) and bool(
+        _ID_COLUMN_PATTERN.search(col_name)
+    )
+
+
+def _id_column_mask(columns: pd.Index) -> np.ndarray:
+    """
+    Flags the id-like column names (see `_is_id_column`) of a whole
+    column index in one vectorized pass. Non-string names are never
+    id-like.
+    """
+    columns = pd.Index(columns)
+    if columns.inferred_type not in _STRING_INDEX_TYPES:
+        return np.zeros(len(columns), dtype=bool)
+    return np.asarray(
+        columns.str.contains(_ID_COLUMN_PATTERN, na=False), dtype=bool
     )
 
 
@@ -294,26 +630,29 @@ def _impute(col_series: pd.Series, nmode="median") -> pd.Series:
         # and not _is_categorical(col_series) # coerce eda types eliminates
         # and not _is_id_column(col_series)   # these two possibilities
     ):
-        logger.info(
-            f"Initiating imputation on {col_series.name} of dtype {col_series.dtype.name}"
+        logger.debug(
+            "Initiating imputation on %s of dtype %s",
+            col_series.name,
+            col_series.dtype,
         )
         col_series = col_series.astype("Float64")
         if nmode == "median":
-            logger.info("Performing imputation with 'median'")
+            logger.debug("Performing imputation with 'median'")
             col_series = col_series.fillna(col_series.median())
         elif nmode == "mean":
-            logger.info("Performing imputation with 'mean'")
+            logger.debug("Performing imputation with 'mean'")
             col_series = col_series.fillna(col_series.mean())
         else:
             default_nmode = _impute.__defaults__[0]
             _impute(col_series, nmode=default_nmode)
 
-        if (col_series.dropna() == col_series.astype(int)).all():
+        if column_stats(col_series)["integral"]:
             col_series = col_series.astype("Int64")
 
     else:
-        logger.info(
-            f"{col_series.name} column, unsuitable for imputation, skipping."
+        logger.debug(
+            "%s column, unsuitable for imputation, skipping.",
+            col_series.name,
         )
 
     return col_series
@@ -323,50 +662,31 @@ def _validate_binary_col(col_series: pd.Series) -> pd.Series:
     """
     Detect boolean-like columns and convert them to columns of bool dtype, otherwise convert them to string
     """
-    # Check if all non-null rows are 'true' or 'false'
-    if all(
-        map(
-            lambda x: (
-                True
-                if (
-                    isinstance(x, type(pd.NA))
-                    or str(x).lower() == "true"
-                    or str(x).lower() == "false"
-                )
-                and not re.match(r"\s*$", str(x))
-                else False
-            ),
-            col_series,
-        )
-    ):
-        # if they are convert them to boolean
-        col_series = col_series.map(_true_false_to_bool).astype(
-            "boolean"
-        )
-        logger.info(f"Changed {col_series.name}'s dtype to boolean")
-    # Check if all non-null rows are 'yes' or 'no'
-    elif all(
-        map(
-            lambda x: (
-                True
-                if (
-                    isinstance(x, type(pd.NA))
-                    or str(x).lower() == "yes"
-                    or str(x).lower() == "no"
-                )
-                and not re.match(r"\s*$", str(x))
-                else False
-            ),
-            col_series,
-        )
-    ):
-        # if they are convert them to boolean
-        col_series = col_series.map(_yes_no_to_bool).astype("boolean")
-        logger.info(f"Changed {col_series.name}'s dtype to boolean")
-    else:
-        col_series = col_series.astype("category")
+    # the distinct values are checked once, rows only through their codes
+    codes, uniques = pd.factorize(col_series)
+    lowered = [str(value).lower() for value in uniques]
+    for true_value, false_value in (("true", "false"), ("yes", "no")):
+        # Check if all non-null rows are true_value or false_value
+        if set(lowered) <= {true_value, false_value}:
+            # if they are convert them to boolean
+            is_true = np.append(np.equal(lowered, true_value), False)
+            col_series = pd.Series(
+                pd.arrays.BooleanArray(is_true[codes], codes == -1),
+                index=col_series.index,
+                name=col_series.name,
+            )
+            logger.debug(
+                "Changed %s's dtype to boolean", col_series.name
+            )
+            return col_series
+
+    return col_series.astype("category")
 
-    return col_series
+
+def _dtype_counts(dtypes: pd.Series) -> str:
+    """Counts of the column types, as 'Int64: 3, string: 2'."""
+    counts = dtypes.astype(str).value_counts()
+    return ", ".join(f"{dtype}: {n}" for dtype, n in counts.items())
 
 
 def _is_categorical(col_series: pd.Series) -> bool:
@@ -375,21 +695,3 @@ def _is_categorical(col_series: pd.Series) -> bool:
     except:
         verdict = False
     return verdict
-
-
-def _yes_no_to_bool(x):
-    "Converts a value to True if it is 'yes', False otherwise"
-    if isinstance(x, type(pd.NA)):
-        return x
-    else:
-        func = lambda x: True if x.lower() == "yes" else False
-        return func(x)
-
-
-def _true_false_to_bool(x):
-    "Converts a value to True if it is 'true', False otherwise"
-    if isinstance(x, type(pd.NA)):
-        return pd.NA
-    else:
-        func = lambda x: True if x.lower() == "true" else False
-        return func(x)
@@ -16,25 +16,109 @@ Usage options:
        python -m eda_cleaner.cli
        (then respond with 'y' when prompted)
 
+    4) Profile many datasets in one run (batch mode):
+       python -m eda_cleaner.cli --glob 'data/*.csv' --batch-workers 8
+       python -m eda_cleaner.cli -d 'postgresql://...' --tables a,b,c
+       python -m eda_cleaner.cli --manifest jobs.json
+
+    5) Profile every table of a PostgreSQL schema:
+       python -m eda_cleaner.cli -d 'postgresql://...' --schema public
+
 Arguments:
     path                A connection string (for -d) or file path (for -c)
     -d, --db_connection Indicates the path argument is a PostgreSQL URI
     -c, --csv_path      Indicates the path argument is a CSV file path
+    --dedup-memory      Memory budget (e.g. 4G) for out-of-core, disk
+                        spilling duplicate removal
+    --dedup-workers     Processes used for out-of-core duplicate removal
+    --backend           'pandas' (default) or 'partitioned', which cleans
+                        and profiles row partitions in a process pool
+                        (without --dedup-memory / --dedup-workers)
+    --workers           Worker processes of the partitioned backend
+    --engine            'pandas' (default) or 'arrow' compute engine for
+                        type inference and summary statistics
+    --downcast          Shrink columns to their smallest safe dtype
+    --category-ratio    Distinct/non-null ratio under which --downcast
+                        converts string columns to category
+    --keep-numeric-text Do not convert numbers stored as text ("1,234",
+                        "$5.00", "12%") to numeric columns
+    --top-k             Keep the k most frequent values per column in the
+                        summary, approximated for high-cardinality strings
+    --json-format       'json' (default, indented), 'compact' or 'ndjson'
+                        (one line per column, 'output/summary.ndjson')
+    --skip-plots        Do not generate the plots
+    --skip-csv          Do not write the cleaned dataset
+    --write-table       Also bulk load the cleaned dataset into this table
+    --write-db          Database URI for --write-table (defaults to the
+                        source database when loading with -d)
+    --write-mode        'create' (default), 'replace' or 'append'
+    --read-workers      Processes parsing byte ranges of the CSV file
+    --compression       Compress the cleaned dataset with gzip, bz2, xz or
+                        zstd (compressed input is detected by extension)
+    --glob              Batch mode: CSV files matching this pattern (can be
+                        repeated)
+    --tables            Batch mode: comma separated tables of the -d
+                        database
+    --manifest          Batch mode: JSON list of jobs (see batch.py)
+    --batch-workers     Batch mode: datasets processed at the same time
+    --batch-output      Batch mode: directory of the per-dataset outputs
+                        and of the index (default 'output/batch', or
+                        'output/schema' with --schema)
+    --schema            Profile every table of this schema of the -d
+                        database, largest first, after a catalog summary
+                        ('catalog.json') of all of them
+    --sample            Profile a uniform sample of this many rows,
+                        drawn while streaming through the file or the
+                        table (the summary gets confidence intervals)
+    --sample-frac       Profile a uniform sample of this fraction of the
+                        rows
+    --seed              Seed of --sample / --sample-frac
+    --max-memory        Memory budget of the run (e.g. 4G, or 'auto' for
+                        80% of the available memory): chunk sizes and
+                        worker counts are picked from the estimated size
+                        of a row of the file or table, and every process
+                        pool (parsing, --workers, deduplication, batch,
+                        plots) runs fewer tasks when the memory use gets
+                        close to it
+    --checkpoint        Checkpoint every stage of the run as it finishes,
+                        in 'output/checkpoint/'
+    --resume            Resume an interrupted, checkpointed run at its
+                        first unfinished stage, if its input and options
+                        did not change (implies --checkpoint)
+    -v, --verbose       Log every column processed, not only the summary
+                        of every stage
+    -q, --quiet         Log warnings and errors only
+    --log-json          Log one JSON object per line (time, level, logger,
+                        process, message) instead of the console format
 
 Outputs:
     - Cleaned dataset written to 'output/cleaned_data.csv'
     - EDA summary table written to 'output/summary_table.csv'
-    - JSON summary written to 'output/summary.json'
+    - JSON summary written to 'output/summary.json' (or
+      'output/summary.ndjson')
     - Visualizations saved in the 'output/plots/' directory
+    - In batch mode, the above in 'output/batch/<dataset>/' per dataset,
+      with an index of the datasets in 'output/batch/index.json' and
+      'output/batch/index.csv'
 """
 
 from argparse import ArgumentParser
-from .log_setup.setup import setup, logging
-from .loader import pg_load, csv_load
-from .cleaner import clean_pipeline
-from .profiler import generate_summary
-from .writer import write_json, write_summary_table, write_df
-from .visualizer import generate_plots
+from .log_setup.setup import setup, setup_queue, logging
+from .loader import RANGE_BYTES, pg_load, csv_load
+from .external import external_dedup_csv
+from .pipeline import run_pipeline
+from .sampling import SAMPLE_CHUNK_ROWS, csv_sample, pg_sample
+from .batch import batch_jobs, run_batch
+from .catalog import profile_schema
+from .checkpoint import open_checkpoint, stage_done
+from .writer import OUTPUT_DIR
+from .governor import (
+    memory_budget,
+    plan_memory,
+    plan_table_memory,
+    start_governor,
+)
+from .dates import use_format_cache
 
 DEFAULT_DATASET = "data/global-air-pollution-dataset.csv"
 
@@ -46,6 +130,175 @@ parser = ArgumentParser()
 parser.add_argument("path", nargs="?")
 parser.add_argument("-d", "--db_connection", action="store_true")
 parser.add_argument("-c", "--csv_path", action="store_true")
+parser.add_argument(
+    "--dedup-memory",
+    help="memory budget for out-of-core duplicate removal, e.g. 4G",
+)
+parser.add_argument(
+    "--dedup-workers",
+    type=int,
+    default=1,
+    help="processes used for out-of-core duplicate removal",
+)
+parser.add_argument(
+    "--backend",
+    choices=["pandas", "partitioned"],
+    default="pandas",
+    help="single-process pandas, or row partitions over a process pool",
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    help="worker processes of the partitioned backend (default: CPUs)",
+)
+parser.add_argument(
+    "--engine",
+    choices=["pandas", "arrow"],
+    default="pandas",
+    help="compute engine for type inference and statistics",
+)
+parser.add_argument(
+    "--downcast",
+    action="store_true",
+    help="shrink columns to their smallest safe dtype after cleaning",
+)
+parser.add_argument(
+    "--category-ratio",
+    type=float,
+    default=0.5,
+    help="distinct/non-null ratio under which --downcast makes categories",
+)
+parser.add_argument(
+    "--keep-numeric-text",
+    action="store_true",
+    help='keep numbers stored as text ("1,234", "$5.00") as strings',
+)
+parser.add_argument(
+    "--top-k",
+    type=int,
+    help="most frequent values kept per column in the summary",
+)
+parser.add_argument(
+    "--json-format",
+    choices=["json", "compact", "ndjson"],
+    default="json",
+    help="layout of the JSON summary",
+)
+parser.add_argument(
+    "--skip-plots",
+    action="store_true",
+    help="do not generate the plots",
+)
+parser.add_argument(
+    "--skip-csv",
+    action="store_true",
+    help="do not write the cleaned dataset",
+)
+parser.add_argument(
+    "--write-table",
+    help="table to bulk load the cleaned dataset into",
+)
+parser.add_argument(
+    "--write-db",
+    help="database URI for --write-table (default: the -d database)",
+)
+parser.add_argument(
+    "--write-mode",
+    choices=["create", "replace", "append"],
+    default="create",
+    help="whether --write-table is created, replaced or appended to",
+)
+parser.add_argument(
+    "--read-workers",
+    type=int,
+    default=1,
+    help="processes parsing byte ranges of the CSV file",
+)
+parser.add_argument(
+    "--compression",
+    choices=["gzip", "bz2", "xz", "zstd"],
+    help="codec of the cleaned CSV output",
+)
+parser.add_argument(
+    "--glob",
+    action="append",
+    help="batch mode: CSV files matching this pattern (repeatable)",
+)
+parser.add_argument(
+    "--tables",
+    help="batch mode: comma separated tables of the -d database",
+)
+parser.add_argument(
+    "--manifest",
+    help="batch mode: JSON list of jobs",
+)
+parser.add_argument(
+    "--batch-workers",
+    type=int,
+    help="batch mode: datasets processed at the same time (default: CPUs)",
+)
+parser.add_argument(
+    "--batch-output",
+    help="batch mode: directory of the outputs (default: output/batch)",
+)
+parser.add_argument(
+    "--schema",
+    help="profile every table of this schema of the -d database",
+)
+parser.add_argument(
+    "--max-memory",
+    help="memory budget of the run, e.g. 4G, or 'auto'; sizes the load "
+    "and backs off every process pool near it",
+)
+sampling = parser.add_mutually_exclusive_group()
+sampling.add_argument(
+    "--sample",
+    type=int,
+    help="profile a uniform sample of this many rows",
+)
+sampling.add_argument(
+    "--sample-frac",
+    type=float,
+    help="profile a uniform sample of this fraction of the rows",
+)
+parser.add_argument(
+    "--seed",
+    type=int,
+    help="seed of --sample / --sample-frac",
+)
+parser.add_argument(
+    "--checkpoint",
+    action="store_true",
+    help="checkpoint the stages of the run, to --resume it",
+)
+parser.add_argument(
+    "--resume",
+    action="store_true",
+    help="resume an interrupted run at its first unfinished stage",
+)
+verbosity = parser.add_mutually_exclusive_group()
+verbosity.add_argument(
+    "-v",
+    "--verbose",
+    action="store_const",
+    const="verbose",
+    dest="verbosity",
+    default="normal",
+    help="log every column processed",
+)
+verbosity.add_argument(
+    "-q",
+    "--quiet",
+    action="store_const",
+    const="quiet",
+    dest="verbosity",
+    help="log warnings and errors only",
+)
+parser.add_argument(
+    "--log-json",
+    action="store_true",
+    help="log JSON lines instead of the console format",
+)
 args = parser.parse_args()
 
 
@@ -58,16 +311,88 @@ def main():
     - Cleans the data via the cleaning pipeline
     - Assigns EDA types to each column
     - Writes the cleaned dataset and EDA results to disk
-    - Generates and saves summary statistics and plots
+    - Generates and saves summary statistics and plots, running the
+      independent stages concurrently
 
     If no valid data source is provided, prompts the user
     to optionally load the default dataset.
+
+    With --glob, --tables or --manifest, every dataset is processed the
+    same way by a pool of worker processes (see batch.py), and so are
+    all the tables of a --schema (see catalog.py).
     """
-    df = None
+    if args.backend == "partitioned" and (
+        args.dedup_memory or args.dedup_workers != 1
+    ):
+        parser.error(
+            "--dedup-memory and --dedup-workers are not supported by "
+            "--backend partitioned"
+        )
+    setup_queue(args.verbosity, args.log_json)
+    budget = None
+    if args.max_memory:
+        try:
+            budget = memory_budget(args.max_memory)
+        except (ImportError, ValueError) as e:
+            logger.error(e)
+            return
+        start_governor(budget)
+    options = dict(
+        backend=args.backend,
+        workers=args.workers,
+        dedup_memory=args.dedup_memory,
+        dedup_workers=args.dedup_workers,
+        engine=args.engine,
+        downcast=args.downcast,
+        category_ratio=args.category_ratio,
+        recover_numbers=not args.keep_numeric_text,
+        top_k=args.top_k,
+        json_format=args.json_format,
+        plots=not args.skip_plots,
+        csv=not args.skip_csv,
+        compression=args.compression,
+        write_table=args.write_table,
+        write_db=args.write_db or (args.db_connection and args.path),
+        write_mode=args.write_mode,
+    )
+    sample = {
+        key: value
+        for key, value in [
+            ("sample", args.sample),
+            ("sample_frac", args.sample_frac),
+            ("seed", args.seed),
+        ]
+        if value is not None
+    }
+    if args.schema and args.db_connection and args.path:
+        profile_schema(
+            args.path,
+            args.schema,
+            args.batch_workers,
+            args.batch_output,
+            {**options, **sample},
+        )
+        return
+    if args.glob or args.tables or args.manifest:
+        jobs = batch_jobs(
+            args.glob,
+            args.path if args.db_connection else None,
+            args.tables.split(",") if args.tables else None,
+            args.manifest,
+            {**options, **sample},
+        )
+        run_batch(jobs, args.batch_workers, args.batch_output)
+        return
+
+    source = None
     if args.db_connection and not args.csv_path and args.path:
-        df = pg_load(args.path)
+        # the table is part of the input, known before the checkpoint
+        table = ""
+        while not table:
+            table = input("Enter a valid table name: ")
+        source = {"db": args.path, "table": table}
     elif args.csv_path and not args.db_connection and args.path:
-        df = csv_load(args.path)
+        source = {"csv": args.path}
     else:
         logger.warning("Invalid parameters.")
         parser.print_help()
@@ -76,20 +401,90 @@ def main():
                 "Do you wish to load a default dataset? (y or n): "
             )
             if choice.lower() == "y":
-                df = csv_load(DEFAULT_DATASET)
+                source = {"csv": DEFAULT_DATASET}
                 break
             if choice.lower() == "n":
                 break
 
-    if df is None:
+    if source is not None:
+        use_format_cache(OUTPUT_DIR, source)
+    checkpoint = None
+    if source is not None and (args.checkpoint or args.resume):
+        try:
+            checkpoint = open_checkpoint(
+                OUTPUT_DIR, source, {**options, **sample}, args.resume
+            )
+        except (OSError, ValueError) as e:
+            logger.error(e)
+            return
+
+    # a resumed run takes the cleaned dataset from the checkpoint
+    resuming = checkpoint is not None and stage_done(
+        checkpoint, "clean"
+    )
+    df = None
+    # sizes of the load, planned from the budget of --max-memory
+    read_workers = args.read_workers
+    range_bytes, chunk_rows = RANGE_BYTES, SAMPLE_CHUNK_ROWS
+    if budget and source and not resuming:
+        try:
+            if "csv" in source:
+                plan = plan_memory(
+                    source["csv"], budget, args.read_workers
+                )
+            else:
+                plan = plan_table_memory(
+                    source["db"], source["table"], budget
+                )
+        except Exception as e:  # the load reports unreadable inputs
+            logger.warning("No memory plan: %s", e)
+        else:
+            read_workers = plan["read_workers"]
+            range_bytes = plan["range_bytes"]
+            chunk_rows = plan["chunk_rows"]
+            # the partitioned backend removes duplicates in memory
+            if (
+                not options["dedup_memory"]
+                and args.backend != "partitioned"
+            ):
+                options["dedup_memory"] = plan["dedup_memory"]
+
+    sampled = args.sample is not None or args.sample_frac is not None
+    if source is not None and not resuming:
+        if "db" in source and sampled:
+            df = pg_sample(
+                source["db"],
+                source["table"],
+                n=args.sample,
+                frac=args.sample_frac,
+                seed=args.seed,
+            )
+        elif "db" in source:
+            df = pg_load(source["db"], source["table"])
+        elif sampled:
+            df = csv_sample(
+                source["csv"],
+                args.sample,
+                args.sample_frac,
+                args.seed,
+                chunk_rows,
+            )
+        elif options["dedup_memory"]:
+            # duplicates are removed while streaming the file
+            df = external_dedup_csv(
+                source["csv"],
+                options["dedup_memory"],
+                options["dedup_workers"],
+                chunk_rows,
+            )
+        else:
+            df = csv_load(source["csv"], read_workers, range_bytes)
+
+    if df is None and not resuming:
         logger.info("No data loaded, exiting")
         return
 
-    df = clean_pipeline(df)
-    summary = generate_summary(df)
-    write_json(summary)
-    generate_plots(df)
-    write_df(df)
+    run_pipeline(df, checkpoint=checkpoint, **options)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,278 @@
+"""
+correlation.py
+
+Blockwise correlation engine for numeric columns.
+
+Instead of materializing the full frame, rows are consumed chunk by
+chunk and only p x p accumulators (pairwise counts, sums, sums of
+squares and cross-products) are kept, all updated with BLAS-backed
+matrix products. Missing values are handled pairwise, like
+`DataFrame.corr`.
+
+Spearman correlation is computed as Pearson correlation of ranks. For an
+in-memory DataFrame the ranks are exact per column (pandas re-ranks every
+pair on its common rows, so results differ slightly when values are
+missing). Streamed chunks are read twice: the first pass merges a rank
+sketch (a weighted, sorted sample of every column) over all chunks while
+spilling their values to a temporary file, and the second ranks the
+spilled chunks against it, so the ranks do not depend on the order of
+the rows.
+
+Public Functions:
+- correlation_matrix(data, method, ...): Correlation matrix of a
+  DataFrame or of an iterable of DataFrame chunks.
+- top_correlated_pairs(corr, k): The k strongest column pairs.
+- strongest_subset(corr, max_columns): Columns taking part in the
+  strongest pairs, ordered so that correlated columns sit together.
+"""
+
+from .log_setup.setup import setup, logging
+import tempfile
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+# rows per chunk are chosen so one float64 chunk takes about this much
+CHUNK_BYTES = 32 * 1024**2
+# sorted sample size per column used to approximate streamed ranks
+RANK_SKETCH_SIZE = 4096
+# merged sketches are compressed back when they grow past this factor
+RANK_SKETCH_SLACK = 2
+
+
+def correlation_matrix(
+    data, method: str = "pearson", columns: list = None
+) -> pd.DataFrame:
+    """Computes the correlation matrix of numeric columns, chunk by chunk.
+
+    Args:
+        data (pd.DataFrame or iterable of pd.DataFrame): The rows, either
+            in memory or streamed as chunks with the same columns.
+        method (str): 'pearson' or 'spearman'.
+        columns (list, optional): Columns to correlate. Defaults to all
+            columns of the (first) frame.
+
+    Returns:
+        pd.DataFrame: The symmetric correlation matrix.
+
+    Raises:
+        ValueError: If `method` is not supported.
+    """
+    if method not in {"pearson", "spearman"}:
+        raise ValueError(f"Unsupported correlation method: {method}")
+
+    if isinstance(data, pd.DataFrame):
+        columns = list(data.columns) if columns is None else columns
+        frame = data[columns]
+        if method == "spearman":
+            frame = pd.DataFrame(
+                frame.to_numpy(dtype="float64", na_value=np.nan),
+                columns=columns,
+            ).rank()
+        rows = max(1, CHUNK_BYTES // (8 * max(1, len(columns))))
+        chunks = (
+            frame.iloc[start : start + rows]
+            for start in range(0, len(frame), rows)
+        )
+    elif method == "spearman":
+        chunks = _streamed_ranks(data, columns)
+    else:
+        chunks = iter(data)
+
+    n = sx = sxx = sxy = shift = None
+    for chunk in chunks:
+        if columns is None:
+            columns = list(chunk.columns)
+        values = chunk[columns].to_numpy(
+            dtype="float64", na_value=np.nan
+        )
+        if n is None:
+            p = len(columns)
+            n, sx, sxx, sxy = (np.zeros((p, p)) for _ in range(4))
+            # shifting by a rough mean keeps the sums well conditioned
+            with np.errstate(all="ignore"):
+                shift = np.nan_to_num(np.nanmean(values, axis=0))
+        mask = ~np.isnan(values)
+        x = np.where(mask, values - shift, 0.0)
+        m = mask.astype("float64")
+        n += m.T @ m
+        sx += x.T @ m
+        sxx += (x * x).T @ m
+        sxy += x.T @ x
+
+    if n is None:
+        return pd.DataFrame(
+            index=columns, columns=columns, dtype="float64"
+        )
+    return pd.DataFrame(
+        _pearson_from_sums(n, sx, sxx, sxy),
+        index=columns,
+        columns=columns,
+    )
+
+
+def top_correlated_pairs(
+    corr: pd.DataFrame, k: int = 20
+) -> pd.DataFrame:
+    """Returns the `k` column pairs with the largest absolute correlation.
+
+    Args:
+        corr (pd.DataFrame): A correlation matrix.
+        k (int): Number of pairs to keep.
+
+    Returns:
+        pd.DataFrame: Columns 'column_1', 'column_2' and 'correlation',
+        strongest pair first.
+    """
+    values = corr.to_numpy()
+    rows, cols = np.triu_indices(len(corr), k=1)
+    strength = np.abs(values[rows, cols])
+    valid = ~np.isnan(strength)
+    rows, cols, strength = rows[valid], cols[valid], strength[valid]
+    order = np.argsort(-strength, kind="stable")[:k]
+    return pd.DataFrame(
+        {
+            "column_1": corr.index[rows[order]],
+            "column_2": corr.columns[cols[order]],
+            "correlation": values[rows[order], cols[order]],
+        }
+    )
+
+
+def strongest_subset(
+    corr: pd.DataFrame, max_columns: int = 25
+) -> pd.DataFrame:
+    """Restricts a wide correlation matrix to its most correlated columns.
+
+    Columns are taken from the strongest pairs until `max_columns` are
+    collected, then ordered by the leading eigenvector of the absolute
+    correlations so that related columns end up next to each other.
+
+    Args:
+        corr (pd.DataFrame): A correlation matrix.
+        max_columns (int): Maximum number of columns to keep.
+
+    Returns:
+        pd.DataFrame: The reordered sub-matrix.
+    """
+    if len(corr) <= max_columns:
+        return corr
+    selected = []
+    for pair in top_correlated_pairs(
+        corr, k=len(corr) ** 2
+    ).itertuples():
+        for col in (pair.column_1, pair.column_2):
+            if col not in selected and len(selected) < max_columns:
+                selected.append(col)
+        if len(selected) >= max_columns:
+            break
+    subset = corr.loc[selected, selected]
+    _, vectors = np.linalg.eigh(
+        np.nan_to_num(np.abs(subset.to_numpy()))
+    )
+    order = np.argsort(vectors[:, -1] * np.sign(vectors[:, -1].sum()))
+    return subset.iloc[order, order]
+
+
+def _pearson_from_sums(n, sx, sxx, sxy) -> np.ndarray:
+    """
+    Pairwise-complete Pearson correlations from the accumulated (shifted)
+    sums: entry [i, j] of `sx` / `sxx` holds the sum of x_i / x_i**2
+    over the rows where both i and j are present.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sx.T / n
+        var_i = sxx - sx**2 / n
+        var_j = var_i.T
+        corr = cov / np.sqrt(var_i * var_j)
+    corr[(n < 2) | (var_i <= 0) | (var_j <= 0)] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+    diagonal = np.diag(corr).copy()
+    diagonal[~np.isnan(diagonal)] = 1.0
+    np.fill_diagonal(corr, diagonal)
+    return corr
+
+
+def _streamed_ranks(chunks, columns: list = None):
+    """
+    Yields the approximate ranks of every streamed chunk, as frames.
+    The chunks are spilled to a temporary file while the rank sketch of
+    all of them is merged, and ranked when it is complete.
+    """
+    sketch = None
+    n_chunks = 0
+    with tempfile.TemporaryFile(prefix="eda_ranks_") as spill:
+        for chunk in chunks:
+            if columns is None:
+                columns = list(chunk.columns)
+            values = chunk[columns].to_numpy(
+                dtype="float64", na_value=np.nan
+            )
+            sketch = _merge_sketches(sketch, _rank_sketch(values))
+            np.save(spill, values)
+            n_chunks += 1
+        spill.seek(0)
+        for _ in range(n_chunks):
+            yield pd.DataFrame(
+                _sketch_ranks(np.load(spill), sketch), columns=columns
+            )
+
+
+def _rank_sketch(values: np.ndarray) -> list:
+    """
+    Sorted sample of up to RANK_SKETCH_SIZE values per column, with the
+    number of values each sampled value stands for.
+    """
+    sketch = []
+    for column in values.T:
+        column = np.sort(column[~np.isnan(column)])
+        n_values = len(column)
+        if n_values > RANK_SKETCH_SIZE:
+            positions = np.linspace(0, n_values - 1, RANK_SKETCH_SIZE)
+            column = column[positions.astype(int)]
+        weights = np.full(len(column), n_values / max(1, len(column)))
+        sketch.append((column, weights))
+    return sketch
+
+
+def _merge_sketches(left: list, right: list) -> list:
+    """
+    Combines the rank sketches of two sets of rows, resampling columns
+    that grew past RANK_SKETCH_SLACK times RANK_SKETCH_SIZE values at
+    evenly spaced cumulative weights.
+    """
+    if left is None:
+        return right
+    merged = []
+    for (values, weights), (other, other_weights) in zip(left, right):
+        values = np.concatenate([values, other])
+        weights = np.concatenate([weights, other_weights])
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+        if len(values) > RANK_SKETCH_SLACK * RANK_SKETCH_SIZE:
+            cumulative = np.cumsum(weights)
+            targets = (np.arange(RANK_SKETCH_SIZE) + 0.5) * (
+                cumulative[-1] / RANK_SKETCH_SIZE
+            )
+            values = values[np.searchsorted(cumulative, targets)]
+            weights = np.full(
+                RANK_SKETCH_SIZE, cumulative[-1] / RANK_SKETCH_SIZE
+            )
+        merged.append((values, weights))
+    return merged
+
+
+def _sketch_ranks(values: np.ndarray, sketch: list) -> np.ndarray:
+    """Approximate mid-ranks of values, from the weights of the sketch."""
+    ranks = np.full(values.shape, np.nan)
+    for i, (column, weights) in enumerate(sketch):
+        present = ~np.isnan(values[:, i])
+        below = np.concatenate([[0.0], np.cumsum(weights)])
+        low = below[np.searchsorted(column, values[present, i], "left")]
+        high = below[
+            np.searchsorted(column, values[present, i], "right")
+        ]
+        ranks[present, i] = (low + high) / 2
+    return ranks
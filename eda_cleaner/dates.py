@@ -0,0 +1,292 @@
+"""
+dates.py
+
+Sample-based datetime detection for text columns.
+
+Instead of asking pandas to parse a whole column element by element (and
+to guess the format of every value), a sample of the column is matched
+against a list of common formats. Columns that are not dates are
+rejected after the sample; date columns are then parsed in one
+vectorized pass with the explicit format.
+
+With `use_format_cache`, the format found for each column of an input is
+kept in a cache file keyed by the input, so later runs over the same
+input try it first. Runs over different inputs can share the file, it is
+merged under a lock on every save. A cached format is only taken if it
+fits the whole sample and the sample is not ambiguous (e.g. "01/02/2020"
+fits both month-first and day-first), otherwise the format is inferred
+as on a first run.
+
+Public Functions:
+- infer_format(series, column): The datetime format of a text column.
+- parse_datetimes(series, fmt, column): Parses a text column as datetimes.
+- use_format_cache(cache_dir, source): Caches the formats found for the
+  columns of `source` in `cache_dir`.
+"""
+
+from .log_setup.setup import setup, logging
+import contextlib
+import json
+import os
+import re
+import threading
+import numpy as np
+import pandas as pd
+import pandas.api.types as pd_types
+from sqlalchemy.engine import make_url
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+# values whose format differs from row to row, parsed one by one
+MIXED = "mixed"
+EPOCH_FORMATS = {"epoch_s": ("s", 10), "epoch_ms": ("ms", 13)}
+# tried in order, month-first before day-first like pandas' own parser
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m/%d/%Y %H:%M",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%d %b %Y",
+    "%b %d, %Y",
+    "%Y%m%d",
+)
+# epoch values are only accepted between these dates
+EPOCH_RANGE = (pd.Timestamp("1990-01-01"), pd.Timestamp("2100-01-01"))
+SAMPLE_SIZE = 1000
+FORMAT_CACHE_FILE = "datetime_formats.json"
+
+# set by use_format_cache, no caching by default
+_cache_path = None
+_cache_source = None
+_format_cache = None
+_thread_lock = threading.Lock()
+
+
+def use_format_cache(cache_dir: str, source: dict) -> None:
+    """
+    Caches the formats found for the columns of an input in
+    `<cache_dir>/datetime_formats.json`, under that input.
+
+    Args:
+        cache_dir (str): Directory of the cache, shared by the runs over
+            any input, None to turn the cache off.
+        source (dict): The input, {"csv": path} or {"db": uri, "table":
+            name, "schema": name}.
+    """
+    global _cache_path, _cache_source, _format_cache
+    _format_cache = None
+    if cache_dir is None:
+        _cache_path = _cache_source = None
+        return
+    _cache_path = os.path.join(cache_dir, FORMAT_CACHE_FILE)
+    _cache_source = _source_key(source)
+
+
+def infer_format(series: pd.Series, column: str = None) -> str:
+    """
+    Infers the datetime format of a text column from a sample of it.
+
+    Args:
+        series (pd.Series): The column.
+        column (str, optional): Column name, used to look up the format
+            cached by earlier runs over the same input.
+
+    Returns:
+        str: A strptime format, 'epoch_s' / 'epoch_ms', or MIXED when the
+        sample is made of dates in varying formats.
+
+    Raises:
+        ValueError: If the sample does not hold dates.
+    """
+    sample = _sample(series.dropna())
+    if pd_types.infer_dtype(sample, skipna=True) in {"string"}:
+        cached = _cached_format(column)
+        if cached is not None and _unambiguous(sample, cached):
+            return cached
+        for fmt in (*EPOCH_FORMATS, *DATE_FORMATS):
+            if _fits(sample, fmt):
+                return fmt
+    try:
+        sample.astype("datetime64[ns]")
+    except (TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f"Not a datetime column: {e}") from e
+    return MIXED
+
+
+def parse_datetimes(
+    series: pd.Series, fmt: str = None, column: str = None
+) -> pd.Series:
+    """
+    Parses a text column as datetime64[ns].
+
+    Args:
+        series (pd.Series): The column.
+        fmt (str, optional): Format returned by `infer_format`, inferred
+            when not given.
+        column (str, optional): Column name the format is cached under,
+            see `use_format_cache`.
+
+    Returns:
+        pd.Series: The parsed column.
+
+    Raises:
+        ValueError: If the column does not hold dates.
+    """
+    fmt = fmt or infer_format(series, column)
+    if fmt != MIXED:
+        try:
+            parsed = _parse(series, fmt)
+        except (TypeError, ValueError, OverflowError):
+            # the sample did not show every format of the column
+            logger.info(
+                "Column %s has dates not matching %s", column, fmt
+            )
+        else:
+            _remember(column, fmt)
+            return parsed
+    try:
+        return series.astype("datetime64[ns]")
+    except (TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f"Not a datetime column: {e}") from e
+
+
+def _sample(series: pd.Series) -> pd.Series:
+    """Up to SAMPLE_SIZE values spread evenly over the column."""
+    if len(series) <= SAMPLE_SIZE:
+        return series
+    positions = np.linspace(0, len(series) - 1, SAMPLE_SIZE)
+    return series.iloc[positions.astype(int)]
+
+
+def _fits(sample: pd.Series, fmt: str) -> bool:
+    if fmt in EPOCH_FORMATS:
+        _, digits = EPOCH_FORMATS[fmt]
+        if not sample.str.fullmatch(rf"\d{{{digits}}}").all():
+            return False
+    try:
+        parsed = _parse(sample, fmt)
+    except (TypeError, ValueError, OverflowError):
+        return False
+    return fmt not in EPOCH_FORMATS or bool(
+        parsed.between(*EPOCH_RANGE).all()
+    )
+
+
+def _parse(series: pd.Series, fmt: str) -> pd.Series:
+    if fmt in EPOCH_FORMATS:
+        unit, _ = EPOCH_FORMATS[fmt]
+        return pd.to_datetime(pd.to_numeric(series), unit=unit)
+    return pd.to_datetime(series, format=fmt, exact=True)
+
+
+def _unambiguous(sample: pd.Series, fmt: str) -> bool:
+    """
+    Whether `fmt` fits the sample and its day-month swapped counterpart
+    does not, which is left to the order of DATE_FORMATS.
+    """
+    if not _fits(sample, fmt):
+        return False
+    swapped = re.sub(
+        "%[dm]", lambda m: "%m" if m.group() == "%d" else "%d", fmt
+    )
+    return (
+        swapped == fmt
+        or swapped not in DATE_FORMATS
+        or not _fits(sample, swapped)
+    )
+
+
+def _source_key(source: dict) -> str:
+    """The input as a cache key, without passwords."""
+    if source.get("csv"):
+        return os.path.abspath(source["csv"])
+    key = make_url(source["db"]).render_as_string(hide_password=True)
+    table = ".".join(
+        str(source[k]) for k in ("schema", "table") if source.get(k)
+    )
+    return f"{key}#{table}" if table else key
+
+
+def _cache() -> dict:
+    """The column formats of earlier runs, read once per process."""
+    global _format_cache
+    if _format_cache is None:
+        try:
+            with open(_cache_path) as f:
+                _format_cache = json.load(f)
+        except (OSError, ValueError):
+            _format_cache = {}
+    return _format_cache
+
+
+def _cached_format(column: str) -> str:
+    if _cache_path is None or column is None:
+        return None
+    return _cache().get(_cache_source, {}).get(column)
+
+
+def _remember(column: str, fmt: str) -> None:
+    """
+    Saves the format of a column. The cache file is shared by the runs
+    over every input, so it is re-read and merged under a lock: formats
+    saved meanwhile by other processes are kept.
+    """
+    global _format_cache
+    if _cache_path is None or column is None:
+        return
+    if _cache().get(_cache_source, {}).get(column) == fmt:
+        return
+    _cache().setdefault(_cache_source, {})[column] = fmt
+    try:
+        os.makedirs(os.path.dirname(_cache_path) or ".", exist_ok=True)
+        with _locked(f"{_cache_path}.lock"):
+            try:
+                with open(_cache_path) as f:
+                    saved = json.load(f)
+            except (OSError, ValueError):
+                saved = {}
+            saved.setdefault(_cache_source, {})[column] = fmt
+            temporary = (
+                f"{_cache_path}.{os.getpid()}.{threading.get_ident()}"
+            )
+            with open(temporary, "w") as f:
+                json.dump(saved, f, indent=4)
+            # atomic, so concurrent runs never see a partial file
+            os.replace(temporary, _cache_path)
+        _format_cache = saved
+    except OSError as e:
+        logger.warning("Could not cache datetime formats: %s", e)
+
+
+@contextlib.contextmanager
+def _locked(path: str):
+    """
+    Exclusive lock on `path` between processes, held by one thread of a
+    process at a time. Only the threads are serialized without fcntl.
+    """
+    with _thread_lock, open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
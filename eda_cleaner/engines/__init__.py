@@ -0,0 +1,43 @@
+"""
+engines
+
+Pluggable compute engines behind `clean_pipeline` and `generate_summary`.
+
+Every engine is a module exposing the same functions:
+- infer_kind(series): pandas `infer_dtype` style label of non-null values
+- null_count(series): Number of missing values
+- n_unique(series): Number of distinct non-null values
+- min_max_mean(series): Minimum, maximum and mean of a numeric column
+- min_max(series): Minimum and maximum of a datetime column
+- normalize_column_names(columns): Standardized column names
+- parse_numeric_text(series): Numbers written as text ("1,234", "$5",
+  "12%"), NaN where a value is not such a number
+- string_features(series): Lengths, number of whitespace-only values
+  and pattern counts ("AB-12" -> "AA-99") of the non-null values, as text
+
+Available engines:
+- 'pandas': The reference implementation (default)
+- 'arrow': pyarrow.compute kernels, requires pyarrow
+
+Public Functions:
+- get_engine(name): Returns the engine module registered under `name`.
+"""
+
+import importlib
+
+ENGINES = ("pandas", "arrow")
+
+
+def get_engine(name: str = "pandas"):
+    """Returns the engine module registered under `name`.
+
+    Args:
+        name (str): One of ENGINES.
+
+    Raises:
+        ValueError: If `name` is not a known engine.
+        ImportError: If the engine's dependencies are not installed.
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unsupported engine: {name}")
+    return importlib.import_module(f".{name}_engine", __name__)
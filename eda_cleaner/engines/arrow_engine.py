@@ -0,0 +1,254 @@
+"""
+arrow_engine.py
+
+Compute engine built on Arrow (pyarrow.compute) kernels, which run on
+contiguous buffers and validity bitmaps instead of Python objects.
+
+Scalars are converted back to the types the pandas engine returns, so
+both engines produce identical summaries. Columns Arrow cannot represent
+(e.g. mixed-type object columns) fall back to the pandas engine.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from . import pandas_engine
+
+# Unicode-aware equivalent of Python's [^\w] for RE2
+_SEPARATOR_PATTERN = r"[ -]"
+_INVALID_CHAR_PATTERN = r"[^\p{L}\p{N}_]"
+_NUMERIC_TEXT_PATTERN = f"^(?:{pandas_engine.NUMERIC_TEXT_PATTERN})$"
+_LETTER_PATTERN = r"\p{L}"
+# byte to pattern byte of ASCII text: digits to 9, letters to A
+_ASCII_PATTERN_TABLE = np.arange(256, dtype=np.uint8)
+_ASCII_PATTERN_TABLE[ord("0") : ord("9") + 1] = ord("9")
+_ASCII_PATTERN_TABLE[ord("A") : ord("Z") + 1] = ord("A")
+_ASCII_PATTERN_TABLE[ord("a") : ord("z") + 1] = ord("A")
+_ARROW_ERRORS = (
+    pa.ArrowInvalid,
+    pa.ArrowTypeError,
+    pa.ArrowNotImplementedError,
+)
+
+
+def _is_text(arrow_type) -> bool:
+    return pa.types.is_string(arrow_type) or pa.types.is_large_string(
+        arrow_type
+    )
+
+
+def _is_bytes(arrow_type) -> bool:
+    return pa.types.is_binary(arrow_type) or pa.types.is_large_binary(
+        arrow_type
+    )
+
+
+# pd.api.types.infer_dtype labels of the Arrow types of typed columns
+_TYPED_KINDS = (
+    (pa.types.is_integer, "integer"),
+    (pa.types.is_floating, "floating"),
+    (pa.types.is_boolean, "boolean"),
+    (_is_text, "string"),
+    (pa.types.is_timestamp, "datetime64"),
+    (pa.types.is_duration, "timedelta64"),
+    (pa.types.is_dictionary, "categorical"),
+)
+# and of the types Arrow infers from the values of object columns, where
+# they are unambiguous (datetimes may be datetime or datetime64 objects)
+_OBJECT_KINDS = (
+    (pa.types.is_integer, "integer"),
+    (pa.types.is_boolean, "boolean"),
+    (_is_text, "string"),
+    (_is_bytes, "bytes"),
+    (pa.types.is_date, "date"),
+    (pa.types.is_time, "time"),
+    (pa.types.is_decimal, "decimal"),
+)
+
+
+def infer_kind(series: pd.Series) -> str:
+    typed = series.dtype.name != "object"
+    try:
+        # the Arrow type of typed columns follows from the dtype alone,
+        # object columns are converted to let Arrow infer it
+        arrow_type = _to_arrow(
+            series.iloc[:0] if typed else series
+        ).type
+    except (*_ARROW_ERRORS, TypeError, ValueError, OverflowError):
+        # values Arrow cannot convert (mixed types, huge ints,
+        # datetime64 objects) keep pandas' labels
+        return pandas_engine.infer_kind(series)
+    for is_kind, kind in _TYPED_KINDS if typed else _OBJECT_KINDS:
+        if is_kind(arrow_type):
+            return kind
+    # floats of object columns may have been ints ("mixed-integer-float")
+    return pandas_engine.infer_kind(series)
+
+
+def null_count(series: pd.Series) -> int:
+    try:
+        return _to_arrow(series).null_count
+    except _ARROW_ERRORS:
+        return pandas_engine.null_count(series)
+
+
+def n_unique(series: pd.Series) -> int:
+    try:
+        array = _to_arrow(series)
+        if pa.types.is_dictionary(array.type):
+            # distinct category codes are the observed categories
+            array = array.indices
+        return pc.count_distinct(array, mode="only_valid").as_py()
+    except _ARROW_ERRORS:
+        return pandas_engine.n_unique(series)
+
+
+def min_max_mean(series: pd.Series) -> tuple:
+    try:
+        array = _to_arrow(series)
+    except _ARROW_ERRORS:
+        return pandas_engine.min_max_mean(series)
+    if array.null_count == len(array):
+        return pandas_engine.min_max_mean(series)
+    bounds = pc.min_max(array)
+    if pa.types.is_boolean(array.type):
+        array = pc.cast(array, pa.int8())
+    low, high = bounds["min"].as_py(), bounds["max"].as_py()
+    if series.dtype.kind in "biuf":
+        # the column's scalar type, as pandas returns (and JSON writes)
+        scalar = getattr(series.dtype, "numpy_dtype", series.dtype).type
+        low, high = scalar(low), scalar(high)
+    return low, high, np.float64(pc.mean(array).as_py())
+
+
+def min_max(series: pd.Series) -> tuple:
+    try:
+        array = _to_arrow(series)
+    except _ARROW_ERRORS:
+        return pandas_engine.min_max(series)
+    if not pa.types.is_timestamp(array.type) or (
+        array.null_count == len(array)
+    ):
+        return pandas_engine.min_max(series)
+    bounds = pc.min_max(array)
+    return tuple(
+        _to_timestamp(bounds[key], array.type) for key in ("min", "max")
+    )
+
+
+def normalize_column_names(columns: pd.Index) -> pd.Index:
+    try:
+        names = pa.array(list(columns), type=pa.string())
+    except _ARROW_ERRORS:
+        return pandas_engine.normalize_column_names(columns)
+    names = pc.utf8_lower(pc.utf8_trim_whitespace(names))
+    names = pc.replace_substring_regex(names, _SEPARATOR_PATTERN, "_")
+    names = pc.replace_substring_regex(names, _INVALID_CHAR_PATTERN, "")
+    return pd.Index(names.to_pylist(), dtype="object")
+
+
+def parse_numeric_text(series: pd.Series) -> pd.Series:
+    try:
+        array = pc.cast(_to_arrow(series), pa.string())
+    except _ARROW_ERRORS:
+        return pandas_engine.parse_numeric_text(series)
+    valid = pc.fill_null(
+        pc.match_substring_regex(array, _NUMERIC_TEXT_PATTERN), False
+    )
+    digits = pc.replace_substring_regex(
+        pc.if_else(valid, array, None),
+        pandas_engine.NON_NUMERIC_PATTERN,
+        "",
+    )
+    try:
+        values = pc.cast(digits, pa.float64())
+    except pa.ArrowInvalid:
+        # a value the pattern let through is no number, pandas makes
+        # it missing
+        return pandas_engine.parse_numeric_text(series)
+    percent = pc.and_(
+        valid, pc.ends_with(pc.utf8_rtrim_whitespace(array), "%")
+    )
+    values = pc.if_else(percent, pc.divide(values, 100.0), values)
+    return pd.Series(
+        values.to_numpy(zero_copy_only=False), index=series.index
+    )
+
+
+def string_features(series: pd.Series) -> tuple:
+    try:
+        array = pc.drop_null(_to_arrow(series))
+    except _ARROW_ERRORS:
+        return pandas_engine.string_features(series)
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    if not _is_text(array.type):
+        # numbers in object columns are written as str() does
+        return pandas_engine.string_features(series)
+    lengths = pc.utf8_length(array)
+    blank = pc.equal(pc.utf8_length(pc.utf8_trim_whitespace(array)), 0)
+    patterns = pc.utf8_slice_codeunits(
+        array, 0, pandas_engine.PATTERN_MAX_CHARS
+    )
+    if pc.all(pc.string_is_ascii(patterns)).as_py():
+        patterns = _ascii_patterns(patterns)
+    else:
+        patterns = pc.replace_substring_regex(
+            patterns, pandas_engine.DIGIT_PATTERN, "9"
+        )
+        patterns = pc.replace_substring_regex(
+            patterns, _LETTER_PATTERN, "A"
+        )
+    patterns = pc.if_else(
+        pc.greater(lengths, pandas_engine.PATTERN_MAX_CHARS),
+        pc.binary_join_element_wise(
+            patterns, pandas_engine.PATTERN_ELLIPSIS, ""
+        ),
+        patterns,
+    )
+    counts = pc.value_counts(patterns)
+    return (
+        lengths.to_numpy(zero_copy_only=False).astype("int64"),
+        pc.sum(pc.and_(blank, pc.greater(lengths, 0))).as_py() or 0,
+        pd.Series(
+            counts.field("counts").to_numpy(zero_copy_only=False),
+            index=counts.field("values").to_pylist(),
+            dtype="int64",
+        ),
+    )
+
+
+def _ascii_patterns(array: pa.Array) -> pa.Array:
+    """
+    The patterns of ASCII strings, mapping the bytes of the data buffer
+    through _ASCII_PATTERN_TABLE, an order of magnitude faster than the
+    regex replacements.
+    """
+    validity, offsets, data = array.buffers()
+    if data is None:
+        return array
+    mapped = _ASCII_PATTERN_TABLE[np.frombuffer(data, dtype=np.uint8)]
+    return pa.Array.from_buffers(
+        array.type,
+        len(array),
+        [validity, offsets, pa.py_buffer(mapped)],
+        array.null_count,
+        array.offset,
+    )
+
+
+def _to_arrow(series: pd.Series) -> pa.Array:
+    array = pa.array(series, from_pandas=True)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    return array
+
+
+def _to_timestamp(scalar: pa.Scalar, arrow_type) -> pd.Timestamp:
+    timestamp = pd.Timestamp(scalar.value, unit=arrow_type.unit)
+    if arrow_type.tz is not None:
+        timestamp = timestamp.tz_localize("UTC").tz_convert(
+            arrow_type.tz
+        )
+    return timestamp
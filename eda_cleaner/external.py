@@ -0,0 +1,365 @@
+"""
+external.py
+
+External-memory (disk-spilling) duplicate removal for datasets that do
+not fit in RAM.
+
+Rows are hash partitioned into on-disk buckets, so identical rows always
+land in the same bucket. Every bucket is then deduplicated on its own,
+in memory, optionally in parallel worker processes. Buckets that still
+exceed the memory budget are re-partitioned with a different hash key.
+
+Spill files are written as Parquet when pyarrow is available and as
+pickles otherwise, inside a temporary directory that is removed once
+the result has been consumed.
+
+`external_remove_duplicates` deduplicates a frame that is already in
+memory, so it only lowers the peak memory of the deduplication itself.
+`external_dedup_csv` streams a CSV file through the buckets instead, so
+that the rows with duplicates are never all in memory: only a chunk of
+the file and the deduplicated rows are.
+
+Public Functions:
+- external_drop_duplicates(chunks, memory_budget, ...): Streams
+  deduplicated buckets back to the caller.
+- external_remove_duplicates(df, memory_budget, ...): Deduplicates a
+  whole DataFrame, preserving the original row order.
+- external_dedup_csv(csv_file, memory_budget, ...): Loads a CSV file
+  without its duplicate rows, reading it in chunks.
+"""
+
+from .log_setup.setup import setup, logging
+from .utility import parse_size
+from .governor import governed_map
+from .loader import _codec, _decompressed
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+import math
+import os
+import tempfile
+import uuid
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+
+    SPILL_FORMAT = "parquet"
+except ImportError:
+    SPILL_FORMAT = "pickle"
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+ROW_ID = "__row_id__"
+DEFAULT_BUCKETS = 64
+# rows of a CSV file parsed at a time by external_dedup_csv
+CSV_CHUNK_ROWS = 10**6
+# in-memory frames take roughly twice their size while deduplicating
+DEDUP_OVERHEAD = 2
+# pandas only accepts 16 character hash keys
+HASH_KEYS = (
+    "0123456789123456",
+    "eda_cleaner_lvl1",
+    "eda_cleaner_lvl2",
+)
+
+
+def external_drop_duplicates(
+    chunks,
+    memory_budget="1G",
+    n_buckets: int = None,
+    workers: int = 1,
+    tmp_dir: str = None,
+):
+    """
+    Removes duplicate rows from a stream of DataFrame chunks, spilling
+    to disk so that no more than `memory_budget` is held per worker.
+
+    Duplicates are resolved with the 'keep-first' strategy over the
+    concatenation of all chunks.
+
+    Parameters:
+        chunks (pd.DataFrame or iterable of pd.DataFrame): The input rows.
+        memory_budget (int or str): Memory available for deduplication,
+            e.g. '512M' or '4G'. Shared between workers.
+        n_buckets (int, optional): Number of on-disk buckets. Derived from
+            the memory budget when the input is a single DataFrame,
+            defaults to 64 for streamed input.
+        workers (int): Number of processes deduplicating buckets.
+        tmp_dir (str, optional): Parent directory for the spill files.
+
+    Yields:
+        pd.DataFrame: One deduplicated bucket at a time. Each bucket is
+        sorted by, and carries, a `__row_id__` column holding the
+        original row position; buckets are not globally ordered.
+    """
+    budget = parse_size(memory_budget)
+    workers = max(1, workers)
+    if isinstance(chunks, pd.DataFrame):
+        if n_buckets is None:
+            n_buckets = _buckets_for(
+                chunks.memory_usage(deep=True).sum(), budget
+            )
+        chunks = [chunks]
+    n_buckets = n_buckets or DEFAULT_BUCKETS
+
+    with tempfile.TemporaryDirectory(
+        prefix="eda_dedup_", dir=tmp_dir
+    ) as spill_dir:
+        logger.info(
+            "Spilling rows into %s buckets under %s",
+            n_buckets,
+            spill_dir,
+        )
+        bucket_parts = _spill(chunks, n_buckets, spill_dir, level=0)
+        jobs = [
+            (parts, budget // workers, spill_dir, 0)
+            for parts in bucket_parts.values()
+        ]
+        logger.info(
+            "Deduplicating %s buckets with %s worker(s)",
+            len(jobs),
+            workers,
+        )
+        if workers == 1:
+            results = map(_dedup_bucket_star, jobs)
+            for paths in results:
+                yield from map(_read_spill, paths)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for paths in governed_map(
+                    pool, _dedup_bucket_star, jobs, max_workers=workers
+                ):
+                    yield from map(_read_spill, paths)
+
+
+def external_remove_duplicates(
+    df: pd.DataFrame,
+    memory_budget="1G",
+    n_buckets: int = None,
+    workers: int = 1,
+    tmp_dir: str = None,
+) -> pd.DataFrame:
+    """
+    Out-of-core equivalent of `df.drop_duplicates(keep="first")`. As `df`
+    is already in memory, this only bounds the memory of the duplicate
+    removal, see `external_dedup_csv` for files larger than memory.
+
+    Returns:
+        pd.DataFrame: The deduplicated rows, in their original order and
+        with their original index and dtypes.
+    """
+    buckets = list(
+        external_drop_duplicates(
+            df, memory_budget, n_buckets, workers, tmp_dir
+        )
+    )
+    if not buckets:
+        return df.iloc[:0]
+    row_ids = np.sort(
+        np.concatenate([b[ROW_ID].to_numpy() for b in buckets])
+    )
+    return df.iloc[row_ids]
+
+
+def external_dedup_csv(
+    csv_file: str,
+    memory_budget="1G",
+    workers: int = 1,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    tmp_dir: str = None,
+) -> pd.DataFrame:
+    """
+    Loads a CSV file without its duplicate rows ('keep-first'), streaming
+    it through `external_drop_duplicates` one chunk at a time.
+
+    The file is read twice. The first pass only settles the dtype of
+    every column, as pandas infers it for the whole file: a column that
+    is text in some chunks is text everywhere, and one holding integers
+    in some chunks and floats (or missing values) in others is float.
+    The second pass parses the chunks with these dtypes, so equal rows
+    of different chunks hash alike, and spills them.
+
+    Parameters:
+        csv_file (str or Path): Path to the CSV file, compressed files
+            are decompressed on the fly as in `loader.csv_load`.
+        memory_budget (int or str): As in `external_drop_duplicates`.
+        workers (int): Number of processes deduplicating buckets.
+        chunk_rows (int): Rows parsed at a time.
+        tmp_dir (str, optional): Parent directory for the spill files.
+
+    Returns:
+        pd.DataFrame or None: The deduplicated rows in file order, with
+        their row number as index (as `drop_duplicates` leaves it) and
+        the number of rows removed in `attrs["deduplicated"]`, or None
+        if reading failed.
+    """
+    logger.info("Loading %s without duplicate rows", csv_file)
+    try:
+        with _csv_chunks(csv_file, chunk_rows) as chunks:
+            columns, dtype, n_rows = _csv_dtypes(chunks)
+        with _csv_chunks(csv_file, chunk_rows, dtype) as chunks:
+            n_buckets = max(
+                DEFAULT_BUCKETS,
+                _buckets_for(
+                    os.path.getsize(csv_file), parse_size(memory_budget)
+                ),
+            )
+            buckets = list(
+                external_drop_duplicates(
+                    chunks, memory_budget, n_buckets, workers, tmp_dir
+                )
+            )
+    except Exception as e:
+        logger.error(e)
+        return None
+
+    df = (
+        pd.concat(buckets).sort_values(ROW_ID, kind="stable")
+        if buckets
+        else pd.DataFrame(columns=columns + [ROW_ID])
+    )
+    df = df.set_index(ROW_ID).rename_axis(None)
+    removed = n_rows - len(df)
+    logger.info("Removed %d duplicate rows while loading", removed)
+    df.attrs["deduplicated"] = removed
+    return df
+
+
+@contextmanager
+def _csv_chunks(csv_file: str, chunk_rows: int, dtype: dict = None):
+    codec = _codec(csv_file)
+    source = (
+        nullcontext(csv_file)
+        if codec is None
+        else _decompressed(csv_file, codec)
+    )
+    with source as stream:
+        with pd.read_csv(
+            stream, chunksize=chunk_rows, dtype=dtype
+        ) as reader:
+            yield reader
+
+
+def _csv_dtypes(chunks) -> tuple:
+    """
+    The columns of a file, the dtypes to parse its chunks with (for the
+    columns whose inferred dtype differs between chunks) and its number
+    of rows.
+    """
+    kinds, n_rows = {}, 0
+    for chunk in chunks:
+        n_rows += len(chunk)
+        for col, dtype in chunk.dtypes.items():
+            kinds.setdefault(col, set()).add(dtype.kind)
+    dtype = {
+        col: "float64" if kind <= {"i", "u", "f"} else str
+        for col, kind in kinds.items()
+        if len(kind) > 1
+    }
+    return list(kinds), dtype, n_rows
+
+
+def _buckets_for(n_bytes: int, budget: int) -> int:
+    return max(1, math.ceil(n_bytes * DEDUP_OVERHEAD / budget))
+
+
+def _spill(chunks, n_buckets: int, spill_dir: str, level: int) -> dict:
+    """
+    Hash partitions every chunk into `n_buckets` spill files per chunk.
+    Returns a mapping of bucket number to its (path, in-memory bytes)
+    parts, in chunk order.
+    """
+    bucket_parts = {}
+    offset = 0
+    run = uuid.uuid4().hex[:8]
+    for chunk_nr, chunk in enumerate(chunks):
+        if ROW_ID not in chunk.columns:
+            chunk = chunk.reset_index(drop=True)
+            chunk[ROW_ID] = np.arange(offset, offset + len(chunk))
+            offset += len(chunk)
+        data_cols = [c for c in chunk.columns if c != ROW_ID]
+        hashes = pd.util.hash_pandas_object(
+            chunk[data_cols], index=False, hash_key=HASH_KEYS[level]
+        ).to_numpy()
+        buckets = (hashes % np.uint64(n_buckets)).astype(np.int64)
+        order = np.argsort(buckets, kind="stable")
+        bounds = np.cumsum(np.bincount(buckets, minlength=n_buckets))
+        start = 0
+        for bucket, stop in enumerate(bounds):
+            if stop > start:
+                path = os.path.join(
+                    spill_dir,
+                    f"l{level}_{run}_b{bucket:05d}_c{chunk_nr:06d}",
+                )
+                part = chunk.iloc[order[start:stop]]
+                bucket_parts.setdefault(bucket, []).append(
+                    (
+                        _write_spill(part, path),
+                        part.memory_usage(deep=True).sum(),
+                    )
+                )
+            start = stop
+    return bucket_parts
+
+
+def _dedup_bucket_star(args) -> list:
+    return _dedup_bucket(*args)
+
+
+def _dedup_bucket(
+    parts: list, budget: int, spill_dir: str, level: int
+) -> list:
+    """
+    Deduplicates the rows of one bucket and writes them back to disk.
+    Buckets larger than the budget are split again with the next hash
+    key. Returns the paths of the deduplicated spill files.
+    """
+    paths = [path for path, _ in parts]
+    size = sum(n_bytes for _, n_bytes in parts)
+    if size * DEDUP_OVERHEAD > budget and level + 1 < len(HASH_KEYS):
+        sub_parts = _spill(
+            map(_read_spill, paths),
+            _buckets_for(size, budget) + 1,
+            spill_dir,
+            level + 1,
+        )
+        _remove(paths)
+        return [
+            path
+            for sub in sub_parts.values()
+            for path in _dedup_bucket(sub, budget, spill_dir, level + 1)
+        ]
+
+    bucket = pd.concat(map(_read_spill, paths), ignore_index=True)
+    _remove(paths)
+    data_cols = [c for c in bucket.columns if c != ROW_ID]
+    bucket = bucket.sort_values(ROW_ID, kind="stable")
+    bucket = bucket.drop_duplicates(subset=data_cols, keep="first")
+    return [
+        _write_spill(bucket, os.path.splitext(paths[0])[0] + "_dedup")
+    ]
+
+
+def _write_spill(df: pd.DataFrame, path: str) -> str:
+    if SPILL_FORMAT == "parquet":
+        try:
+            df.to_parquet(path + ".parquet", index=False)
+            return path + ".parquet"
+        except Exception:
+            # mixed-type object columns are not representable in Arrow
+            pass
+    df.to_pickle(path + ".pkl")
+    return path + ".pkl"
+
+
+def _read_spill(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def _remove(paths: list) -> None:
+    for path in paths:
+        os.remove(path)
@@ -0,0 +1,411 @@
+"""
+governor.py
+
+Memory governor: keeps a run within a memory budget on nodes whose free
+memory varies, instead of hand-tuned chunk sizes and worker counts.
+
+Before loading, the bytes per row of the dataset are estimated from a
+sample read of its first rows (of a file or of a table), and the chunk
+sizes and worker counts of the run are picked to fit the budget (see
+`plan_memory` and `plan_table_memory`). During the run, a monitor thread
+follows the resident memory (RSS) of the process and of its worker
+processes, and the process pools (the byte ranges of a parallel parse,
+the partitions of the partitioned backend, the buckets of out-of-core
+deduplication, the datasets of a batch) start fewer tasks at a time
+while it is close to the budget, see `governed_map`; the scheduler
+holds back its process stages the same way.
+
+Public Functions:
+- memory_budget(max_memory): The budget in bytes, 'auto' for a share of
+  the available memory.
+- estimate_row_bytes(csv_file, rows): In-memory and on-disk bytes per row
+  of a CSV file, from its first rows.
+- plan_memory(csv_file, budget, read_workers): Chunk sizes and worker
+  counts fitting the budget.
+- estimate_table_rows(uri, table_name, schema, rows): Rows and in-memory
+  bytes per row of a database table.
+- plan_table_memory(uri, table_name, budget, schema): The plan of a
+  database table.
+- start_governor(budget, interval) / stop_governor(): Starts / stops
+  the RSS monitor of the run.
+- current_governor(): The running governor, if any.
+- governed_map(pool, func, *iterables, max_workers): `pool.map`, backing
+  off parallelism under memory pressure.
+"""
+
+from .log_setup.setup import setup, logging
+from concurrent.futures import FIRST_COMPLETED, wait
+from sqlalchemy import text
+import atexit
+import io
+import os
+import threading
+import pandas as pd
+from .loader import RANGE_BYTES, _codec, _decompressed, sql_engine
+from .sampling import _ESTIMATED_ROWS_QUERY
+from .utility import parse_size
+
+try:
+    import psutil
+except ImportError:  # the governor is unavailable
+    psutil = None
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+# share of the available memory taken by --max-memory auto
+AUTO_BUDGET_SHARE = 0.8
+# rows read to estimate the size of a row
+ESTIMATE_ROWS = 10_000
+# the cleaning steps hold a few copies of the frame at their peak
+CLEAN_OVERHEAD = 3
+# a parse worker holds its text, its frame and the pickled frame
+PARSE_OVERHEAD = 3
+MIN_RANGE_BYTES = 4 * 1024**2
+MIN_CHUNK_ROWS = 1_000
+MAX_CHUNK_ROWS = 1_000_000
+# parallelism is reduced from this share of the budget on
+PRESSURE_SHARE = 0.75
+
+_governor = None
+
+
+def memory_budget(max_memory="auto") -> int:
+    """
+    The memory budget of a run, in bytes.
+
+    Args:
+        max_memory (str or int): A size ('4G', '512M') or 'auto', for
+            AUTO_BUDGET_SHARE of the memory available now.
+
+    Raises:
+        ValueError: If the size cannot be parsed.
+        ImportError: For 'auto' without psutil.
+    """
+    if str(max_memory).lower() != "auto":
+        return parse_size(max_memory)
+    if psutil is None:
+        raise ImportError("--max-memory auto requires 'psutil'")
+    return int(psutil.virtual_memory().available * AUTO_BUDGET_SHARE)
+
+
+def estimate_row_bytes(
+    csv_file: str, rows: int = ESTIMATE_ROWS
+) -> tuple:
+    """
+    Estimates the size of a row of a CSV file from its first rows.
+
+    Returns:
+        tuple: Bytes per row in memory (deep, as parsed by pandas) and on
+        disk (uncompressed text).
+    """
+    codec = _codec(csv_file)
+    if codec is None:
+        sample = pd.read_csv(csv_file, nrows=rows)
+    else:
+        with _decompressed(csv_file, codec) as stream:
+            sample = pd.read_csv(stream, nrows=rows)
+    if sample.empty:
+        return 0.0, 0.0
+    text = io.StringIO()
+    sample.to_csv(text, index=False, header=False)
+    return (
+        sample.memory_usage(index=False, deep=True).sum() / len(sample),
+        len(text.getvalue().encode()) / len(sample),
+    )
+
+
+def plan_memory(
+    csv_file: str, budget: int, read_workers: int = 1
+) -> dict:
+    """
+    Picks the chunk sizes and worker counts of a run within `budget`.
+
+    The rows of the file are estimated from its size (unknown for
+    compressed files) and the bytes per row of its first rows. The parse
+    workers get what the loaded frame leaves of the budget; if the cleaning
+    steps may not fit, duplicates are removed out of core.
+
+    Args:
+        csv_file (str): The CSV file of the run.
+        budget (int): Memory budget, in bytes.
+        read_workers (int): Requested parse processes.
+
+    Returns:
+        dict: 'row_bytes', 'rows' and 'frame_bytes' estimates (None if
+        unknown), 'read_workers' and 'range_bytes' of `parallel_csv_load`,
+        'dedup_memory' (None if the frame fits) and 'chunk_rows' of
+        streamed reads.
+    """
+    row_bytes, disk_row_bytes = estimate_row_bytes(csv_file)
+    rows = frame_bytes = None
+    if _codec(csv_file) is None and disk_row_bytes:
+        rows = int(os.path.getsize(csv_file) / disk_row_bytes)
+        frame_bytes = int(rows * row_bytes)
+    # a parse worker holds PARSE_OVERHEAD times its range, as a frame
+    worker_factor = PARSE_OVERHEAD * (
+        row_bytes / disk_row_bytes if disk_row_bytes else 1.0
+    )
+
+    free = max(0, budget - (frame_bytes or 0))
+    range_bytes = int(
+        min(
+            RANGE_BYTES,
+            max(MIN_RANGE_BYTES, free / (read_workers * worker_factor)),
+        )
+    )
+    read_workers = max(
+        1, min(read_workers, int(free / (range_bytes * worker_factor)))
+    )
+    plan = {
+        "row_bytes": round(row_bytes, 1),
+        "rows": rows,
+        "frame_bytes": frame_bytes,
+        "read_workers": read_workers,
+        "range_bytes": range_bytes,
+        **_frame_plan(row_bytes, frame_bytes, budget),
+    }
+    logger.info(
+        "Memory plan for %.0f MB: ~%s bytes per row, %s rows, "
+        "%d parse worker(s) of %d MB%s",
+        budget / 1024**2,
+        plan["row_bytes"],
+        "?" if rows is None else rows,
+        read_workers,
+        range_bytes // 1024**2,
+        ", out-of-core deduplication" if plan["dedup_memory"] else "",
+    )
+    return plan
+
+
+def estimate_table_rows(
+    uri: str,
+    table_name: str,
+    schema: str = None,
+    rows: int = ESTIMATE_ROWS,
+) -> tuple:
+    """
+    Estimates the size of a database table from its first rows.
+
+    Returns:
+        tuple: Rows of the table (the planner's estimate on PostgreSQL,
+        counted elsewhere) and bytes per row in memory (deep, as loaded
+        by pandas).
+    """
+    engine = sql_engine(uri)
+    quote = engine.dialect.identifier_preparer.quote
+    relation = quote(table_name)
+    if schema:
+        relation = f"{quote(schema)}.{relation}"
+    with engine.connect() as conn:
+        n_rows = None
+        if engine.dialect.name == "postgresql":
+            n_rows = conn.execute(
+                text(_ESTIMATED_ROWS_QUERY), {"name": relation}
+            ).scalar()
+        if not n_rows or n_rows <= 0:
+            # never analyzed, or another database
+            n_rows = conn.execute(
+                text(f"SELECT COUNT(*) FROM {relation}")
+            ).scalar()
+        sample = pd.read_sql(
+            text(f"SELECT * FROM {relation} LIMIT {int(rows)}"), conn
+        )
+    if sample.empty:
+        return int(n_rows), 0.0
+    return (
+        int(n_rows),
+        sample.memory_usage(index=False, deep=True).sum() / len(sample),
+    )
+
+
+def plan_table_memory(
+    uri: str, table_name: str, budget: int, schema: str = None
+) -> dict:
+    """
+    The plan of a run on a database table, as `plan_memory`: the table
+    is loaded by one process, so only 'dedup_memory' and 'chunk_rows'
+    (of sampled reads) depend on the budget.
+    """
+    rows, row_bytes = estimate_table_rows(uri, table_name, schema)
+    frame_bytes = int(rows * row_bytes)
+    plan = {
+        "row_bytes": round(row_bytes, 1),
+        "rows": rows,
+        "frame_bytes": frame_bytes,
+        "read_workers": 1,
+        "range_bytes": RANGE_BYTES,
+        **_frame_plan(row_bytes, frame_bytes, budget),
+    }
+    logger.info(
+        "Memory plan for %.0f MB: ~%s bytes per row, %s rows%s",
+        budget / 1024**2,
+        plan["row_bytes"],
+        rows,
+        ", out-of-core deduplication" if plan["dedup_memory"] else "",
+    )
+    return plan
+
+
+def _frame_plan(
+    row_bytes: float, frame_bytes: int, budget: int
+) -> dict:
+    """
+    'dedup_memory' (None if the cleaning steps fit) and 'chunk_rows' of
+    a frame of `frame_bytes` (None if unknown).
+    """
+    fits = frame_bytes is None or frame_bytes * CLEAN_OVERHEAD <= budget
+    if frame_bytes is not None and frame_bytes > budget:
+        logger.warning(
+            "The dataset needs ~%.0f MB in memory, above the budget "
+            "of %.0f MB, consider --sample",
+            frame_bytes / 1024**2,
+            budget / 1024**2,
+        )
+    return {
+        "dedup_memory": None if fits else budget // 2,
+        "chunk_rows": (
+            min(
+                MAX_CHUNK_ROWS,
+                max(MIN_CHUNK_ROWS, int(budget / (10 * row_bytes))),
+            )
+            if row_bytes
+            else MAX_CHUNK_ROWS
+        ),
+    }
+
+
+class MemoryGovernor:
+    """
+    Follows the RSS of the process and of its children on a background
+    thread, and tells process pools how many tasks they may run.
+    """
+
+    def __init__(self, budget: int, interval: float = 0.5):
+        if psutil is None:
+            raise ImportError("The memory governor requires 'psutil'")
+        self.budget = budget
+        self.interval = interval
+        self.peak = 0
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._monitor, daemon=True
+        )
+        self._over = False
+
+    def rss(self) -> int:
+        """Resident memory of the process and of its worker processes."""
+        total = self._process.memory_info().rss
+        for child in self._process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:  # exited meanwhile
+                pass
+        self.peak = max(self.peak, total)
+        return total
+
+    def allowed(self, requested: int) -> int:
+        """
+        Tasks a pool may run at the same time: `requested` up to
+        PRESSURE_SHARE of the budget, then fewer down to 1 at the budget.
+        """
+        rss = self.rss()
+        soft = self.budget * PRESSURE_SHARE
+        if rss <= soft:
+            return requested
+        room = max(0.0, (self.budget - rss) / (self.budget - soft))
+        return max(1, int(requested * room))
+
+    def start(self) -> "MemoryGovernor":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        logger.info(
+            "Peak memory %.0f MB of a %.0f MB budget",
+            self.peak / 1024**2,
+            self.budget / 1024**2,
+        )
+
+    def _monitor(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = self.rss()
+            over = rss > self.budget
+            if over and not self._over:
+                logger.warning(
+                    "Memory use %.0f MB is above the budget of %.0f MB",
+                    rss / 1024**2,
+                    self.budget / 1024**2,
+                )
+            self._over = over
+
+
+def start_governor(
+    budget: int, interval: float = 0.5
+) -> MemoryGovernor:
+    """Starts the governor of the run, replacing any previous one."""
+    global _governor
+    stop_governor()
+    _governor = MemoryGovernor(budget, interval).start()
+    atexit.register(stop_governor)
+    return _governor
+
+
+def stop_governor() -> None:
+    """Stops the governor of the run, if any, logging its peak."""
+    global _governor
+    if _governor is not None:
+        _governor.stop()
+        _governor = None
+
+
+def current_governor() -> MemoryGovernor:
+    """The running governor, None without --max-memory."""
+    return _governor
+
+
+def governed_map(pool, func, *iterables, max_workers: int):
+    """
+    Like `pool.map`, but tasks are submitted as earlier ones finish: at
+    most `max_workers` run at the same time, fewer while the governor
+    reports memory pressure, so inputs and results of waiting tasks are
+    not held in memory either. Without a governor, it runs `max_workers`
+    tasks at a time.
+
+    Yields:
+        The results, in the order of the inputs.
+    """
+    tasks = iter(enumerate(zip(*iterables)))
+    running, results = {}, {}
+    next_result = 0
+    exhausted = False
+    limit = max_workers
+    while True:
+        if _governor is not None:
+            allowed = _governor.allowed(max_workers)
+            if allowed < limit:
+                logger.info(
+                    "Memory pressure, running %s of %s tasks at a time",
+                    allowed,
+                    max_workers,
+                )
+            limit = allowed
+        while not exhausted and len(running) < limit:
+            try:
+                i, args = next(tasks)
+            except StopIteration:
+                exhausted = True
+                break
+            running[pool.submit(func, *args)] = i
+        if not running:
+            return
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[running.pop(future)] = future.result()
+        while next_result in results:
+            yield results.pop(next_result)
+            next_result += 1
@@ -0,0 +1,135 @@
+"""
+kernels.py
+
+Single-pass column statistics for the profiler and cleaner hot loops.
+
+`column_stats` computes the non-null count, missing count, minimum,
+maximum, sum, sum of squares, whether every value is 0 or 1 and whether
+every value is a whole number in one pass over the raw values and
+validity mask of a numeric column (no intermediate `dropna()` copies).
+The loop is compiled with numba when it is installed; otherwise the same
+statistics are computed with NumPy, in a few vectorized passes.
+
+Public Functions:
+- column_stats(series): Fused statistics of a numeric column.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+except ImportError:  # statistics are computed with NumPy instead
+    numba = None
+
+HAVE_NUMBA = numba is not None
+
+
+def column_stats(series: pd.Series) -> dict:
+    """
+    Computes the statistics of a numeric or boolean column in one pass.
+
+    Args:
+        series (pd.Series): A numpy or nullable (masked) numeric column.
+
+    Returns:
+        dict or None: 'count', 'missing', 'min', 'max' (in the column's
+        scalar type, None when there are no values), 'sum' and 'sum_sq'
+        (float), 'binary' (all values in {0, 1}) and 'integral' (all
+        values whole). None if the column is not numeric.
+    """
+    split = _values_and_mask(series)
+    if split is None:
+        return None
+    values, mask = split
+    scalar = values.dtype.type
+    if values.dtype.kind == "b":
+        values = values.view(np.int8)
+    if HAVE_NUMBA:
+        stats = _fused_stats(values, mask)
+    else:
+        stats = _numpy_stats(values, mask)
+    count, low, high, total, total_sq, binary, integral = stats
+    return {
+        "count": int(count),
+        "missing": int(len(values) - count),
+        "min": scalar(low) if count else None,
+        "max": scalar(high) if count else None,
+        "sum": float(total),
+        "sum_sq": float(total_sq),
+        "binary": bool(binary),
+        "integral": bool(integral),
+    }
+
+
+def _values_and_mask(series: pd.Series):
+    """The raw values and missing mask, without copying masked arrays."""
+    array = series.array
+    if hasattr(array, "_data") and hasattr(array, "_mask"):
+        values, mask = array._data, array._mask
+    elif series.dtype.kind in "biuf":
+        values, mask = series.to_numpy(), np.zeros(0, dtype=bool)
+    else:
+        return None
+    if values.dtype.kind not in "biuf":
+        return None
+    return values, mask
+
+
+def _numpy_stats(values: np.ndarray, mask: np.ndarray) -> tuple:
+    if len(mask):
+        values = values[~mask]
+    if values.dtype.kind == "f":
+        values = values[~np.isnan(values)]
+    if not len(values):
+        return 0, 0, 0, 0.0, 0.0, True, True
+    as_float = values.astype(np.float64, copy=False)
+    return (
+        len(values),
+        values.min(),
+        values.max(),
+        as_float.sum(),
+        np.dot(as_float, as_float),
+        bool(((values == 0) | (values == 1)).all()),
+        values.dtype.kind != "f"
+        or bool((np.mod(values, 1) == 0).all()),
+    )
+
+
+def _stats_loop(values, mask):
+    """One pass over the values, skipping masked and NaN entries."""
+    has_mask = len(mask) > 0
+    count = 0
+    low = values[0] if len(values) else 0
+    high = low
+    total = 0.0
+    total_sq = 0.0
+    binary = True
+    integral = True
+    for i in range(len(values)):
+        if has_mask and mask[i]:
+            continue
+        value = values[i]
+        as_float = np.float64(value)
+        if as_float != as_float:
+            continue
+        if count == 0 or value < low:
+            low = value
+        if count == 0 or value > high:
+            high = value
+        count += 1
+        total += as_float
+        total_sq += as_float * as_float
+        if as_float != 0.0 and as_float != 1.0:
+            binary = False
+        # infinities are not whole numbers, inf - floor(inf) is NaN
+        if integral and not as_float - np.floor(as_float) == 0.0:
+            integral = False
+    return count, low, high, total, total_sq, binary, integral
+
+
+_fused_stats = (
+    numba.njit(cache=True, nogil=True)(_stats_loop)
+    if HAVE_NUMBA
+    else None
+)
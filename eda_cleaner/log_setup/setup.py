@@ -3,8 +3,17 @@ setup.py
 
 Provides flexible logging setup for console and file output.
 
+By default every module logger gets its own handlers. `setup_queue` switches
+the whole package to a single QueueHandler on the 'eda_cleaner' logger,
+drained by a QueueListener thread that formats and writes the records, so
+the pipeline only pays for putting records on a queue. Records below the
+chosen verbosity are dropped before any formatting.
+
 Public Functions:
 - setup(logger, mode='c', filename='default.log', filemode='a'): Sets up logging based on a simple mode string.
+- setup_queue(verbosity='normal', json_format=False, stream=None): Routes all package logging through one background thread.
+- stop_queue(): Flushes the queue and stops its listener thread.
+- banner(): Prints the '*' separator line between pipeline steps.
 
 Private Functions:
 - setup_console_handler(logger): Adds a console handler with INFO level.
@@ -12,7 +21,30 @@ Private Functions:
 - setup_file_and_console_handler(logger, filename, filemode): Adds both handlers.
 """
 
+import atexit
+import json
 import logging
+import multiprocessing.util
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+PACKAGE_LOGGER = "eda_cleaner"
+# 'normal' logs one summary per step, 'verbose' every column as well
+VERBOSITY_LEVELS = {
+    "quiet": logging.WARNING,
+    "normal": logging.INFO,
+    "verbose": logging.DEBUG,
+}
+BANNER = "*" * 90
+CONSOLE_FORMAT = "%(asctime)s - %(message)s"
+CONSOLE_DATEFMT = "%H:%M"
+
+# handlers attached by `setup`, removed when switching to the queue
+_module_handlers = []
+_queue_handler = None
+_listener = None
 
 
 def setup_console_handler(logger: logging.Logger) -> None:
@@ -24,10 +56,11 @@ def setup_console_handler(logger: logging.Logger) -> None:
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     formatter = logging.Formatter(
-        "%(asctime)s - %(message)s", datefmt="%H:%M"
+        CONSOLE_FORMAT, datefmt=CONSOLE_DATEFMT
     )
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
+    _module_handlers.append((logger, console_handler))
 
 
 def setup_file_handler(
@@ -47,6 +80,7 @@ def setup_file_handler(
     )
     file_handler.setFormatter(formatter)
     logger.addHandler(file_handler)
+    _module_handlers.append((logger, file_handler))
 
 
 def setup_file_and_console_handler(
@@ -84,7 +118,14 @@ def setup(
 
     Raises:
         ValueError: If mode is not one of ['c', 'f', 'fc'].
+
+    Note:
+        Once `setup_queue` is active, loggers get no handlers of their own
+        and inherit the queue of the package logger instead.
     """
+    if _queue_handler is not None:
+        logger.setLevel(logging.NOTSET)
+        return
     if mode == "c":  # Console only
         setup_console_handler(logger)
     elif mode == "f":  # File only
@@ -95,3 +136,134 @@ def setup(
         raise ValueError(f"Unsupported logging mode: {mode}")
 
     logger.setLevel(logging.DEBUG)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats every record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """The console format, banners printed as they are."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "banner", False):
+            return record.getMessage()
+        return super().format(record)
+
+
+class _LazyQueueHandler(QueueHandler):
+    """
+    Queues records as they are: the message is merged with its arguments
+    by the listener thread, not by the logging call. Records never leave
+    the process, so they need not be made picklable.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_queue(
+    verbosity: str = "normal", json_format: bool = False, stream=None
+) -> None:
+    """Routes the records of all package loggers through one queue.
+
+    The handlers attached by `setup` are removed; a single QueueHandler on
+    the 'eda_cleaner' logger hands records to a QueueListener thread that
+    writes them to `stream`. Forked worker processes start a listener of
+    their own. Calling it again replaces the previous configuration.
+
+    Args:
+        verbosity (str, optional): One of VERBOSITY_LEVELS: 'quiet'
+            (warnings and errors), 'normal' (one summary per step, default)
+            or 'verbose' (every column).
+        json_format (bool, optional): Write one JSON object per record
+            instead of the console format, without banners.
+        stream (optional): Output stream, stderr by default.
+
+    Raises:
+        ValueError: If verbosity is not one of VERBOSITY_LEVELS.
+    """
+    global _queue_handler
+    if verbosity not in VERBOSITY_LEVELS:
+        raise ValueError(f"Unsupported verbosity: {verbosity}")
+    stop_queue()
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    if json_format:
+        handler.setFormatter(JsonFormatter())
+        handler.addFilter(
+            lambda record: not getattr(record, "banner", False)
+        )
+    else:
+        handler.setFormatter(
+            _ConsoleFormatter(CONSOLE_FORMAT, datefmt=CONSOLE_DATEFMT)
+        )
+
+    for logger, module_handler in _module_handlers:
+        logger.removeHandler(module_handler)
+        logger.setLevel(logging.NOTSET)
+    _module_handlers.clear()
+
+    package_logger = logging.getLogger(PACKAGE_LOGGER)
+    package_logger.setLevel(VERBOSITY_LEVELS[verbosity])
+    package_logger.propagate = False
+    _queue_handler = _LazyQueueHandler(queue.SimpleQueue())
+    package_logger.addHandler(_queue_handler)
+    _start_listener(handler)
+
+
+def stop_queue() -> None:
+    """Writes the queued records and removes the queue, if active."""
+    global _queue_handler, _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger(PACKAGE_LOGGER).removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def banner() -> None:
+    """Prints the separator line, through the log queue when active."""
+    if _queue_handler is None:
+        print(BANNER)
+    else:
+        logging.getLogger(PACKAGE_LOGGER).info(
+            BANNER, extra={"banner": True}
+        )
+
+
+def _start_listener(handler: logging.Handler) -> None:
+    global _listener
+    _listener = QueueListener(
+        _queue_handler.queue, handler, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def _restart_in_child() -> None:
+    """The listener thread is not forked, a child needs its own."""
+    global _listener
+    if _listener is None:
+        return
+    handlers = _listener.handlers
+    _queue_handler.queue = queue.SimpleQueue()
+    _start_listener(*handlers)
+    # worker processes end with os._exit, which skips atexit
+    multiprocessing.util.Finalize(None, stop_queue, exitpriority=100)
+
+
+atexit.register(stop_queue)
+os.register_at_fork(after_in_child=_restart_in_child)
@@ -0,0 +1,783 @@
+"""
+partitioned.py
+
+Partitioned, multi-process execution backend for the cleaning pipeline
+and the statistical summary.
+
+The input is split into row partitions that are processed by a local
+process pool. Workers do the per-row work (row hashing, dtype inference
+and casting, partial statistics) and return small partial results that
+are reduced in the parent process:
+- duplicates are resolved globally from the row hashes of all partitions
+- nullable and EDA dtypes are decided once per column from the
+  per-partition observations, so every partition ends up with the same
+  dtype
+- summary statistics are merged into the same dictionary that
+  `profiler.generate_summary` produces
+
+The steps that need every value of a column at once (number recovery,
+imputation, downcasting) then run over groups of whole columns, which
+the workers map from shared memory. Under --max-memory, fewer
+partitions (or column groups) are processed at a time when memory use
+gets close to the budget (see `governor.governed_map`).
+
+Public Functions:
+- partitioned_clean_pipeline(df, workers): Parallel `clean_pipeline`.
+- partitioned_generate_summary(df, workers): Parallel `generate_summary`.
+"""
+
+from .log_setup.setup import setup, logging, banner
+from .cleaner import (
+    standardize_column_names,
+    _MAX_LOGGED_RENAMES,
+    _NUMERIC_MIN_RATE,
+    _downcast_column,
+    _dtype_counts,
+    _handle_missing,
+    _id_column_mask,
+    _recover_column,
+    _validate_binary_col,
+)
+from .engines import get_engine
+from collections import Counter
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+import pandas as pd
+import pandas.api.types as pd_types
+from .timeseries import bucket_counts, merge_bucket_counts, choose_freq
+from .sketches import space_saving, space_saving_merge
+from .strings import (
+    TOP_PATTERNS,
+    format_string_profile,
+    merge_string_profiles,
+    string_profile,
+)
+from .dates import infer_format, parse_datetimes
+from .sampling import annotate_summary
+from .shm import attached, shared_frame
+from .governor import governed_map
+from .profiler import (
+    _format_top_values,
+    _format_value_counts,
+    _value_counts,
+    missing_value_key,
+)
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+# mirrors the cut-off in cleaner._is_categorical
+CATEGORICAL_MAX_UNIQUE = 13
+
+
+def partitioned_clean_pipeline(
+    df: pd.DataFrame,
+    workers: int = None,
+    downcast: bool = False,
+    category_ratio: float = 0.5,
+    recover_numbers: bool = True,
+    engine: str = "pandas",
+) -> pd.DataFrame:
+    """
+    Runs the cleaning pipeline in a process pool: duplicate removal and
+    the nullable coercion over row partitions of `df`, the steps that
+    work column by column over groups of whole columns. The result
+    matches `cleaner.clean_pipeline(df)`.
+
+    Parameters:
+        df (pd.DataFrame): The input DataFrame to be cleaned.
+        workers (int, optional): Number of worker processes. Defaults to
+            the number of CPUs.
+        downcast (bool): Whether to run `cleaner.downcast_types` last.
+        category_ratio (float): Cardinality ratio cut-off for categories
+            in `cleaner.downcast_types`.
+        recover_numbers (bool): Whether to run
+            `cleaner.recover_numeric_strings`.
+        engine (str): Compute engine for name normalization and number
+            recovery, 'pandas' or 'arrow' (see engines/).
+
+    Returns:
+        pd.DataFrame: The cleaned DataFrame.
+    """
+    workers = workers or os.cpu_count()
+    banner()
+    df = standardize_column_names(df, engine)
+    banner()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        df = _remove_duplicates(df, workers, pool)
+        banner()
+        df, eda_stats = _coerce_nullable_data_types(df, workers, pool)
+        banner()
+        df = _clean_columns(
+            df,
+            eda_stats,
+            workers,
+            pool,
+            engine=engine,
+            recover_numbers=recover_numbers,
+            downcast=downcast,
+            category_ratio=category_ratio,
+        )
+    return df
+
+
+def partitioned_generate_summary(
+    df: pd.DataFrame,
+    workers: int = None,
+    top_k: int = None,
+    engine: str = "pandas",
+) -> dict:
+    """
+    Computes partial statistics over row partitions of `df` in a process
+    pool and merges them into the dictionary `generate_summary` returns.
+
+    Parameters:
+        df (pd.DataFrame): The cleaned DataFrame.
+        workers (int, optional): Number of worker processes. Defaults to
+            the number of CPUs.
+        top_k (int, optional): As in `generate_summary`. The Space-Saving
+            sketches of the partitions are merged.
+        engine (str): Compute engine of the string profiles.
+
+    Returns:
+        dict: Column names mapped to dictionaries of summary statistics.
+    """
+    workers = workers or os.cpu_count()
+    banner()
+    logger.info(
+        "Generating statistical summary over %s partitions", workers
+    )
+    # the workers map their rows of the frame from shared memory
+    starts, stops = zip(*_bounds(len(df), workers))
+    with shared_frame(df) as frame, ProcessPoolExecutor(
+        max_workers=workers
+    ) as pool:
+        partials = list(
+            governed_map(
+                pool,
+                functools.partial(
+                    _summarize_shared, frame, top_k=top_k, engine=engine
+                ),
+                starts,
+                stops,
+                max_workers=workers,
+            )
+        )
+
+    summary = {}
+    summary["_dataset_"] = dict(
+        rows=df.shape[0],
+        columns=df.shape[1],
+        total_nr_of_cells=df.size,
+        total_missing_values=sum(
+            p[col]["missing"] for p in partials for col in p
+        ),
+        column_names=[col for col in df.columns],
+        dtypes=[dtype.name for dtype in df.dtypes],
+        memory_usage=str(round(df.memory_usage().sum() / 10**6, 2))
+        + " MB's",
+    )
+    for report in ("numeric_recovery", "memory_report"):
+        if report in df.attrs:
+            summary["_dataset_"][report] = df.attrs[report]
+    for col in df.columns:
+        summary[col] = _merge_column_summaries(
+            df[col].dtype, [p[col] for p in partials], top_k
+        )
+    if "sampling" in df.attrs:
+        annotate_summary(summary, df, df.attrs["sampling"])
+    logger.info("Finished generating summary")
+    return summary
+
+
+def _split(df: pd.DataFrame, n_parts: int) -> list:
+    """Splits `df` into at most `n_parts` contiguous row partitions."""
+    return [
+        df.iloc[start:stop] for start, stop in _bounds(len(df), n_parts)
+    ]
+
+
+def _bounds(n_rows: int, n_parts: int) -> list:
+    """Start and stop rows of at most `n_parts` contiguous partitions."""
+    bounds = np.linspace(0, n_rows, min(n_parts, n_rows) + 1)
+    bounds = bounds.astype(int)
+    return list(zip(bounds, bounds[1:])) or [(0, n_rows)]
+
+
+def _remove_duplicates(
+    df: pd.DataFrame, workers: int, pool: ProcessPoolExecutor
+) -> pd.DataFrame:
+    """
+    Global 'keep-first' duplicate removal. Row hashes are computed in the
+    workers, only rows sharing a hash are compared exactly.
+    """
+    logger.info("Removing duplicate rows")
+    logger.info("%s rows before operation", df.shape[0])
+    try:
+        hashes = np.concatenate(
+            list(
+                governed_map(
+                    pool,
+                    _hash_rows,
+                    _split(df, workers),
+                    max_workers=workers,
+                )
+            )
+        )
+    except TypeError:
+        logger.error(
+            "Dataset contains unhashable type columns, cannot remove rows based on full row duplication."
+        )
+        return df
+
+    candidates = pd.Series(hashes).duplicated(keep=False).to_numpy()
+    duplicated = np.zeros(len(df), dtype=bool)
+    if candidates.any():
+        duplicated[candidates] = (
+            df.iloc[candidates].duplicated(keep="first").to_numpy()
+        )
+    no_dup_df = df.iloc[~duplicated]
+    logger.info("%s rows removed", df.shape[0] - no_dup_df.shape[0])
+    logger.info("%s rows remaining.", no_dup_df.shape[0])
+    return no_dup_df
+
+
+def _hash_rows(part: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(part, index=False).to_numpy()
+
+
+def _coerce_nullable_data_types(
+    df: pd.DataFrame, workers: int, pool: ProcessPoolExecutor
+) -> tuple:
+    """
+    Partitioned `cleaner.coerce_nullable_data_types`. Each worker casts
+    its partition using the locally inferred types; partitions whose
+    local decision differs from the global one are recast from the
+    source rows.
+
+    Returns:
+        tuple: The casted DataFrame and the merged per-column statistics
+        needed to decide the EDA types.
+    """
+    logger.info("Converting columns to nullable data types")
+    # one datetime format per column, so that all partitions agree on it
+    formats = {
+        col: _infer_format(df[col], col)
+        for col in df.columns
+        if df[col].dtype == object
+    }
+    parts = _split(df, workers)
+    results = list(
+        governed_map(
+            pool,
+            functools.partial(_cast_partition, formats=formats),
+            parts,
+            max_workers=workers,
+        )
+    )
+
+    targets = {
+        col: _reduce_target(
+            [observations[col] for _, observations, _ in results]
+        )
+        for col in df.columns
+    }
+    casted_parts = []
+    eda_stats = {col: [] for col in df.columns}
+    for part, (casted, observations, stats) in zip(parts, results):
+        for col, target in targets.items():
+            if observations[col][0] != target:
+                casted[col] = (
+                    parse_datetimes(part[col], formats[col])
+                    if target == "datetime64[ns]"
+                    else part[col].astype(target)
+                )
+                stats[col] = _eda_stats(casted[col])
+            eda_stats[col].append(stats[col])
+        casted_parts.append(casted)
+    for col, target in targets.items():
+        logger.debug("Changed %s to %s", col, target)
+
+    nullable_df = pd.concat(casted_parts)
+    logger.info("Column types: %s", _dtype_counts(nullable_df.dtypes))
+    logger.info("Finished converting columns to nullable data types")
+    return nullable_df, {
+        col: _merge_eda_stats(stats) for col, stats in eda_stats.items()
+    }
+
+
+def _cast_partition(part: pd.DataFrame, formats: dict) -> tuple:
+    """
+    Worker side of the nullable coercion. Returns the casted partition,
+    per-column (target dtype, inferred kind) observations and the EDA
+    statistics of the casted columns.
+    """
+    casted = pd.DataFrame(index=part.index)
+    observations = {}
+    stats = {}
+    for col in part.columns:
+        series = part[col]
+        non_null_series = series.dropna()
+        kind = (
+            None
+            if non_null_series.empty
+            else pd.api.types.infer_dtype(non_null_series, skipna=True)
+        )
+        target, casted[col] = _local_cast(
+            series, kind, formats.get(col)
+        )
+        observations[col] = (target, kind)
+        stats[col] = _eda_stats(casted[col])
+    return casted, observations, stats
+
+
+def _local_cast(series: pd.Series, kind: str, fmt: str = None) -> tuple:
+    """
+    Same decision tree as `cleaner.coerce_nullable_data_types`, with the
+    datetime format inferred for the whole column (None if not dates).
+    """
+    if kind in {"integer"}:
+        return "Int64", series.astype("Int64")
+    if kind in {"floating"}:
+        try:
+            return "Int64", series.astype("Int64")
+        except (TypeError, ValueError):
+            return "Float64", series.astype("Float64")
+    if kind in {"boolean"}:
+        return "boolean", series.astype("boolean")
+    if kind in {"string", "unicode", "datetime"}:
+        try:
+            if fmt is None:
+                raise ValueError("Not a datetime column")
+            return "datetime64[ns]", parse_datetimes(series, fmt)
+        except ValueError:
+            return "string", series.astype("string")
+    return "object", series.astype("object")
+
+
+def _infer_format(series: pd.Series, column: str) -> str:
+    """`dates.infer_format`, None for columns that are not dates."""
+    try:
+        return infer_format(series, column)
+    except ValueError:
+        return None
+
+
+def _reduce_target(observations: list) -> str:
+    """
+    Decides the global nullable dtype of a column from the partition
+    observations. Partitions with only missing values carry no vote.
+    """
+    votes = [(t, k) for t, k in observations if k is not None]
+    if not votes:
+        return "object"
+    targets = {t for t, _ in votes}
+    kinds = {k for _, k in votes}
+    if len(targets) == 1 and (
+        len(kinds) == 1 or kinds <= {"string", "unicode", "datetime"}
+    ):
+        return targets.pop()
+    if kinds == {"floating"}:
+        # some partitions hold fractional values
+        return "Float64"
+    if kinds <= {"string", "unicode", "datetime"}:
+        # some partitions failed to parse as dates
+        return "string"
+    return "object"
+
+
+def _eda_stats(series: pd.Series) -> dict:
+    """
+    Partition statistics needed by the EDA type rules: up to
+    CATEGORICAL_MAX_UNIQUE distinct values and up to three distinct
+    lower-cased string values. None marks an overflow.
+    """
+    non_null = series.dropna()
+    try:
+        uniques = non_null.unique()
+        uniques = (
+            set(uniques)
+            if len(uniques) < CATEGORICAL_MAX_UNIQUE
+            else None
+        )
+    except TypeError:
+        uniques = None
+    lowered = None
+    if pd_types.is_string_dtype(series):
+        lowered = set(non_null.apply(str).str.lower().unique())
+        lowered = lowered if len(lowered) <= 2 else None
+    return {"uniques": uniques, "lowered": lowered}
+
+
+def _merge_eda_stats(stats: list) -> dict:
+    uniques, lowered = set(), set()
+    for s in stats:
+        if uniques is not None:
+            uniques = (
+                None if s["uniques"] is None else uniques | s["uniques"]
+            )
+            if uniques is not None and (
+                len(uniques) >= CATEGORICAL_MAX_UNIQUE
+            ):
+                uniques = None
+        if lowered is not None:
+            lowered = (
+                None if s["lowered"] is None else lowered | s["lowered"]
+            )
+            if lowered is not None and len(lowered) > 2:
+                lowered = None
+    return {"uniques": uniques, "lowered": lowered}
+
+
+def _clean_columns(
+    df: pd.DataFrame,
+    eda_stats: dict,
+    workers: int,
+    pool: ProcessPoolExecutor,
+    **options,
+) -> pd.DataFrame:
+    """
+    Partitioned number recovery, EDA coercion, missing value handling
+    and downcasting. These decide every column from all of its values,
+    so the workers take groups of whole columns, mapped from shared
+    memory, and the parent only logs and reports their results.
+    """
+    if df.shape[1] == 0:
+        return df
+    groups = [
+        list(group)
+        for group in np.array_split(
+            np.array(df.columns, dtype=object), workers
+        )
+        if len(group)
+    ]
+    with shared_frame(df) as frame:
+        results = list(
+            governed_map(
+                pool,
+                functools.partial(
+                    _clean_column_group, frame, **options
+                ),
+                groups,
+                [
+                    {col: eda_stats[col] for col in group}
+                    for group in groups
+                ],
+                max_workers=workers,
+            )
+        )
+
+    cleaned = pd.concat([part for part, _ in results], axis=1)
+    cleaned.index = df.index
+    reports = {
+        key: {
+            col: entry
+            for _, report in results
+            for col, entry in report[key].items()
+        }
+        for key in results[0][1]
+    }
+    if options["recover_numbers"]:
+        logger.info(
+            "Recovered %d columns of numbers as text",
+            len(reports["numeric_recovery"]),
+        )
+        if reports["numeric_recovery"]:
+            cleaned.attrs["numeric_recovery"] = reports[
+                "numeric_recovery"
+            ]
+    logger.info(
+        "Changed %d columns, to %s",
+        len(reports["eda_types"]),
+        _dtype_counts(pd.Series(reports["eda_types"], dtype=object)),
+    )
+    dropped = [
+        col
+        for col, action in reports["missing"].items()
+        if action == "dropped"
+    ]
+    logger.info(
+        "Dropped %d columns with most values missing, imputed %d",
+        len(dropped),
+        len(reports["missing"]) - len(dropped),
+    )
+    if dropped:
+        logger.info(
+            "Dropped: %s",
+            ", ".join(map(str, dropped[:_MAX_LOGGED_RENAMES])),
+        )
+    if options["downcast"]:
+        memory_report = reports["memory_report"]
+        total_before, total_after = (
+            sum(r[key] for r in memory_report.values()) / 10**6
+            for key in ("bytes_before", "bytes_after")
+        )
+        logger.info(
+            "Memory usage reduced from %s to %s MB's",
+            round(total_before, 2),
+            round(total_after, 2),
+        )
+        cleaned.attrs["memory_report"] = memory_report
+    logger.info("Finished cleaning columns")
+    return cleaned
+
+
+def _clean_column_group(
+    frame,
+    columns: list,
+    eda_stats: dict,
+    engine: str = "pandas",
+    recover_numbers: bool = True,
+    downcast: bool = False,
+    category_ratio: float = 0.5,
+) -> tuple:
+    """
+    Worker side of `_clean_columns`, for the whole `columns` of a shared
+    frame. Returns the cleaned columns, which the parent indexes, and
+    the reports of the steps: recovered numbers, the EDA types columns
+    were changed to, columns dropped or imputed and the memory report of
+    the downcast.
+    """
+    with attached(frame, columns) as mapped:
+        # nothing may point into the mapping after the block
+        part = mapped.copy(deep=True)
+        del mapped
+    reports = {
+        "numeric_recovery": {},
+        "eda_types": {},
+        "missing": {},
+        "memory_report": {},
+    }
+    id_like_names = dict(zip(columns, _id_column_mask(part.columns)))
+    if recover_numbers:
+        parse = get_engine(engine).parse_numeric_text
+        for col in columns:
+            if id_like_names[col] or part[col].dtype.name not in {
+                "string"
+            }:
+                continue
+            recovered = _recover_column(
+                part[col], parse, _NUMERIC_MIN_RATE
+            )
+            if recovered is None:
+                continue
+            part[col], rate = recovered
+            eda_stats[col] = _eda_stats(part[col])
+            reports["numeric_recovery"][col] = {
+                "dtype": part[col].dtype.name,
+                "conversion_rate": round(float(rate), 4),
+            }
+    for col in columns:
+        casted = _eda_cast(
+            part[col], id_like_names[col], eda_stats[col]
+        )
+        if casted is not None:
+            part[col] = casted
+            reports["eda_types"][col] = casted.dtype.name
+    for col in columns:
+        action, series = _handle_missing(part[col])
+        if action == "dropped":
+            part = part.drop(col, axis=1)
+        elif action == "imputed":
+            part[col] = series
+        if action is not None:
+            reports["missing"][col] = action
+    if downcast:
+        for col in part.columns:
+            part[col], reports["memory_report"][col] = _downcast_column(
+                part[col], category_ratio, 0.0
+            )
+    return part, reports
+
+
+def _eda_cast(series: pd.Series, id_like_name: bool, stats: dict):
+    """
+    `cleaner.coerce_eda_types` for one column, driven by its merged
+    partition statistics instead of a scan of the column. None when the
+    column keeps its type.
+    """
+    uniques, lowered = stats["uniques"], stats["lowered"]
+    if id_like_name and pd_types.is_numeric_dtype(series):
+        logger.debug("Changed %s from numeric to string", series.name)
+        return series.astype("string")
+    if (
+        pd_types.is_string_dtype(series)
+        and lowered is not None
+        and len(lowered) == 2
+    ):
+        return _validate_binary_col(series)
+    if (
+        pd_types.is_integer_dtype(series)
+        and uniques is not None
+        and uniques <= {0, 1}
+    ):
+        logger.debug("Changed %s from numeric to boolean", series.name)
+        return series.astype("boolean")
+    if uniques is not None:
+        logger.debug("Changed %s to category data type", series.name)
+        return series.astype("category")
+    return None
+
+
+def _summarize_shared(
+    frame,
+    start: int,
+    stop: int,
+    top_k: int = None,
+    engine: str = "pandas",
+) -> dict:
+    """Worker side of the summary, over rows of a shared frame."""
+    with attached(frame, start=start, stop=stop) as part:
+        return _summarize_partition(part, top_k, engine)
+
+
+def _summarize_partition(
+    part: pd.DataFrame, top_k: int = None, engine: str = "pandas"
+) -> dict:
+    """Worker side of the summary: mergeable partial statistics."""
+    partial = {}
+    for col in part.columns:
+        series = part[col]
+        col_partial = {"missing": int(series.isna().sum())}
+        if pd_types.is_string_dtype(series) and (
+            series.dtype.name not in {"category"}
+        ):
+            col_partial["strings"] = string_profile(
+                series, engine, top_k or TOP_PATTERNS
+            )
+        if series.dtype.name in {"object"}:
+            partial[col] = col_partial
+            continue
+        try:
+            col_partial["uniques"] = pd.Series(series.dropna().unique())
+        except TypeError:
+            col_partial["uniques"] = None
+        non_null = series.dropna()
+        if pd_types.is_numeric_dtype(series) or (
+            pd_types.is_datetime64_any_dtype(series)
+        ):
+            col_partial["count"] = len(non_null)
+            if len(non_null):
+                col_partial["min"] = non_null.min()
+                col_partial["max"] = non_null.max()
+            if pd_types.is_numeric_dtype(series):
+                col_partial["sum"] = non_null.sum()
+            else:
+                col_partial["buckets"] = bucket_counts(non_null)
+        elif (
+            top_k
+            and pd_types.is_string_dtype(series)
+            and series.dtype.name not in {"category"}
+        ):
+            col_partial["sketch"] = space_saving([non_null], top_k)
+        if pd_types.is_bool_dtype(series) or (
+            series.dtype.name in {"category"}
+        ):
+            col_partial["value_counts"] = Counter(
+                _value_counts(series)[0]
+            )
+        partial[col] = col_partial
+    return partial
+
+
+def _merge_column_summaries(
+    dtype, partials: list, top_k: int = None
+) -> dict:
+    """Reduces per-partition partials into one column summary."""
+    col_summary = {"dtype": dtype.name}
+    if dtype.name in {"object"}:
+        col_summary["missing"] = sum(p["missing"] for p in partials)
+        col_summary.update(_merge_string_profiles(partials))
+        return col_summary
+
+    if any(p["uniques"] is None for p in partials):
+        col_summary["n_unique"] = None
+    else:
+        col_summary["n_unique"] = int(
+            pd.concat([p["uniques"] for p in partials]).nunique()
+        )
+    col_summary["missing"] = sum(p["missing"] for p in partials)
+
+    with_values = [p for p in partials if p.get("count")]
+    if pd_types.is_numeric_dtype(dtype):
+        if with_values:
+            count = sum(p["count"] for p in with_values)
+            col_summary["min"] = min(p["min"] for p in with_values)
+            col_summary["max"] = max(p["max"] for p in with_values)
+            col_summary["mean"] = round(
+                sum(p["sum"] for p in with_values) / count, 4
+            )
+        else:
+            col_summary.update(min=pd.NA, max=pd.NA, mean=pd.NA)
+
+    elif pd_types.is_datetime64_any_dtype(dtype):
+        col_summary["min_date"] = (
+            min(p["min"] for p in with_values).isoformat()
+            if with_values
+            else None
+        )
+        col_summary["max_date"] = (
+            max(p["max"] for p in with_values).isoformat()
+            if with_values
+            else None
+        )
+        if with_values:
+            freq = choose_freq(
+                min(p["min"] for p in with_values),
+                max(p["max"] for p in with_values),
+            )
+            buckets = with_values[0]["buckets"]
+            for p in with_values[1:]:
+                buckets = merge_bucket_counts(buckets, p["buckets"])
+            col_summary["time_buckets"] = {
+                "freq": freq,
+                "counts": {
+                    start.isoformat(): int(count)
+                    for start, count in buckets[freq].items()
+                },
+            }
+
+    elif (
+        top_k
+        and "sketch" in partials[0]
+        and (col_summary["n_unique"] or 0) > top_k
+    ):
+        sketch = partials[0]["sketch"]
+        for p in partials[1:]:
+            sketch = space_saving_merge(sketch, p["sketch"], top_k)
+        col_summary.update(_format_top_values(*sketch))
+    if "strings" in partials[0] and dtype.name not in {"object"}:
+        col_summary.update(_merge_string_profiles(partials))
+
+    if "value_counts" in partials[0]:
+        # missing values are left out of the partial counts and added
+        # back from the missing total
+        value_counts = sum(
+            (p["value_counts"] for p in partials), Counter()
+        )
+        if pd_types.is_bool_dtype(dtype):
+            keys = ("False", "True")
+        else:
+            keys = map(str, dtype.categories)
+        col_summary.update(
+            _format_value_counts(
+                {
+                    key: value_counts[key]
+                    for key in keys
+                    if value_counts[key]
+                },
+                col_summary["missing"],
+                missing_value_key(dtype),
+                top_k,
+            )
+        )
+    return col_summary
+
+
+def _merge_string_profiles(partials: list) -> dict:
+    profile = partials[0]["strings"]
+    for p in partials[1:]:
+        profile = merge_string_profiles(profile, p["strings"])
+    return format_string_profile(profile)
@@ -0,0 +1,337 @@
+"""
+pipeline.py
+
+Runs the cleaning and EDA pipeline on a loaded DataFrame: cleaning (with
+the pandas or partitioned backend), then the summary, JSON, plots, CSV
+and database stages, concurrently through the stage scheduler. Shared by
+the command-line interface, the batch mode and the profiling service.
+
+A job describes a dataset and the options to process it with, as a dict:
+{"csv": path} or {"db": uri, "table": name}, optionally "read_workers",
+"schema" (of the table), "sample" (rows) or "sample_frac" with "seed" to
+profile a uniform sample (see sampling.py), and any option of
+`run_pipeline`.
+
+Public Functions:
+- run_pipeline(df, output_dir, ...): Cleans `df` and writes its EDA
+  outputs to `output_dir`, returning the stage results. With a
+  checkpoint, only the stages an interrupted run did not finish.
+- validate_job(spec): Checks a job description.
+- run_job(spec, output_dir, cache_dir): Loads and processes the dataset of a job.
+- warm_up(): Loads the plotting machinery ahead of the first job.
+"""
+
+from .log_setup.setup import setup, logging
+import functools
+import inspect
+import os
+import matplotlib.pyplot as plt
+import pandas as pd
+from .loader import csv_load, pg_load
+from .external import external_dedup_csv
+from .sampling import csv_sample, pg_sample
+from .cleaner import clean_pipeline
+from .profiler import generate_summary
+from .partitioned import (
+    partitioned_clean_pipeline,
+    partitioned_generate_summary,
+)
+from .writer import (
+    OUTPUT_DIR,
+    write_json,
+    write_df,
+    write_pg,
+)
+from .visualizer import generate_plots
+from .dates import use_format_cache
+from .scheduler import Stage, run_stages
+from .shm import shared_frame, with_frame
+from .checkpoint import (
+    load_frame,
+    load_summary,
+    mark_done,
+    save_frame,
+    save_summary,
+    stage_done,
+)
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+# keys of a job naming its dataset
+SOURCE_KEYS = (
+    "name",
+    "csv",
+    "db",
+    "table",
+    "schema",
+    "read_workers",
+    "sample",
+    "sample_frac",
+    "seed",
+)
+
+
+def run_pipeline(
+    df: pd.DataFrame,
+    output_dir: str = None,
+    backend: str = "pandas",
+    workers: int = None,
+    dedup_memory=None,
+    dedup_workers: int = 1,
+    engine: str = "pandas",
+    downcast: bool = False,
+    category_ratio: float = 0.5,
+    recover_numbers: bool = True,
+    top_k: int = None,
+    json_format: str = "json",
+    plots: bool = True,
+    csv: bool = True,
+    compression: str = None,
+    write_table: str = None,
+    write_db: str = None,
+    write_mode: str = "create",
+    plots_kind: str = "process",
+    checkpoint: dict = None,
+) -> dict:
+    """
+    Cleans the DataFrame and writes its EDA outputs.
+
+    Args:
+        df (pd.DataFrame): The loaded dataset, None when the cleaned
+            dataset is taken from `checkpoint`.
+        output_dir (str, optional): Directory of the outputs, created if
+            missing. Defaults to OUTPUT_DIR.
+        backend (str): 'pandas' or 'partitioned' (row partitions cleaned
+            and profiled in a process pool of `workers`).
+        dedup_memory, dedup_workers, engine, downcast, category_ratio,
+            recover_numbers: Options of `clean_pipeline`. The
+            partitioned backend removes duplicates in memory, without
+            `dedup_memory` and `dedup_workers`.
+        top_k (int, optional): Most frequent values kept per column.
+        json_format (str): Layout of the JSON summary.
+        plots (bool): Whether to generate the plots.
+        csv (bool): Whether to write the cleaned dataset.
+        compression (str, optional): Codec of the cleaned dataset.
+        write_table (str, optional): Table to bulk load the cleaned
+            dataset into, in the `write_db` database.
+        write_mode (str): 'create', 'replace' or 'append'.
+        plots_kind (str): Stage kind of the plots, 'process' or 'thread'
+            (when the caller already runs in a dedicated process).
+        checkpoint (dict, optional): From `checkpoint.open_checkpoint`.
+            Every stage is recorded there as it finishes, and the stages
+            it already records are not run again.
+
+    Returns:
+        dict: Stage names mapped to their results, the summary under
+        'summary'.
+
+    Raises:
+        ValueError: If the partitioned backend is given `dedup_memory`
+            or `dedup_workers`.
+    """
+    if backend == "partitioned" and (
+        dedup_memory is not None or dedup_workers != 1
+    ):
+        raise ValueError(
+            "The partitioned backend does not support out-of-core "
+            "duplicate removal (dedup_memory, dedup_workers)"
+        )
+    output_dir = output_dir or OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+
+    resumed = checkpoint is not None and stage_done(checkpoint, "clean")
+    # the cleaning steps build new frames, dropping the sampling attrs
+    sampling = None if df is None else df.attrs.get("sampling")
+    if resumed:
+        df = load_frame(checkpoint)
+    elif backend == "partitioned":
+        df = partitioned_clean_pipeline(
+            df,
+            workers,
+            downcast,
+            category_ratio,
+            recover_numbers,
+            engine,
+        )
+    else:
+        df = clean_pipeline(
+            df,
+            dedup_memory,
+            dedup_workers,
+            engine,
+            downcast,
+            category_ratio,
+            recover_numbers,
+        )
+    if sampling is not None:
+        df.attrs["sampling"] = sampling
+    if checkpoint is not None and not resumed:
+        save_frame(checkpoint, df)
+
+    if backend == "partitioned":
+        summarize = functools.partial(
+            partitioned_generate_summary,
+            workers=workers,
+            top_k=top_k,
+            engine=engine,
+        )
+    else:
+        summarize = functools.partial(
+            generate_summary, engine=engine, top_k=top_k
+        )
+
+    # everything after cleaning only reads df, so the stages overlap
+    stages = {
+        "summary": Stage(summarize, (df,)),
+        "json": Stage(
+            functools.partial(
+                write_json, format=json_format, output_dir=output_dir
+            ),
+            deps=("summary",),
+        ),
+    }
+    if plots:
+        stages["plots"] = Stage(
+            functools.partial(generate_plots, output_dir=output_dir),
+            (df,),
+            deps=("summary",),
+            kind=plots_kind,
+        )
+    if csv:
+        stages["csv"] = Stage(
+            functools.partial(
+                write_df, compression=compression, output_dir=output_dir
+            ),
+            (df,),
+        )
+    if write_table:
+        if write_db:
+            stages["pg"] = Stage(
+                write_pg, (df, write_db, write_table, write_mode)
+            )
+        else:
+            logger.warning("No database to write to, use --write-db")
+    on_done = None
+    if checkpoint is not None:
+        done = [name for name in stages if stage_done(checkpoint, name)]
+        if done:
+            logger.info(
+                "Skipping stages already done: %s", ", ".join(done)
+            )
+        for name in done:
+            if name == "summary":
+                # still needed by the stages that depend on it
+                stages[name] = Stage(load_summary, (checkpoint,))
+            else:
+                del stages[name]
+        on_done = functools.partial(_checkpoint_stage, checkpoint)
+
+    plots_stage = stages.get("plots")
+    if plots_stage is None or plots_stage.kind != "process":
+        return run_stages(stages, on_done=on_done)
+    # the plots process maps the frame from shared memory
+    with shared_frame(df) as frame:
+        stages["plots"] = plots_stage._replace(
+            func=functools.partial(with_frame, plots_stage.func),
+            args=(frame,),
+        )
+        return run_stages(stages, on_done=on_done)
+
+
+# options of run_pipeline a job may set
+JOB_OPTIONS = tuple(
+    name
+    for name in inspect.signature(run_pipeline).parameters
+    if name not in {"df", "output_dir", "plots_kind", "checkpoint"}
+)
+
+
+def validate_job(spec) -> None:
+    """
+    Checks that a job names one dataset and only known options.
+
+    Raises:
+        ValueError: If it does not.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("The job must be a JSON object")
+    if ("csv" in spec) == ("db" in spec):
+        raise ValueError("The job needs exactly one of 'csv' or 'db'")
+    if "db" in spec and not spec.get("table"):
+        raise ValueError("A 'db' job needs a 'table'")
+    unknown = set(spec) - set(SOURCE_KEYS) - set(JOB_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown job options: {', '.join(unknown)}")
+
+
+def run_job(
+    spec: dict, output_dir: str, cache_dir: str = OUTPUT_DIR
+) -> dict:
+    """
+    Loads the dataset of a job and runs the pipeline on it. Meant to run
+    in a worker process of its own, so the plots are drawn in a thread.
+
+    Args:
+        spec (dict): The validated job.
+        output_dir (str): Directory of the job's outputs.
+        cache_dir (str, optional): Directory of the datetime format
+            cache, shared by the jobs so a later job over the same input
+            reuses the formats. Defaults to OUTPUT_DIR, as for the CLI.
+
+    Returns:
+        dict: Loaded rows and columns and the files written.
+
+    Raises:
+        ValueError: If the dataset could not be loaded.
+    """
+    sample = {
+        "n": spec.get("sample"),
+        "frac": spec.get("sample_frac"),
+        "seed": spec.get("seed"),
+    }
+    if "csv" in spec and (sample["n"] or sample["frac"]):
+        df = csv_sample(spec["csv"], **sample)
+    elif "csv" in spec and spec.get("dedup_memory"):
+        # duplicates are removed while streaming the file
+        df = external_dedup_csv(
+            spec["csv"],
+            spec["dedup_memory"],
+            spec.get("dedup_workers", 1),
+        )
+    elif "csv" in spec:
+        df = csv_load(spec["csv"], spec.get("read_workers", 1))
+    elif sample["n"] or sample["frac"]:
+        df = pg_sample(
+            spec["db"], spec["table"], spec.get("schema"), **sample
+        )
+    else:
+        df = pg_load(spec["db"], spec["table"], spec.get("schema"))
+    if df is None:
+        raise ValueError("No data loaded, see the log")
+    source = {k: spec.get(k) for k in ("csv", "db", "table", "schema")}
+    use_format_cache(cache_dir, source)
+    options = {k: v for k, v in spec.items() if k in JOB_OPTIONS}
+    run_pipeline(df, output_dir, plots_kind="thread", **options)
+    return {
+        "rows": len(df),
+        "columns": df.shape[1],
+        "outputs": sorted(os.listdir(output_dir)),
+    }
+
+
+def warm_up() -> None:
+    """Loads the matplotlib font cache, e.g. once per worker process."""
+    fig, _ = plt.subplots()
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def _checkpoint_stage(checkpoint: dict, name: str, result) -> None:
+    """Records a finished stage, the summary with its result."""
+    if stage_done(checkpoint, name):
+        return
+    if name == "summary":
+        save_summary(checkpoint, result)
+    else:
+        mark_done(checkpoint, name)
@@ -6,31 +6,54 @@ data analysis.
 
 Public Functions:
 - generate_summary(df): Produces a summary dictionary based on the data type.
+- missing_value_key(dtype): Key of the missing values in 'value_counts'.
 """
 
-from .log_setup.setup import setup, logging
+from .log_setup.setup import setup, logging, banner
 import pandas as pd
 from pandas.core.generic import NDFrame
 import pandas.api.types as pd_types
+from .engines import get_engine
+from .timeseries import bucket_counts, choose_freq
+from .sketches import space_saving
+from .strings import TOP_PATTERNS, format_string_profile, string_profile
+from .sampling import annotate_summary
+import numpy as np
 
 
 logger = logging.getLogger(__name__)
 setup(logger)
 
+# rows per chunk streamed through the top-k sketch
+SKETCH_CHUNK_ROWS = 10**6
+# keys the missing values of boolean and category columns are counted
+# under in 'value_counts', as str() writes pd.NA and NaN
+BOOLEAN_MISSING_KEY = "<NA>"
+CATEGORY_MISSING_KEY = "nan"
 
-def generate_summary(df: pd.DataFrame) -> dict:
+
+def generate_summary(
+    df: pd.DataFrame, engine: str = "pandas", top_k: int = None
+) -> dict:
     """Generates a summary dictionary for the DataFrame using its EDA-tagged columns.
 
     Args:
         df (pd.DataFrame): A DataFrame with `eda_type` metadata on each column.
+        engine (str): Compute engine for null, distinct and min/max/mean
+            statistics, 'pandas' or 'arrow'. Both return the same summary.
+        top_k (int, optional): Bounds value counts to the `top_k` most
+            frequent values (the rest are added up under
+            'value_counts_other') and adds approximate `top_values` to
+            string columns with more distinct values than that.
 
     Returns:
         dict: A dictionary with column names as keys and dictionaries of summary
         statistics as values.
     """
-    print("*" * 90)
+    banner()
     logger.info("Beginning generating statistical summary")
 
+    eng = get_engine(engine)
     summary = {}
 
     summary["_dataset_"] = {}
@@ -39,12 +62,20 @@ def generate_summary(df: pd.DataFrame) -> dict:
         rows=df.shape[0],
         columns=df.shape[1],
         total_nr_of_cells=df.size,
-        total_missing_values=df.isna().sum().sum(),
+        total_missing_values=sum(
+            eng.null_count(df[col]) for col in df.columns
+        ),
         column_names=[col for col in df.columns],
         dtypes=[dtype.name for dtype in df.dtypes],
         memory_usage=str(round(df.memory_usage().sum() / 10**6, 2))
         + " MB's",
     )
+    if "numeric_recovery" in df.attrs:
+        # per-column conversions of cleaner.recover_numeric_strings
+        df_summary["numeric_recovery"] = df.attrs["numeric_recovery"]
+    if "memory_report" in df.attrs:
+        # per-column savings of cleaner.downcast_types
+        df_summary["memory_report"] = df.attrs["memory_report"]
 
     for col in df.columns:
         series = df[col]
@@ -54,36 +85,158 @@ def generate_summary(df: pd.DataFrame) -> dict:
         }
 
         if df[col].dtype.name in {"object"}:
+            # mixed values, profiled as text
+            col_summary["missing"] = eng.null_count(series)
+            col_summary.update(_string_profile(series, engine, top_k))
             summary[col] = col_summary
             continue
 
         # Safe null count and distinct count
         try:
-            col_summary["n_unique"] = int(series.nunique(dropna=True))
+            col_summary["n_unique"] = eng.n_unique(series)
         except TypeError:
             col_summary["n_unique"] = None  # Or skip this field
 
-        col_summary["missing"] = int(series.isna().sum())
+        col_summary["missing"] = eng.null_count(series)
 
         if pd_types.is_numeric_dtype(series):
-            col_summary["min"] = series.min()
-            col_summary["max"] = series.max()
-            col_summary["mean"] = round(series.mean(), 4)
+            min_val, max_val, mean_val = eng.min_max_mean(series)
+            col_summary["min"] = min_val
+            col_summary["max"] = max_val
+            col_summary["mean"] = round(mean_val, 4)
+            if pd_types.is_bool_dtype(series):
+                col_summary.update(
+                    _format_value_counts(*_value_counts(series), top_k)
+                )
 
         elif pd_types.is_datetime64_any_dtype(series):
-            min_val = series.min()
-            max_val = series.max()
+            min_val, max_val = eng.min_max(series)
             col_summary["min_date"] = (
                 min_val.isoformat() if pd.notnull(min_val) else None
             )
             col_summary["max_date"] = (
                 max_val.isoformat() if pd.notnull(max_val) else None
             )
+            if pd.notnull(min_val):
+                freq = choose_freq(min_val, max_val)
+                buckets = bucket_counts(series, (freq,))[freq]
+                col_summary["time_buckets"] = {
+                    "freq": freq,
+                    "counts": {
+                        start.isoformat(): int(count)
+                        for start, count in buckets.items()
+                    },
+                }
 
         elif series.dtype.name in {"boolean", "category"}:
-            vc = series.apply(str).value_counts(dropna=False)
-            col_summary["value_counts"] = vc.to_dict()
+            col_summary.update(
+                _format_value_counts(*_value_counts(series), top_k)
+            )
+
+        elif pd_types.is_string_dtype(series):
+            if top_k and (col_summary["n_unique"] or 0) > top_k:
+                col_summary.update(_top_values(series, top_k))
+            col_summary.update(_string_profile(series, engine, top_k))
 
         summary[col] = col_summary
+    if "sampling" in df.attrs:
+        # df is a sample, see sampling.py
+        annotate_summary(summary, df, df.attrs["sampling"])
     logger.info("Finished generating summary")
     return summary
+
+
+def _value_counts(series: pd.Series) -> tuple:
+    """
+    Counts the values of a boolean or category column with `np.bincount`
+    over boolean masks / category codes, instead of stringifying every
+    element.
+
+    Returns:
+        tuple: ({str(value): count} of present values, number of missing
+        values, key the missing values are reported under).
+    """
+    if pd_types.is_bool_dtype(series):
+        missing = series.isna().to_numpy()
+        codes = series.to_numpy(dtype=bool, na_value=False).astype(
+            "int8"
+        )
+        codes[missing] = 2
+        false, true, n_missing = np.bincount(codes, minlength=3)
+        counts = {"False": int(false), "True": int(true)}
+        return (
+            {k: v for k, v in counts.items() if v},
+            int(n_missing),
+            BOOLEAN_MISSING_KEY,
+        )
+
+    codes = series.cat.codes.to_numpy()
+    counts = np.bincount(
+        codes + 1, minlength=len(series.cat.categories) + 1
+    )
+    present = np.flatnonzero(counts[1:])
+    return (
+        {
+            str(series.cat.categories[i]): int(counts[i + 1])
+            for i in present
+        },
+        int(counts[0]),
+        CATEGORY_MISSING_KEY,
+    )
+
+
+def missing_value_key(dtype) -> str:
+    """
+    The key of the missing values in the 'value_counts' of a boolean or
+    category column, a string so that it survives JSON.
+    """
+    if pd_types.is_bool_dtype(dtype):
+        return BOOLEAN_MISSING_KEY
+    return CATEGORY_MISSING_KEY
+
+
+def _format_value_counts(
+    counts: dict, missing: int, missing_key, top_k: int = None
+) -> dict:
+    """
+    Builds the 'value_counts' entry, most frequent value first, keeping
+    only the `top_k` most frequent values when given.
+    """
+    items = list(counts.items())
+    if missing:
+        items.append((missing_key, missing))
+    items.sort(key=lambda item: item[1], reverse=True)
+    formatted = {"value_counts": dict(items[:top_k])}
+    if top_k is not None and len(items) > top_k:
+        formatted["value_counts_other"] = sum(
+            c for _, c in items[top_k:]
+        )
+    return formatted
+
+
+def _top_values(series: pd.Series, top_k: int) -> dict:
+    """
+    Approximate most frequent values of a high-cardinality column,
+    streamed through a Space-Saving sketch of `top_k` counters.
+    """
+    chunks = (
+        series.iloc[start : start + SKETCH_CHUNK_ROWS]
+        for start in range(0, len(series), SKETCH_CHUNK_ROWS)
+    )
+    return _format_top_values(*space_saving(chunks, top_k))
+
+
+def _string_profile(
+    series: pd.Series, engine: str, top_k: int = None
+) -> dict:
+    """Lengths, blank values and top patterns of a text column."""
+    return format_string_profile(
+        string_profile(series, engine, top_k or TOP_PATTERNS)
+    )
+
+
+def _format_top_values(counts: pd.Series, errors: pd.Series) -> dict:
+    return {
+        "top_values": {str(k): int(v) for k, v in counts.items()},
+        "top_values_max_error": int(errors.max()) if len(errors) else 0,
+    }
@@ -0,0 +1,358 @@
+"""
+sampling.py
+
+Fast, approximate EDA of datasets too large to load: a uniform sample of
+the rows is drawn while streaming through the CSV file or the table, and
+the pipeline runs on the sample only. The sampling (method, rate, rows
+seen) is attached to the sample as `df.attrs["sampling"]`, and the
+summary of a sample reports its counts and means with confidence
+intervals for the whole dataset.
+
+A fixed number of rows is drawn with a reservoir: every row gets a
+random key and the rows with the n smallest keys are kept, which is a
+uniform sample without replacement that needs a single pass and only
+holds about n rows. A fraction of the rows is drawn with a Bernoulli
+sample. PostgreSQL tables are sampled by the server (`TABLESAMPLE
+BERNOULLI`), so only the sampled rows are transferred.
+
+Public Functions:
+- reservoir_sample(chunks, n, frac, seed): Uniform sample of a stream of
+  DataFrame chunks.
+- csv_sample(csv_file, n, frac, seed): Sample of a CSV file.
+- pg_sample(uri, table_name, schema, n, frac, seed): Sample of a
+  PostgreSQL table.
+- annotate_summary(summary, df, sampling, confidence): Adds the
+  confidence intervals to the summary of a sample.
+"""
+
+from .log_setup.setup import setup, logging
+from contextlib import nullcontext
+from statistics import NormalDist
+from sqlalchemy import text
+import math
+import numpy as np
+import pandas as pd
+import pandas.api.types as pd_types
+from .loader import _codec, _decompressed, sql_engine
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+# rows parsed / fetched at a time while sampling
+SAMPLE_CHUNK_ROWS = 100_000
+# server-side samples for n rows ask for a few more, trimmed afterwards
+_OVERSAMPLE = 1.1
+_OVERSAMPLE_ROWS = 100
+_ESTIMATED_ROWS_QUERY = """
+SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)
+"""
+
+
+def reservoir_sample(
+    chunks, n: int = None, frac: float = None, seed: int = None
+) -> tuple:
+    """
+    Draws a uniform sample of the rows of a stream of DataFrame chunks,
+    in one pass.
+
+    Args:
+        chunks (iterable of pd.DataFrame): The rows, e.g. a CSV reader.
+        n (int, optional): Rows to keep (all if there are fewer).
+        frac (float, optional): Probability of keeping each row, in (0, 1].
+        seed (int, optional): Seed of the random generator.
+
+    Returns:
+        tuple: The sample, in the order of the stream and with a fresh
+        index, and the number of rows seen.
+
+    Raises:
+        ValueError: Unless exactly one of `n` or `frac` is valid.
+    """
+    if (n is None) == (frac is None):
+        raise ValueError("Give exactly one of n or frac")
+    if n is not None and n < 1:
+        raise ValueError(f"Invalid sample size: {n}")
+    if frac is not None and not 0 < frac <= 1:
+        raise ValueError(f"Invalid sample fraction: {frac}")
+    rng = np.random.default_rng(seed)
+    parts, keys = [], []
+    kept = 0
+    threshold = frac if frac is not None else 1.0
+    seen = 0
+    for chunk in chunks:
+        chunk_keys = rng.random(len(chunk))
+        # positions in the stream, to restore the order of the rows
+        chunk = chunk.set_axis(pd.RangeIndex(seen, seen + len(chunk)))
+        seen += len(chunk)
+        selected = chunk_keys < threshold
+        parts.append(chunk[selected])
+        keys.append(chunk_keys[selected])
+        kept += selected.sum()
+        if n is not None and kept > 2 * n:
+            parts, keys, threshold = _trim(parts, keys, n)
+            kept = n
+
+    if n is not None and kept > n:
+        parts, keys, _ = _trim(parts, keys, n)
+    if not parts:
+        return pd.DataFrame(), seen
+    sample = pd.concat(parts).sort_index()
+    return sample.reset_index(drop=True), seen
+
+
+def csv_sample(
+    csv_file: str,
+    n: int = None,
+    frac: float = None,
+    seed: int = None,
+    chunk_rows: int = SAMPLE_CHUNK_ROWS,
+) -> pd.DataFrame:
+    """
+    Loads a uniform sample of the rows of a CSV file, streaming through it
+    (compressed files are decompressed on the fly, as in `csv_load`).
+
+    Args:
+        csv_file (str or Path): Path to the CSV file.
+        n, frac, seed: As in `reservoir_sample`.
+        chunk_rows (int): Rows parsed at a time.
+
+    Returns:
+        pd.DataFrame or None: The sample, with `attrs["sampling"]`, or
+        None if reading failed.
+    """
+    logger.info("Sampling %s", csv_file)
+    codec = _codec(csv_file)
+    try:
+        source = (
+            nullcontext(csv_file)
+            if codec is None
+            else _decompressed(csv_file, codec)
+        )
+        with source as stream:
+            with pd.read_csv(stream, chunksize=chunk_rows) as reader:
+                sample, seen = reservoir_sample(reader, n, frac, seed)
+    except Exception as e:
+        logger.error(e)
+        return None
+    sample.attrs["sampling"] = _sampling(
+        "reservoir" if n is not None else "bernoulli",
+        len(sample),
+        seen,
+        True,
+        seed,
+    )
+    _log_sample(sample)
+    return sample
+
+
+def pg_sample(
+    uri: str,
+    table_name: str = None,
+    schema: str = None,
+    n: int = None,
+    frac: float = None,
+    seed: int = None,
+    chunk_rows: int = SAMPLE_CHUNK_ROWS,
+) -> pd.DataFrame:
+    """
+    Loads a uniform sample of the rows of a PostgreSQL table.
+
+    The server draws a `TABLESAMPLE BERNOULLI` sample, for `n` rows of a
+    slightly larger fraction than the planner's row estimate asks for,
+    trimmed to `n` by a reservoir. Without an estimate (a table never
+    analyzed) the whole table is streamed through the reservoir.
+
+    Args:
+        uri (str): SQLAlchemy URI of the PostgreSQL database.
+        table_name (str, optional): Table to sample. If None, prompts the
+            user.
+        schema (str, optional): Schema of the table, the search path by
+            default.
+        n, frac, seed: As in `reservoir_sample`.
+        chunk_rows (int): Rows fetched at a time.
+
+    Returns:
+        pd.DataFrame or None: The sample, with `attrs["sampling"]`, or
+        None if loading failed.
+    """
+    try:
+        logger.info("Connecting to database")
+        engine = sql_engine(uri)
+        while not table_name:
+            table_name = input("Enter a valid table name: ")
+        quote = engine.dialect.identifier_preparer.quote
+        relation = quote(table_name)
+        if schema:
+            relation = f"{quote(schema)}.{relation}"
+        logger.info("Sampling table '%s'", table_name)
+
+        with engine.connect() as conn, conn.begin():
+            estimate = conn.execute(
+                text(_ESTIMATED_ROWS_QUERY), {"name": relation}
+            ).scalar()
+            if estimate is not None and estimate <= 0:
+                estimate = None
+            if frac is not None:
+                percent = 100 * frac
+            elif estimate is not None:
+                wanted = _OVERSAMPLE * n + _OVERSAMPLE_ROWS
+                percent = min(100.0, 100 * wanted / estimate)
+            else:
+                percent = 100.0
+
+            query = f"SELECT * FROM {relation}"
+            if percent < 100:
+                query += f" TABLESAMPLE BERNOULLI ({percent})"
+                if seed is not None:
+                    query += f" REPEATABLE ({int(seed)})"
+            chunks = pd.read_sql(
+                text(query),
+                conn.execution_options(stream_results=True),
+                chunksize=chunk_rows,
+            )
+            if n is None:
+                # the server already drew the sample
+                sample, seen = reservoir_sample(chunks, frac=1.0)
+            else:
+                sample, seen = reservoir_sample(chunks, n, seed=seed)
+    except Exception as e:
+        logger.error(e)
+        return None
+
+    if percent < 100:
+        method, exact = "tablesample bernoulli", False
+        population = estimate or round(seen * 100 / percent)
+    else:
+        method, exact = "reservoir", True
+        population = seen
+    if n is not None and len(sample) < min(n, population):
+        logger.warning(
+            "The table has fewer rows than estimated, sampled %s of %s",
+            len(sample),
+            n,
+        )
+    sample.attrs["sampling"] = _sampling(
+        method, len(sample), population, exact, seed
+    )
+    _log_sample(sample)
+    return sample
+
+
+def annotate_summary(
+    summary: dict,
+    df: pd.DataFrame,
+    sampling: dict,
+    confidence: float = 0.95,
+) -> dict:
+    """
+    Annotates the summary of a sample with estimates for the whole
+    dataset: the sampling under '_dataset_' (with 'rows_estimate'), and
+    per column confidence intervals of the missing values ('missing_ci')
+    and of the value counts ('value_counts_ci'), as counts in the whole
+    dataset, and of the mean ('mean_ci'). Other statistics (min, max,
+    n_unique) describe the sample only.
+
+    Args:
+        summary (dict): Summary of the sample, updated in place.
+        df (pd.DataFrame): The (cleaned) sample.
+        sampling (dict): `attrs["sampling"]` of the sample.
+        confidence (float): Confidence level of the intervals.
+
+    Returns:
+        dict: The summary.
+    """
+    rows, rate = len(df), sampling["rate"]
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    # finite population correction, the intervals close as rate -> 1
+    z *= math.sqrt(max(0.0, 1 - rate))
+    summary["_dataset_"]["sampling"] = {
+        **sampling,
+        "confidence": confidence,
+        "rows_estimate": round(rows / rate) if rate else None,
+    }
+
+    for col in df.columns:
+        col_summary = summary.get(col, {})
+        if "missing" not in col_summary:
+            continue
+        col_summary["missing_ci"] = _count_ci(
+            col_summary["missing"], rows, rate, z
+        )
+        if "mean" in col_summary:
+            col_summary["mean_ci"] = _mean_ci(df[col], z)
+        if "value_counts" in col_summary:
+            col_summary["value_counts_ci"] = {
+                value: _count_ci(count, rows, rate, z)
+                for value, count in col_summary["value_counts"].items()
+            }
+    return summary
+
+
+def _trim(parts: list, keys: list, n: int) -> tuple:
+    """Keeps the n rows with the smallest keys, and the largest key kept."""
+    sample, sample_keys = pd.concat(parts), np.concatenate(keys)
+    smallest = np.argpartition(sample_keys, n - 1)[:n]
+    return (
+        [sample.iloc[smallest]],
+        [sample_keys[smallest]],
+        sample_keys[smallest].max(),
+    )
+
+
+def _sampling(
+    method: str, rows: int, population: int, exact: bool, seed
+) -> dict:
+    return {
+        "method": method,
+        "sample_rows": rows,
+        "population_rows": population,
+        "population_exact": exact,
+        "rate": rows / population if population else 1.0,
+        "seed": seed,
+    }
+
+
+def _log_sample(sample: pd.DataFrame) -> None:
+    sampling = sample.attrs["sampling"]
+    logger.info(
+        "Sampled %s of %s%s rows (%.4f%%, %s)",
+        sampling["sample_rows"],
+        "" if sampling["population_exact"] else "~",
+        sampling["population_rows"],
+        sampling["rate"] * 100,
+        sampling["method"],
+    )
+
+
+def _count_ci(count: int, rows: int, rate: float, z: float) -> list:
+    """
+    Wilson score interval of the share `count / rows`, as counts in the
+    whole dataset.
+    """
+    if not rows or not rate:
+        return None
+    share = count / rows
+    denominator = 1 + z**2 / rows
+    center = (share + z**2 / (2 * rows)) / denominator
+    half = (
+        z
+        * math.sqrt(share * (1 - share) / rows + z**2 / (4 * rows**2))
+        / denominator
+    )
+    scale = rows / rate
+    return [
+        math.floor(max(0.0, center - half) * scale),
+        math.ceil(min(1.0, center + half) * scale),
+    ]
+
+
+def _mean_ci(series: pd.Series, z: float) -> list:
+    """Normal interval of the mean of the non-missing values."""
+    if pd_types.is_bool_dtype(series):
+        series = series.astype("Float64")
+    values = series.dropna().to_numpy(dtype="float64")
+    if len(values) < 2:
+        return None
+    mean = values.mean()
+    half = z * values.std(ddof=1) / math.sqrt(len(values))
+    return [round(mean - half, 4), round(mean + half, 4)]
@@ -0,0 +1,176 @@
+"""
+scheduler.py
+
+Runs the pipeline stages that follow cleaning as a small dependency
+graph. Every stage starts as soon as the stages it depends on have
+finished, so independent stages (writing the cleaned CSV, the JSON
+summary, the plots) overlap instead of running one after another.
+I/O-bound stages run on a thread pool; CPU-bound ones that do not release
+the GIL (like plotting) can be sent to a process pool. Under a memory
+governor (--max-memory), fewer process stages start while memory use is
+close to the budget, as in `governor.governed_map`.
+
+Public Functions:
+- run_stages(stages, workers, on_done): Runs a graph of stages and returns their
+  results.
+- critical_path(stages, timings): The chain of dependent stages that
+  determined the total run time.
+"""
+
+from .log_setup.setup import setup, logging, banner
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Callable, NamedTuple
+import time
+from .governor import current_governor
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+STAGE_KINDS = ("thread", "process")
+
+
+class Stage(NamedTuple):
+    """
+    A pipeline stage: `func(*args, **{dep: result of dep})`, run on a
+    'thread' or a 'process' worker.
+    """
+
+    func: Callable
+    args: tuple = ()
+    deps: tuple = ()
+    kind: str = "thread"
+
+
+def run_stages(
+    stages: dict, workers: int = None, on_done: Callable = None
+) -> dict:
+    """
+    Runs the stages as soon as their dependencies are done.
+
+    Args:
+        stages (dict): Stage names mapped to `Stage`s. The result of each
+            dependency is passed as a keyword argument named after it.
+        workers (int, optional): Maximum number of stages running at the
+            same time on each pool. Defaults to the number of stages.
+        on_done (Callable, optional): Called as `on_done(name, result)`
+            by the calling thread as soon as a stage has finished, e.g. to
+            checkpoint it.
+
+    Returns:
+        dict: Stage names mapped to their results.
+
+    Raises:
+        ValueError: If a stage has an unknown kind or dependency, or the
+            dependencies form a cycle.
+    """
+    for name, stage in stages.items():
+        if stage.kind not in STAGE_KINDS:
+            raise ValueError(f"Unsupported stage kind: {stage.kind}")
+        unknown = set(stage.deps) - set(stages)
+        if unknown:
+            raise ValueError(
+                f"Stage {name} depends on unknown stages: {unknown}"
+            )
+
+    banner()
+    logger.info("Running stages: %s", ", ".join(stages))
+    workers = workers or max(1, len(stages))
+    uses_processes = any(s.kind == "process" for s in stages.values())
+    pending = dict(stages)
+    running = {}
+    results = {}
+    timings = {}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as threads, (
+        ProcessPoolExecutor(max_workers=workers)
+        if uses_processes
+        else ThreadPoolExecutor(max_workers=1)
+    ) as processes:
+        while pending or running:
+            governor = current_governor()
+            in_processes = sum(
+                stages[name].kind == "process"
+                for name in running.values()
+            )
+            for name, stage in list(pending.items()):
+                if not all(dep in results for dep in stage.deps):
+                    continue
+                if (
+                    stage.kind == "process"
+                    and governor is not None
+                    and in_processes >= governor.allowed(workers)
+                ):
+                    # starts once a running process stage has finished
+                    continue
+                pool = threads if stage.kind == "thread" else processes
+                future = pool.submit(
+                    stage.func,
+                    *stage.args,
+                    **{dep: results[dep] for dep in stage.deps},
+                )
+                running[future] = name
+                timings[name] = [time.perf_counter() - start, None]
+                del pending[name]
+                in_processes += stage.kind == "process"
+            if not running:
+                raise ValueError(
+                    f"Stages {', '.join(pending)} have cyclic dependencies"
+                )
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    logger.error("Stage %s failed", name)
+                    for other in running:
+                        other.cancel()
+                    raise
+                timings[name][1] = time.perf_counter() - start
+                logger.info(
+                    "Stage %s finished in %.2fs",
+                    name,
+                    timings[name][1] - timings[name][0],
+                )
+                if on_done is not None:
+                    on_done(name, results[name])
+
+    path = critical_path(stages, timings)
+    logger.info(
+        "Critical path: %s, total %.2fs",
+        " -> ".join(
+            f"{name} ({timings[name][1] - timings[name][0]:.2f}s)"
+            for name in path
+        ),
+        time.perf_counter() - start,
+    )
+    return results
+
+
+def critical_path(stages: dict, timings: dict) -> list:
+    """
+    Follows, back from the stage that finished last, the dependency that
+    finished last, i.e. the chain that kept the run going.
+
+    Args:
+        stages (dict): Stage names mapped to `Stage`s.
+        timings (dict): Stage names mapped to (start, end) offsets.
+
+    Returns:
+        list: Stage names, first stage first.
+    """
+    if not timings:
+        return []
+    path = [max(timings, key=lambda name: timings[name][1])]
+    while stages[path[-1]].deps:
+        path.append(
+            max(stages[path[-1]].deps, key=lambda dep: timings[dep][1])
+        )
+    return path[::-1]
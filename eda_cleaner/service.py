@@ -0,0 +1,308 @@
+"""
+service.py
+
+Long-running profiling service. Every run of the command-line interface
+pays for the interpreter start, the pandas / matplotlib imports, the
+matplotlib font cache and the database engines; the service pays for
+them once. It accepts jobs over a local HTTP endpoint (localhost TCP or a
+Unix socket), runs them on a pool of warm worker processes driven by
+asyncio, writes the outputs of every job to its own directory and reports
+the status of the jobs.
+
+Endpoints:
+- POST /jobs: Submits a job. The JSON body names the dataset, either
+  {"csv": path} or {"db": uri, "table": name}, plus any option of
+  `run_pipeline` (e.g. "top_k", "plots", "json_format") and
+  "read_workers" (see `pipeline.run_job`). Answers 202 with the job.
+- GET /jobs: All jobs.
+- GET /jobs/<id>: One job: its status ('queued', 'running', 'done' or
+  'failed'), timings, output directory and error.
+
+Usage:
+    python -m eda_cleaner.service --port 8750 --workers 4
+    python -m eda_cleaner.service --socket /tmp/eda_cleaner.sock --log-json
+    curl -X POST localhost:8750/jobs -d '{"csv": "data/file.csv"}'
+
+Public Functions:
+- serve(host, port, socket_path, workers, output_root): Runs the service
+  until interrupted.
+- start_service(host, port, socket_path, workers, output_root): Starts
+  the service on the running event loop.
+"""
+
+from .log_setup.setup import setup, setup_queue, logging, banner
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import json
+import os
+import time
+import uuid
+from .pipeline import run_job, validate_job, warm_up
+from .writer import OUTPUT_DIR
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+JOB_OUTPUT_ROOT = OUTPUT_DIR + "/jobs"
+_MAX_BODY_BYTES = 1024**2
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+}
+
+
+class ProfilingService:
+    """
+    Job queue of the service: the jobs are queued in submission order and
+    `workers` asyncio tasks hand them, one at a time each, to the process
+    pool.
+    """
+
+    def __init__(self, workers: int = None, output_root: str = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.output_root = output_root or JOB_OUTPUT_ROOT
+        self.jobs = {}
+        self.server = None
+        self._queue = asyncio.Queue()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=warm_up
+        )
+        self._tasks = [
+            asyncio.create_task(self._work())
+            for _ in range(self.workers)
+        ]
+
+    def submit(self, spec: dict) -> dict:
+        """Queues a job and returns it."""
+        validate_job(spec)
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "spec": spec,
+            "output_dir": os.path.join(self.output_root, job_id),
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+            "seconds": None,
+            "result": None,
+            "error": None,
+        }
+        self.jobs[job_id] = job
+        self._queue.put_nowait(job_id)
+        logger.info("Queued job %s", job_id)
+        return job
+
+    async def start_workers(self) -> None:
+        """Starts (and warms up) the worker processes."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self._pool, os.getpid)
+                for _ in range(self.workers)
+            )
+        )
+
+    async def close(self) -> None:
+        """Stops accepting connections, cancels the queue and the pool."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = self.jobs[await self._queue.get()]
+            job["status"] = "running"
+            job["started"] = time.time()
+            logger.info("Running job %s", job["id"])
+            try:
+                job["result"] = await loop.run_in_executor(
+                    self._pool,
+                    run_job,
+                    job["spec"],
+                    job["output_dir"],
+                    self.output_root,
+                )
+                job["status"] = "done"
+            except Exception as e:
+                logger.error("Job %s failed: %s", job["id"], e)
+                job["status"] = "failed"
+                job["error"] = f"{type(e).__name__}: {e}"
+            job["finished"] = time.time()
+            job["seconds"] = round(job["finished"] - job["started"], 3)
+            logger.info("Job %s %s", job["id"], job["status"])
+
+    def _route(self, method: str, path: str, body: bytes) -> tuple:
+        parts = path.strip("/").split("/")
+        if parts[0] != "jobs" or len(parts) > 2:
+            return 404, {"error": f"No such endpoint: {path}"}
+        if len(parts) == 2:
+            if method != "GET":
+                return 405, {"error": f"{method} not allowed"}
+            if parts[1] not in self.jobs:
+                return 404, {"error": f"No such job: {parts[1]}"}
+            return 200, self.jobs[parts[1]]
+        if method == "GET":
+            return 200, list(self.jobs.values())
+        if method == "POST":
+            return 202, self.submit(json.loads(body or b"null"))
+        return 405, {"error": f"{method} not allowed"}
+
+    async def _handle(self, reader, writer) -> None:
+        """Answers one HTTP/1.1 request, then closes the connection."""
+        try:
+            request_line = await reader.readline()
+            method, target, _ = request_line.decode("latin-1").split(
+                " ", 2
+            )
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length > _MAX_BODY_BYTES:
+                status, payload = 413, {"error": "Job too large"}
+            else:
+                body = await reader.readexactly(length)
+                status, payload = self._route(
+                    method, target.split("?")[0], body
+                )
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {"error": str(e)}
+
+        content = json.dumps(payload, default=str).encode()
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(content)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+            + content
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def start_service(
+    host: str = "127.0.0.1",
+    port: int = 8750,
+    socket_path: str = None,
+    workers: int = None,
+    output_root: str = None,
+) -> ProfilingService:
+    """
+    Starts the service on the running event loop.
+
+    Args:
+        host (str): Interface to listen on, localhost by default.
+        port (int): TCP port, 0 for any free port.
+        socket_path (str, optional): Listen on this Unix socket instead of
+            TCP.
+        workers (int, optional): Jobs run at the same time, each in its own
+            warm process. Defaults to the number of CPUs.
+        output_root (str, optional): Directory of the per-job output
+            directories. Defaults to JOB_OUTPUT_ROOT.
+
+    Returns:
+        ProfilingService: The service, its asyncio server as `.server`.
+    """
+    service = ProfilingService(workers, output_root)
+    # the workers are forked before any socket is open, so they never
+    # hold client connections open
+    await service.start_workers()
+    if socket_path:
+        service.server = await asyncio.start_unix_server(
+            service._handle, path=socket_path
+        )
+        logger.info("Serving on %s", socket_path)
+    else:
+        service.server = await asyncio.start_server(
+            service._handle, host, port
+        )
+        address = service.server.sockets[0].getsockname()
+        logger.info("Serving on http://%s:%s", address[0], address[1])
+    return service
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8750,
+    socket_path: str = None,
+    workers: int = None,
+    output_root: str = None,
+) -> None:
+    """Runs the service until interrupted, see `start_service`."""
+
+    async def run():
+        service = await start_service(
+            host, port, socket_path, workers, output_root
+        )
+        try:
+            await service.server.serve_forever()
+        finally:
+            await service.close()
+
+    banner()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logger.info("Service stopped")
+
+
+def main():
+    parser = ArgumentParser(description="eda_cleaner profiling service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8750)
+    parser.add_argument(
+        "--socket", help="listen on this Unix socket instead of TCP"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="jobs run at the same time (default: CPUs)",
+    )
+    parser.add_argument(
+        "--output-root",
+        help=f"directory of the per-job outputs (default: {JOB_OUTPUT_ROOT})",
+    )
+    parser.add_argument(
+        "--verbosity",
+        choices=["quiet", "normal", "verbose"],
+        default="normal",
+        help="'verbose' logs every column processed by the jobs",
+    )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        help="log JSON lines instead of the console format",
+    )
+    args = parser.parse_args()
+    setup_queue(args.verbosity, args.log_json)
+    serve(
+        args.host,
+        args.port,
+        args.socket,
+        args.workers,
+        args.output_root,
+    )
+
+
+if __name__ == "__main__":
+    main()
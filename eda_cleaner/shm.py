@@ -0,0 +1,241 @@
+"""
+shm.py
+
+Shared-memory data plane: hands a cleaned DataFrame to worker processes
+without pickling it for every task.
+
+The frame is written once, as an Arrow IPC stream, into a
+`multiprocessing.shared_memory` block, and the tasks get a small handle
+instead of the data. A worker maps the block and selects the columns
+(and rows) it needs by name; the Arrow buffers point into the shared
+block. The frame a worker gets is pandas though, and converting to it
+copies the selected columns: strings, categories, nullable (masked)
+dtypes and dates are always copied, and only numpy numeric columns
+without missing values may stay views of the block. What is saved is
+the pickling of the frame for every task and the copy of the columns a
+worker does not select. The index of the frame is not shared, workers
+get a fresh RangeIndex.
+
+The block belongs to the process that created it: `shared_frame`
+unlinks it when its block exits, also on errors, and any block still
+shared at interpreter exit is unlinked then. Frames that cannot be
+shared (no pyarrow, columns Arrow cannot convert) are handed over as
+they are, so callers need no fallback of their own.
+
+Public Functions:
+- share_frame(df): Writes `df` into shared memory, returning its handle.
+- release(handle): Unlinks the shared memory of a handle.
+- shared_frame(df): Context manager sharing `df` for its block, yielding
+  the handle (or `df` itself when it cannot be shared).
+- attached(frame, columns, start, stop): Context manager mapping the
+  frame of a handle in a worker.
+- with_frame(func, frame, *args, **kwargs): Calls `func` on the mapped
+  frame, a picklable task for process pools.
+"""
+
+from .log_setup.setup import setup, logging
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import NamedTuple
+import atexit
+import os
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # frames are pickled to the workers
+    pa = None
+
+logger = logging.getLogger(__name__)
+setup(logger)
+
+# blocks created by this process, by name, with the creating process id
+_owned = {}
+# blocks still referenced by a worker's results when it was done
+_pinned = []
+
+
+class SharedFrame(NamedTuple):
+    """Picklable handle of a frame in shared memory."""
+
+    name: str
+    size: int
+    rows: int
+    columns: tuple
+    # dtypes Arrow does not restore exactly (e.g. string categories)
+    dtypes: dict
+
+
+def share_frame(df: pd.DataFrame) -> SharedFrame:
+    """
+    Writes `df` into a new shared memory block, as an Arrow IPC stream.
+
+    Returns:
+        SharedFrame: The handle to pass to the workers. The block stays
+        until `release(handle)`.
+
+    Raises:
+        ImportError: Without pyarrow.
+        TypeError, ValueError: If a column (name) cannot be converted,
+            including the pa.ArrowException subclasses.
+    """
+    if pa is None:
+        raise ImportError("Shared frames require 'pyarrow'")
+    if not all(isinstance(col, str) for col in df.columns):
+        raise TypeError(
+            "Only frames with string column names are shared"
+        )
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.MockOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    size = sink.size()
+
+    block = shared_memory.SharedMemory(create=True, size=max(1, size))
+    try:
+        buffer = pa.py_buffer(block.buf)
+        with pa.ipc.new_stream(
+            pa.FixedSizeBufferWriter(buffer), table.schema
+        ) as writer:
+            writer.write_table(table)
+        del buffer, writer
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    _owned[block.name] = block, os.getpid()
+
+    restored = table.slice(0, 0).to_pandas()
+    handle = SharedFrame(
+        name=block.name,
+        size=size,
+        rows=len(df),
+        columns=tuple(df.columns),
+        dtypes={
+            col: dtype
+            for col, dtype in df.dtypes.items()
+            if restored[col].dtype != dtype
+        },
+    )
+    logger.debug(
+        "Shared %d columns (%.1f MB) as %s",
+        len(handle.columns),
+        size / 1024**2,
+        block.name,
+    )
+    return handle
+
+
+def release(handle: SharedFrame) -> None:
+    """Unlinks the block of a handle; workers still mapping it keep it."""
+    _unlink(handle.name)
+
+
+@contextmanager
+def shared_frame(df: pd.DataFrame):
+    """
+    Shares `df` for the duration of the block, releasing it on exit,
+    also when the block (or a worker) fails.
+
+    Yields:
+        SharedFrame or pd.DataFrame: The handle, or `df` itself when it
+        cannot be shared, for `attached` / `with_frame`.
+    """
+    try:
+        handle = share_frame(df)
+    except (ImportError, TypeError, ValueError) as e:
+        # pa.ArrowException subclasses are ValueError / TypeError
+        logger.debug("Not sharing the frame, it is pickled: %s", e)
+        yield df
+        return
+    try:
+        yield handle
+    finally:
+        release(handle)
+
+
+@contextmanager
+def attached(
+    frame,
+    columns: list = None,
+    start: int = 0,
+    stop: int = None,
+):
+    """
+    Maps the frame of a handle, or of the columns named in `columns`, and
+    rows `start` to `stop`, converted to pandas (a copy of all but the
+    numpy numeric columns without missing values). The mapping is closed
+    on exit, so the frame must not be used (or returned) after the
+    block.
+
+    Args:
+        frame (SharedFrame or pd.DataFrame): From `shared_frame`.
+        columns (list, optional): Columns to map, all by default.
+        start, stop (int, optional): Row positions, as in `df.iloc`.
+
+    Yields:
+        pd.DataFrame: The frame.
+    """
+    if isinstance(frame, pd.DataFrame):
+        df = frame if columns is None else frame[list(columns)]
+        yield df.iloc[start:stop]
+        return
+
+    block = shared_memory.SharedMemory(frame.name)
+    if frame.name not in _owned:
+        # attaching registers the block to be unlinked at the exit of
+        # the worker, it belongs to the parent
+        resource_tracker.unregister(block._name, "shared_memory")
+    try:
+        reader = pa.ipc.open_stream(
+            pa.BufferReader(pa.py_buffer(block.buf)[: frame.size])
+        )
+        table = reader.read_all()
+        if columns is not None:
+            table = table.select(
+                [frame.columns.index(col) for col in columns]
+            )
+        start, stop, _ = slice(start, stop).indices(frame.rows)
+        table = table.slice(start, max(0, stop - start))
+        df = table.to_pandas(split_blocks=True)
+        for col, dtype in frame.dtypes.items():
+            if col in df:
+                df[col] = df[col].astype(dtype)
+        del reader, table
+        yield df
+    finally:
+        df = None
+        try:
+            block.close()
+        except BufferError:
+            # something still points into the block, kept mapped
+            _pinned.append(block)
+
+
+def with_frame(func, frame, *args, **kwargs):
+    """
+    Calls `func(df, *args, **kwargs)` with the frame of a handle mapped,
+    e.g. `pool.submit(with_frame, generate_plots, handle)`.
+    """
+    with attached(frame) as df:
+        result = func(df, *args, **kwargs)
+        # lets `attached` close the mapping
+        del df
+    return result
+
+
+def _unlink(name: str) -> None:
+    block, _ = _owned.pop(name, (None, None))
+    if block is None:
+        return
+    block.close()
+    block.unlink()
+    logger.debug("Released %s", name)
+
+
+@atexit.register
+def _release_all() -> None:
+    # forked workers inherit the registry, only the creator unlinks
+    for name, (_, pid) in list(_owned.items()):
+        if pid == os.getpid():
+            _unlink(name)
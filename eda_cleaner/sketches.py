@@ -0,0 +1,91 @@
+"""
+sketches.py
+
+Bounded-memory summaries for high-cardinality columns.
+
+Public Functions:
+- space_saving(chunks, k): Approximate top-k most frequent values of a
+  stream of Series chunks.
+- space_saving_update(counters, errors, chunk, k): Folds one chunk into
+  an existing top-k summary.
+- space_saving_merge(left, right, k): Combines two top-k summaries, e.g.
+  computed on separate partitions.
+"""
+
+import pandas as pd
+
+
+def space_saving(chunks, k: int = 20) -> tuple:
+    """Approximates the `k` most frequent values of a stream of chunks.
+
+    Space-Saving keeps at most `k` counters. A value that is not tracked
+    while the summary is full takes over the smallest counter and
+    inherits its count as an overestimate. Chunks are folded in with
+    vectorized value counts rather than element by element.
+
+    Args:
+        chunks (iterable of pd.Series): The values, chunk by chunk.
+        k (int): Number of counters kept.
+
+    Returns:
+        tuple: (counts, errors) Series indexed by value, most frequent
+        first. Every true frequency lies within [count - error, count].
+    """
+    counters = pd.Series(dtype="int64")
+    errors = pd.Series(dtype="int64")
+    for chunk in chunks:
+        counters, errors = space_saving_update(
+            counters, errors, chunk, k
+        )
+    return counters, errors
+
+
+def space_saving_update(
+    counters: pd.Series, errors: pd.Series, chunk: pd.Series, k: int
+) -> tuple:
+    """Folds the values of `chunk` into a Space-Saving summary."""
+    chunk_counts = chunk.value_counts(dropna=True)
+    floor = counters.min() if len(counters) >= k else 0
+    new = chunk_counts.index.difference(counters.index)
+
+    counters = counters.add(chunk_counts, fill_value=0)
+    errors = errors.reindex(counters.index, fill_value=0)
+    counters[new] += floor
+    errors[new] = floor
+
+    ranked = counters.sort_values(ascending=False, kind="stable")
+    order = ranked.index[:k]
+    return (
+        counters[order].astype("int64"),
+        errors[order].astype("int64"),
+    )
+
+
+def space_saving_merge(left: tuple, right: tuple, k: int) -> tuple:
+    """Merges two (counts, errors) Space-Saving summaries of `k` counters.
+
+    A value missing from one full summary may have occurred there up to
+    that summary's smallest count, which is added as an overestimate.
+    """
+    (left_counts, left_errors), (right_counts, right_errors) = (
+        left,
+        right,
+    )
+    left_floor = left_counts.min() if len(left_counts) >= k else 0
+    right_floor = right_counts.min() if len(right_counts) >= k else 0
+
+    counters = left_counts.add(right_counts, fill_value=0)
+    errors = left_errors.add(right_errors, fill_value=0)
+    only_left = left_counts.index.difference(right_counts.index)
+    only_right = right_counts.index.difference(left_counts.index)
+    counters[only_left] += right_floor
+    errors[only_left] += right_floor
+    counters[only_right] += left_floor
+    errors[only_right] += left_floor
+
+    ranked = counters.sort_values(ascending=False, kind="stable")
+    order = ranked.index[:k]
+    return (
+        counters[order].astype("int64"),
+        errors[order].astype("int64"),
+    )
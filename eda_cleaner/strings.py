@@ -0,0 +1,159 @@
+"""
+strings.py
+
+Profiles of text columns (string and object dtypes): value lengths
+(minimum, maximum, mean and a histogram), empty and whitespace-only
+values, and the most frequent patterns of the values, where every digit
+is written 9 and every letter A ("AB-12" -> "AA-99").
+
+The per-value work (lengths, whitespace trimming, patterns) is done by
+the string kernels of the compute engine, one chunk of rows at a time,
+and every chunk leaves a small profile: counts, a histogram over
+power-of-two length bins, and a Space-Saving summary of its pattern
+counts. Profiles of chunks, or of partitions, merge into the profile of
+the whole column. The pattern summary keeps many more counters than the
+patterns reported, so the counts stay exact for columns with up to
+PATTERN_COUNTERS distinct patterns, and only the report is trimmed.
+
+Public Functions:
+- string_profile(series, engine, top_k, chunk_rows): Mergeable profile
+  of a text column.
+- merge_string_profiles(left, right): Combines two profiles.
+- format_string_profile(profile): The summary entries of a profile.
+"""
+
+import numpy as np
+import pandas as pd
+from .engines import get_engine
+from .sketches import space_saving_merge
+
+# rows handed to the string kernels at a time
+STRING_CHUNK_ROWS = 10**6
+# patterns reported without --top-k
+TOP_PATTERNS = 10
+# pattern counters kept per column, at least this many times top_k
+PATTERN_COUNTERS = 1000
+PATTERN_COUNTERS_PER_TOP = 10
+# bin i holds lengths in [2**(i - 1), 2**i), bin 0 the empty values
+N_LENGTH_BINS = 64
+
+
+def string_profile(
+    series: pd.Series,
+    engine: str = "pandas",
+    top_k: int = TOP_PATTERNS,
+    chunk_rows: int = STRING_CHUNK_ROWS,
+) -> dict:
+    """
+    Profiles the non-null values of a text column, chunk by chunk. Values
+    of other types in object columns are profiled as `str()` writes them.
+
+    Args:
+        series (pd.Series): The column.
+        engine (str): Compute engine of the string kernels.
+        top_k (int): Patterns reported. Beyond the counters kept (see
+            PATTERN_COUNTERS), the patterns of a chunk that are left out
+            are counted as an error bound, as in
+            `sketches.space_saving_merge`.
+        chunk_rows (int): Rows profiled at a time.
+
+    Returns:
+        dict: The profile, for `merge_string_profiles` and
+        `format_string_profile`.
+    """
+    eng = get_engine(engine)
+    counters = max(PATTERN_COUNTERS, PATTERN_COUNTERS_PER_TOP * top_k)
+    profile = None
+    for start in range(0, max(1, len(series)), chunk_rows):
+        lengths, whitespace, patterns = eng.string_features(
+            series.iloc[start : start + chunk_rows]
+        )
+        patterns = patterns.sort_values(ascending=False, kind="stable")
+        chunk = {
+            "count": len(lengths),
+            "length_sum": int(lengths.sum()),
+            "length_min": int(lengths.min()) if len(lengths) else None,
+            "length_max": int(lengths.max()) if len(lengths) else None,
+            "length_bins": np.bincount(
+                np.frexp(lengths)[1], minlength=N_LENGTH_BINS
+            ),
+            "empty": int((lengths == 0).sum()),
+            "whitespace": whitespace,
+            # a truncated exact count is a Space-Saving summary
+            "patterns": (
+                patterns.iloc[:counters].astype("int64"),
+                pd.Series(
+                    0, index=patterns.index[:counters], dtype="int64"
+                ),
+            ),
+            "counters": counters,
+            "top_k": top_k,
+        }
+        profile = (
+            chunk
+            if profile is None
+            else merge_string_profiles(profile, chunk)
+        )
+    return profile
+
+
+def merge_string_profiles(left: dict, right: dict) -> dict:
+    """Combines the profiles of two chunks or partitions of a column."""
+    counters = max(left["counters"], right["counters"])
+    bounds = {
+        key: [p[key] for p in (left, right) if p[key] is not None]
+        for key in ("length_min", "length_max")
+    }
+    return {
+        "count": left["count"] + right["count"],
+        "length_sum": left["length_sum"] + right["length_sum"],
+        "length_min": min(bounds["length_min"], default=None),
+        "length_max": max(bounds["length_max"], default=None),
+        "length_bins": left["length_bins"] + right["length_bins"],
+        "empty": left["empty"] + right["empty"],
+        "whitespace": left["whitespace"] + right["whitespace"],
+        "patterns": space_saving_merge(
+            left["patterns"], right["patterns"], counters
+        ),
+        "counters": counters,
+        "top_k": max(left["top_k"], right["top_k"]),
+    }
+
+
+def format_string_profile(profile: dict) -> dict:
+    """
+    The summary entries of a profile: 'length_min', 'length_max',
+    'length_mean', 'length_histogram' (counts per length range), 'empty',
+    'whitespace', 'top_patterns' (the `top_k` most frequent first) and
+    'top_patterns_max_error'.
+    """
+    count = profile["count"]
+    counts, errors = profile["patterns"]
+    patterns = sorted(
+        counts.items(), key=lambda item: (-item[1], item[0])
+    )[: profile["top_k"]]
+    reported = [pattern for pattern, _ in patterns]
+    return {
+        "length_min": profile["length_min"],
+        "length_max": profile["length_max"],
+        "length_mean": (
+            round(profile["length_sum"] / count, 4) if count else None
+        ),
+        "length_histogram": {
+            _bin_label(i): int(n)
+            for i, n in enumerate(profile["length_bins"])
+            if n
+        },
+        "empty": profile["empty"],
+        "whitespace": profile["whitespace"],
+        "top_patterns": {pattern: int(n) for pattern, n in patterns},
+        "top_patterns_max_error": (
+            int(errors[reported].max()) if reported else 0
+        ),
+    }
+
+
+def _bin_label(i: int) -> str:
+    if i <= 1:
+        return str(i)
+    return f"{2 ** (i - 1)}-{2**i - 1}"
@@ -0,0 +1,133 @@
+"""
+timeseries.py
+
+Vectorized bucketing of datetime values into regular intervals.
+
+Timestamps are processed as their int64 nanosecond representation:
+hourly, daily and weekly buckets are floor divisions by the bucket
+width, monthly buckets come from NumPy's datetime64[M] cast, and the
+occurrences are counted with `np.bincount`. Several granularities are
+produced in one pass and the results of separate chunks can be merged,
+so very long columns can be bucketed incrementally.
+
+Public Functions:
+- bucket_counts(s, freqs): Counts per bucket for each granularity.
+- merge_bucket_counts(left, right): Combines the counts of two chunks.
+- choose_freq(start, end): Granularity used for a given time span.
+- bucket_datetime_series(s, freq): Counts per bucket at one granularity.
+"""
+
+import numpy as np
+import pandas as pd
+
+FREQS = ("H", "D", "W", "M")
+_NS_PER_HOUR = 3600 * 10**9
+_NS_PER_DAY = 24 * _NS_PER_HOUR
+# 1970-01-01 was a Thursday, weeks start on the Monday four days later
+_EPOCH_TO_MONDAY = 4
+# beyond this many bins, counting switches from bincount to sorting
+_MAX_BINCOUNT_BINS = 10**7
+
+
+def bucket_counts(s: pd.Series, freqs: tuple = FREQS) -> dict:
+    """Counts the values of a datetime column per bucket, per granularity.
+
+    Args:
+        s (pd.Series): A datetime column. Timezones are dropped, keeping
+            the local wall time.
+        freqs (tuple): Any of 'H', 'D', 'W' (weeks starting Monday) and
+            'M' (calendar months).
+
+    Returns:
+        dict: Granularity mapped to a Series of counts indexed by bucket
+        start, sorted, holding only non-empty buckets.
+    """
+    s = s.dropna()
+    if s.dt.tz is not None:
+        s = s.dt.tz_localize(None)
+    values = s.to_numpy(dtype="datetime64[ns]").view("int64")
+    return {freq: _count(values, freq) for freq in freqs}
+
+
+def merge_bucket_counts(left: dict, right: dict) -> dict:
+    """Adds up the bucket counts of two chunks of the same column."""
+    return {
+        freq: left[freq]
+        .add(right[freq], fill_value=0)
+        .astype("int64")
+        .sort_index()
+        for freq in left
+    }
+
+
+def choose_freq(start: pd.Timestamp, end: pd.Timestamp) -> str:
+    """Picks a granularity that keeps the number of buckets readable."""
+    date_range = end - start
+    if date_range > pd.Timedelta(days=730):
+        return "M"
+    if date_range > pd.Timedelta(days=90):
+        return "W"
+    if date_range > pd.Timedelta(days=7):
+        return "D"
+    return "H"
+
+
+def bucket_datetime_series(s: pd.Series, freq: str = None) -> pd.Series:
+    """Counts the values of a datetime column per bucket of `freq`.
+
+    If `freq` is None it is chosen from the span of the values.
+    """
+    s = s.dropna()
+    if freq is None:
+        freq = choose_freq(s.min(), s.max()) if len(s) else "D"
+    return bucket_counts(s, (freq,))[freq]
+
+
+def _count(values: np.ndarray, freq: str) -> pd.Series:
+    if freq == "H":
+        buckets = values // _NS_PER_HOUR
+        to_ns = _NS_PER_HOUR
+    elif freq == "D":
+        buckets = values // _NS_PER_DAY
+        to_ns = _NS_PER_DAY
+    elif freq == "W":
+        buckets = (values // _NS_PER_DAY - _EPOCH_TO_MONDAY) // 7
+        to_ns = None
+    elif freq == "M":
+        buckets = (
+            values.view("datetime64[ns]")
+            .astype("datetime64[M]")
+            .view("int64")
+        )
+        to_ns = None
+    else:
+        raise ValueError(f"Unsupported bucket frequency: {freq}")
+
+    if len(buckets) == 0:
+        return pd.Series(
+            [], index=pd.DatetimeIndex([]), dtype="int64", name="count"
+        )
+    low = buckets.min()
+    span = buckets.max() - low + 1
+    if span <= _MAX_BINCOUNT_BINS:
+        counts = np.bincount(buckets - low, minlength=span)
+        present = np.flatnonzero(counts)
+        keys, counts = present + low, counts[present]
+    else:
+        keys, counts = np.unique(buckets, return_counts=True)
+
+    if freq == "W":
+        starts = (keys * 7 + _EPOCH_TO_MONDAY) * _NS_PER_DAY
+    elif freq == "M":
+        starts = (
+            keys.astype("datetime64[M]")
+            .astype("datetime64[ns]")
+            .view("int64")
+        )
+    else:
+        starts = keys * to_ns
+    return pd.Series(
+        counts.astype("int64"),
+        index=pd.DatetimeIndex(starts.view("datetime64[ns]")),
+        name="count",
+    )
@@ -1,9 +1,10 @@
 """
 utility.py
 
-printing functions for dataframe and EDA types
+printing functions for dataframe and EDA types, and small parsing helpers
 """
 
+import re
 from tabulate import tabulate
 import pandas as pd
 from pandas.core.generic import NDFrame
@@ -121,4 +122,33 @@ def load_dict_with_nullable_types(dic, **kwargs):
         else:
             nullable_df[col] = series.astype("object")
 
-    return nullable_df
\ No newline at end of file
+    return nullable_df
+
+
+_SIZE_UNITS = {
+    "": 1,
+    "K": 1024,
+    "M": 1024**2,
+    "G": 1024**3,
+    "T": 1024**4,
+}
+_SIZE_PATTERN = re.compile(
+    r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)I?B?\s*$", re.I
+)
+
+
+def parse_size(size) -> int:
+    """
+    Parses a human readable memory size ('512M', '4G', '1.5GB') into bytes.
+    Plain integers are returned unchanged.
+
+    Raises:
+        ValueError: If the size string cannot be parsed.
+    """
+    if isinstance(size, (int, float)):
+        return int(size)
+    match = _SIZE_PATTERN.match(str(size))
+    if not match:
+        raise ValueError(f"Invalid memory size: {size}")
+    number, unit = match.groups()
+    return int(float(number) * _SIZE_UNITS[unit.upper()])
@@ -5,51 +5,71 @@ Provides plotting utilities for visual exploratory data analysis (EDA) on a tagg
 Requires columns to have an `eda_type` metadata attribute set beforehand.
 
 Public Functions:
-- generate_plots(df): Creates appropriate plots for each column based on its `eda_type`.
+- generate_plots(df, summary, output_dir): Creates appropriate plots for each column based on its `eda_type`.
 
 Private Functions:
 - _bucket_datetime_series(s, freq): Buckets datetime data into time intervals.
 - _plot_correlation_heatmap(df): Plots and saves a correlation heatmap of numeric variables.
-- save_plot(fig, name): Saves a Matplotlib figure to a consistent output directory.
+- save_plot(fig, name, plot_dir): Saves a Matplotlib figure to a consistent output directory.
 """
 
-from .log_setup.setup import setup, logging
+from .log_setup.setup import setup, logging, banner
 import os
 import matplotlib.pyplot as plt
 import matplotlib
 import seaborn as sns
 import pandas as pd
 import pandas.api.types as pd_types
+from .correlation import (
+    correlation_matrix,
+    top_correlated_pairs,
+    strongest_subset,
+)
+from .writer import OUTPUT_DIR, write_correlation
+from .timeseries import bucket_datetime_series
+from .profiler import missing_value_key
 
 logger = logging.getLogger(__name__)
 setup(logger)
 
 matplotlib.use("Agg")
-PLOT_OUTPUT_DIR = "output/plots"
+PLOT_OUTPUT_DIR = OUTPUT_DIR + "/plots"
 os.makedirs(PLOT_OUTPUT_DIR, exist_ok=True)
 
 
-def save_plot(fig: matplotlib.figure.Figure, name: str) -> None:
+def save_plot(
+    fig: matplotlib.figure.Figure, name: str, plot_dir: str = None
+) -> None:
     """Saves a Matplotlib figure to the designated output directory.
 
     Args:
         fig (matplotlib.figure.Figure): The figure to save.
         name (str): The base filename (without extension).
+        plot_dir (str, optional): Directory of the PNG, PLOT_OUTPUT_DIR by
+            default.
 
     Notes:
         Files are saved as PNG and the figure is closed afterward to free memory.
     """
     fig.tight_layout()
-    fig.savefig(os.path.join(PLOT_OUTPUT_DIR, f"{name}.png"))
-    logger.info(f"Saved {name}.png")
+    fig.savefig(
+        os.path.join(plot_dir or PLOT_OUTPUT_DIR, f"{name}.png")
+    )
+    logger.debug("Saved %s.png", name)
     plt.close(fig)
 
 
-def generate_plots(df: pd.DataFrame) -> None:
+def generate_plots(
+    df: pd.DataFrame, summary: dict = None, output_dir: str = None
+) -> None:
     """Generates column-wise plots based on EDA tags and saves them to disk.
 
     Args:
         df (pd.DataFrame): DataFrame with `eda_type` set as metadata on each column.
+        summary (dict, optional): Output of `generate_summary` for `df`.
+            Results already computed there (e.g. time buckets) are reused.
+        output_dir (str, optional): Output directory, the plots go to its
+            'plots/' subdirectory. Defaults to OUTPUT_DIR.
 
     Notes:
         This function generates:
@@ -58,38 +78,59 @@ def generate_plots(df: pd.DataFrame) -> None:
         - Time series counts for datetime columns
         - A correlation heatmap if at least two numeric columns are present
     """
-    print("*" * 90)
+    if output_dir is None:
+        output_dir, plot_dir = OUTPUT_DIR, PLOT_OUTPUT_DIR
+    else:
+        plot_dir = os.path.join(output_dir, "plots")
+        os.makedirs(plot_dir, exist_ok=True)
+    banner()
     logger.info("Generating column based plots")
-    print("*" * 90)
+    banner()
+    plotted = 0
     for col in df.columns:
         series = df[col]
         if pd_types.is_numeric_dtype(series):
             fig, ax = plt.subplots()
             sns.histplot(series.dropna(), kde=True, ax=ax)
             ax.set_title(f"Distribution of {col}")
-            save_plot(fig, f"hist_{col}")
+            save_plot(fig, f"hist_{col}", plot_dir)
 
         elif pd_types.is_bool_dtype(series):
             fig, ax = plt.subplots()
-            series.value_counts().plot(kind="bar", ax=ax)
+            _value_counts(series, summary).plot(kind="bar", ax=ax)
             ax.set_title(f"Boolean distribution of {col}")
-            save_plot(fig, f"bool_{col}")
+            save_plot(fig, f"bool_{col}", plot_dir)
 
         elif series.dtype.name == "category":
             fig, ax = plt.subplots()
-            series.value_counts().head(15).plot(kind="bar", ax=ax)
+            _value_counts(series, summary).head(15).plot(
+                kind="bar", ax=ax
+            )
             ax.set_title(f"Top categories in {col}")
-            save_plot(fig, f"cat_{col}")
+            save_plot(fig, f"cat_{col}", plot_dir)
 
         elif pd_types.is_datetime64_any_dtype(series):
             fig, ax = plt.subplots()
 
-            _bucket_datetime_series(series).plot(ax=ax)
+            col_summary = (summary or {}).get(col, {})
+            if "time_buckets" in col_summary:
+                buckets = _buckets_from_summary(col_summary)
+            else:
+                buckets = _bucket_datetime_series(series)
+            buckets.plot(ax=ax)
             ax.set_title(f"Time series of {col}")
-            save_plot(fig, f"date_{col}")
+            save_plot(fig, f"date_{col}", plot_dir)
+        else:
+            continue
+        plotted += 1
 
+    logger.info("Saved %d column based plots to %s", plotted, plot_dir)
     logger.info("Finished generating column based plots")
-    _plot_correlation_heatmap(df)
+    _plot_correlation_heatmap(
+        df,
+        os.path.join(plot_dir, "correlation_heatmap.png"),
+        output_dir=output_dir,
+    )
 
 
 def _bucket_datetime_series(
@@ -99,7 +140,7 @@ def _bucket_datetime_series(
 
     Args:
         s (pd.Series): A datetime column to bucket.
-        freq (str, optional): Pandas-compatible frequency string (e.g., 'M', 'D').
+        freq (str, optional): One of 'H', 'D', 'W' or 'M'.
                               If None, inferred based on time span.
 
     Returns:
@@ -108,6 +149,7 @@ def _bucket_datetime_series(
     Notes:
         Automatically handles timezone-stripped timestamps.
         Frequency is inferred if not provided, based on span of the date range.
+        Bucketing works on the int64 representation (see timeseries.py).
 
     Examples:
         >>> _bucket_datetime_series(df['created_at'])
@@ -115,44 +157,59 @@ def _bucket_datetime_series(
         2023-01-02    38
         ...
     """
-    s = s.dropna()
-
-    # Drop timezone if present to avoid warnings
-    if s.dt.tz is not None:
-        s = s.dt.tz_localize(None)
-
-    # Auto-determine frequency based on span
-    date_range = s.max() - s.min()
-    if freq is None:
-        if date_range > pd.Timedelta(days=730):
-            freq = "M"
-        elif date_range > pd.Timedelta(days=90):
-            freq = "W"
-        elif date_range > pd.Timedelta(days=7):
-            freq = "D"
-        else:
-            freq = "H"
+    return bucket_datetime_series(s, freq)
+
+
+def _value_counts(series: pd.Series, summary: dict = None) -> pd.Series:
+    """Counts of the present values, taken from the summary when possible."""
+    col_summary = (summary or {}).get(series.name, {})
+    if "value_counts" not in col_summary:
+        return series.value_counts()
+    missing_key = missing_value_key(series.dtype)
+    return pd.Series(
+        {
+            key: count
+            for key, count in col_summary["value_counts"].items()
+            if key != missing_key
+        },
+        dtype="int64",
+    )
 
-    # Robust bucketing for any freq
-    bucketed = s.dt.to_period(freq).dt.to_timestamp()
 
-    # Return full distribution
-    return bucketed.value_counts().sort_index()
+def _buckets_from_summary(col_summary: dict) -> pd.Series:
+    """Rebuilds the bucket counts stored by the profiler."""
+    counts = col_summary["time_buckets"]["counts"]
+    return pd.Series(
+        list(counts.values()),
+        index=pd.DatetimeIndex(list(counts.keys())),
+        dtype="int64",
+    )
 
 
 def _plot_correlation_heatmap(
     df: pd.DataFrame,
     output_path: str = PLOT_OUTPUT_DIR + "/correlation_heatmap.png",
+    method: str = "pearson",
+    max_columns: int = 25,
+    top_k: int = 50,
+    output_dir: str = None,
 ) -> None:
     """Generates and saves a heatmap of correlations among numeric columns.
 
     Args:
         df (pd.DataFrame): DataFrame with EDA-tagged columns.
         output_path (str): Path where the heatmap PNG should be saved.
+        method (str): 'pearson' or 'spearman'.
+        max_columns (int): Widest matrix drawn in full. Wider inputs are
+            reduced to the columns of their strongest pairs.
+        top_k (int): Strongest pairs exported for wide inputs.
+        output_dir (str, optional): Directory of the correlation CSVs,
+            OUTPUT_DIR by default.
 
     Notes:
         Only columns tagged with `eda_type == "numeric"` are considered.
         Skips plotting if fewer than 2 valid numeric columns are present.
+        The full matrix is written to the output directory.
     """
     numeric_cols = [
         col for col in df.columns if pd_types.is_numeric_dtype(df[col])
@@ -165,12 +222,25 @@ def _plot_correlation_heatmap(
         return
 
     logger.info("Generating correlation heatmap for the dataset")
-    corr = df[numeric_cols].corr(method="pearson")
+    corr = correlation_matrix(df, method=method, columns=numeric_cols)
+
+    if len(numeric_cols) > max_columns:
+        logger.info(
+            "%s numeric columns, plotting the %s most correlated ones",
+            len(numeric_cols),
+            max_columns,
+        )
+        write_correlation(
+            corr, top_correlated_pairs(corr, top_k), output_dir
+        )
+        corr = strongest_subset(corr, max_columns)
+    else:
+        write_correlation(corr, output_dir=output_dir)
 
     plt.figure(figsize=(10, 8))
     sns.heatmap(
         corr,
-        annot=True,
+        annot=len(corr) <= 15,
         fmt=".2f",
         cmap="coolwarm",
         center=0,
@@ -0,0 +1,15 @@
+import pytest
+from eda_cleaner import dates
+
+
+@pytest.fixture(autouse=True)
+def format_cache(tmp_path, monkeypatch):
+    """
+    Keeps the datetime formats found by every test that cleans data in
+    its own directory, never in a real output directory.
+    """
+    path = tmp_path / dates.FORMAT_CACHE_FILE
+    monkeypatch.setattr(dates, "_cache_path", str(path))
+    monkeypatch.setattr(dates, "_cache_source", "test")
+    monkeypatch.setattr(dates, "_format_cache", None)
+    return path
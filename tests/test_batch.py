@@ -0,0 +1,105 @@
+import csv
+import json
+import os
+import pytest
+import pandas as pd
+from eda_cleaner.batch import batch_jobs, run_batch
+
+
+@pytest.fixture
+def datasets(tmp_path):
+    for name in ["a", "b"]:
+        for folder in ["one", "two"]:
+            os.makedirs(tmp_path / folder, exist_ok=True)
+            pd.DataFrame(
+                {
+                    "Amount": [1.5, 2.0, None, 4.0],
+                    "Paid": list("yny") + [None],
+                    "Day": [
+                        "13/01/2020",
+                        "01/02/2020",
+                        None,
+                        "03/04/2020",
+                    ],
+                }
+            ).to_csv(tmp_path / folder / f"{name}.csv", index=False)
+    return tmp_path
+
+
+def test_batch_jobs(datasets):
+    """
+    - Test that every matching file becomes a job with the shared options
+    - Test that output names are unique and manifest options win
+    """
+    manifest = datasets / "jobs.json"
+    manifest.write_text(
+        json.dumps(
+            [
+                {"csv": "x.csv", "name": "../x", "top_k": 3},
+                {"db": "sqlite://", "table": "payments"},
+            ]
+        )
+    )
+
+    jobs = batch_jobs(
+        [str(datasets / "*" / "*.csv")],
+        manifest=str(manifest),
+        options={"top_k": 5},
+    )
+
+    assert [job["name"] for job in jobs] == [
+        "a",
+        "b",
+        "a_2",
+        "b_2",
+        "_x",
+        "payments",
+    ]
+    assert [job["top_k"] for job in jobs] == [5, 5, 5, 5, 3, 5]
+
+    with pytest.raises(ValueError):
+        batch_jobs(tables=["payments"])
+    with pytest.raises(ValueError):
+        batch_jobs(manifest=str(manifest), options={"unknown": 1})
+
+
+def test_run_batch(datasets):
+    """
+    - Test that every dataset is written to its own directory
+    - Test that the index reports results, timings and failures in order
+    - Test that the jobs share one datetime format cache, keyed by input
+    """
+    jobs = batch_jobs(
+        [str(datasets / "one" / "*.csv")], options={"plots": False}
+    )
+    jobs.append(
+        {"csv": str(datasets / "missing.csv"), "name": "missing"}
+    )
+    output_root = datasets / "batch"
+
+    entries = run_batch(jobs, workers=2, output_root=str(output_root))
+
+    assert [entry["name"] for entry in entries] == ["a", "b", "missing"]
+    assert [entry["status"] for entry in entries] == [
+        "done",
+        "done",
+        "failed",
+    ]
+    assert entries[0]["rows"] == 4 and entries[2]["error"]
+    for name in ["a", "b"]:
+        assert {"summary.json", "clean_data.csv"} <= set(
+            os.listdir(output_root / name)
+        )
+    with open(output_root / "index.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["status"] for row in rows] == ["done", "done", "failed"]
+    assert (
+        json.loads((output_root / "index.json").read_text()) == entries
+    )
+    cache = json.loads(
+        (output_root / "datetime_formats.json").read_text()
+    )
+    assert cache == {
+        str(datasets / "one" / f"{name}.csv"): {"day": "%d/%m/%Y"}
+        for name in ["a", "b"]
+    }
@@ -0,0 +1,127 @@
+import os
+import pytest
+import pandas as pd
+from eda_cleaner import pipeline
+from eda_cleaner.checkpoint import (
+    load_frame,
+    mark_done,
+    open_checkpoint,
+    save_frame,
+    stage_done,
+)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame(
+        {
+            "Amount": [1.5, 2.0, None, 4.0],
+            "Paid": list("yny") + [None],
+        }
+    ).to_csv(path, index=False)
+    return {"csv": str(path)}
+
+
+def test_open_checkpoint(tmp_path, source):
+    """
+    - Test that a checkpoint is only resumed with the same input and options
+    - Test that the cleaned frame keeps its dtypes, index and reports
+    """
+    output_dir = str(tmp_path / "output")
+    checkpoint = open_checkpoint(output_dir, source, {"top_k": 5})
+    df = pd.DataFrame(
+        {
+            "a": pd.array([1, None, 3], dtype="Int64"),
+            "b": pd.array([True, False, None], dtype="boolean"),
+            "c": pd.Series(["x", "y", "x"], dtype="category"),
+            "d": pd.to_datetime(["2024-01-01", None, "2024-03-01"]),
+        },
+        index=[0, 2, 5],
+    )
+    df.attrs["memory_report"] = {"a": {"bytes_before": 10}}
+    save_frame(checkpoint, df)
+
+    resumed = open_checkpoint(output_dir, source, {"top_k": 5}, True)
+    assert stage_done(resumed, "clean")
+    assert not stage_done(resumed, "summary")
+    loaded = load_frame(resumed)
+    pd.testing.assert_frame_equal(loaded, df)
+    assert loaded.attrs == df.attrs
+
+    with pytest.raises(ValueError, match="top_k"):
+        open_checkpoint(output_dir, source, {"top_k": 3}, True)
+    with open(source["csv"], "a") as f:
+        f.write("5.0,y\n")
+    with pytest.raises(ValueError, match="input changed"):
+        open_checkpoint(output_dir, source, {"top_k": 5}, True)
+
+    fresh = open_checkpoint(output_dir, source, {"top_k": 5})
+    assert fresh["stages"] == {}
+
+
+def test_open_checkpoint_db(tmp_path, monkeypatch):
+    """
+    - Test that a database input is identified by its table and schema
+    - Test that changes to the rows of the table are an input change
+    """
+    output_dir = str(tmp_path / "output")
+    source = {"db": f"sqlite:///{tmp_path / 'data.db'}", "table": "a"}
+    open_checkpoint(output_dir, source, {})
+    assert open_checkpoint(output_dir, source, {}, True)["source"] == {
+        "db": source["db"],
+        "table": "a",
+        "schema": None,
+    }
+    for changed in [{"table": "b"}, {"schema": "other"}]:
+        with pytest.raises(ValueError, match="input changed"):
+            open_checkpoint(output_dir, {**source, **changed}, {}, True)
+
+    version = [10, 0, 0, 16384]
+    monkeypatch.setattr(
+        "eda_cleaner.checkpoint._table_version", lambda source: version
+    )
+    open_checkpoint(output_dir, source, {})
+    open_checkpoint(output_dir, source, {}, True)
+    version[0] += 1
+    with pytest.raises(ValueError, match="input changed"):
+        open_checkpoint(output_dir, source, {}, True)
+
+
+def test_run_pipeline_resume(tmp_path, source, monkeypatch):
+    """
+    - Test that every stage is checkpointed as it finishes
+    - Test that a resumed run only runs the unfinished stages
+    """
+    output_dir = str(tmp_path / "output")
+    options = {"plots": False}
+    checkpoint = open_checkpoint(output_dir, source, options)
+    pipeline.run_pipeline(
+        pd.read_csv(source["csv"]),
+        output_dir,
+        checkpoint=checkpoint,
+        **options,
+    )
+    assert set(checkpoint["stages"]) == {
+        "clean",
+        "summary",
+        "json",
+        "csv",
+    }
+
+    # as if the run had died while writing the CSV
+    checkpoint = open_checkpoint(output_dir, source, options, True)
+    del checkpoint["stages"]["csv"]
+    os.remove(os.path.join(output_dir, "clean_data.csv"))
+
+    def clean_again(*args):
+        raise AssertionError("the cleaned dataset was checkpointed")
+
+    monkeypatch.setattr(pipeline, "clean_pipeline", clean_again)
+    results = pipeline.run_pipeline(
+        None, output_dir, checkpoint=checkpoint, **options
+    )
+    assert set(results) == {"summary", "csv"}
+    assert "amount" in results["summary"]
+    assert os.path.exists(os.path.join(output_dir, "clean_data.csv"))
+    assert stage_done(checkpoint, "csv")
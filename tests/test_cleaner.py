@@ -1,13 +1,31 @@
+from decimal import Decimal
+import importlib.util
 import pytest
 import pandas as pd
 import numpy as np
 from eda_cleaner.cleaner import (
+    clean_pipeline,
     standardize_column_names,
     remove_duplicates,
     coerce_nullable_data_types,
     coerce_eda_types,
     handle_missing_values,
+    downcast_types,
+    recover_numeric_strings,
 )
+from eda_cleaner.engines import get_engine
+from eda_cleaner.external import external_dedup_csv
+
+ENGINES = [
+    "pandas",
+    pytest.param(
+        "arrow",
+        marks=pytest.mark.skipif(
+            importlib.util.find_spec("pyarrow") is None,
+            reason="pyarrow is not installed",
+        ),
+    ),
+]
 
 
 @pytest.mark.parametrize(
@@ -75,9 +93,10 @@ from eda_cleaner.cleaner import (
         ),
     ],
 )
-def test_standardize_column_names(dic, expected):
+@pytest.mark.parametrize("engine", ENGINES)
+def test_standardize_column_names(dic, expected, engine):
     pd.testing.assert_index_equal(
-        standardize_column_names(pd.DataFrame(dic)).columns,
+        standardize_column_names(pd.DataFrame(dic), engine).columns,
         pd.DataFrame(expected).columns,
     )
 
@@ -117,6 +136,53 @@ def test_remove_duplicates(dic, expected):
     )
 
 
+@pytest.mark.parametrize("workers", [1, 2])
+def test_remove_duplicates_external(workers):
+    """
+    - Test that out-of-core duplicate removal, with a budget small enough
+      to force re-partitioning, matches the in-memory result
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "num": rng.integers(0, 20, 5000),
+            "name": rng.choice(["Alice", "Bob", None], 5000),
+            "age": pd.array(rng.integers(0, 3, 5000), dtype="Int64"),
+        }
+    )
+    pd.testing.assert_frame_equal(
+        remove_duplicates(df, memory_budget="64K", workers=workers),
+        df.drop_duplicates(keep="first"),
+    )
+
+
+def test_external_dedup_csv(tmp_path):
+    """
+    - Test that a CSV file streamed through out-of-core duplicate removal
+      matches the in-memory result, also when chunks infer other dtypes
+      (integers and floats, numbers and text) for the same column
+    - Test that the loaded frame is not deduplicated again
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "num": rng.integers(0, 5, 3000),
+            "code": rng.integers(0, 5, 3000).astype(str),
+            "name": rng.choice(["Alice", "Bob"], 3000),
+        }
+    )
+    df.loc[2500, "num"] = None
+    df.loc[2600, "code"] = "x1"
+    path = tmp_path / "rows.csv"
+    df.to_csv(path, index=False)
+
+    loaded = external_dedup_csv(path, "64K", chunk_rows=500)
+    expected = pd.read_csv(path).drop_duplicates(keep="first")
+    pd.testing.assert_frame_equal(loaded, expected)
+    assert loaded.attrs["deduplicated"] == 3000 - len(expected)
+    assert remove_duplicates(loaded) is loaded
+
+
 @pytest.mark.parametrize(
     "dic, expected",
     [
@@ -204,14 +270,52 @@ def test_remove_duplicates(dic, expected):
         ),
     ],
 )
-def test_coerce_nullable_data_types(dic, expected):
+@pytest.mark.parametrize("engine", ENGINES)
+def test_coerce_nullable_data_types(dic, expected, engine):
     pd.testing.assert_frame_equal(
-        coerce_nullable_data_types(pd.DataFrame(dic)),
+        coerce_nullable_data_types(pd.DataFrame(dic), engine),
         expected,
         check_dtype=True,
     )
 
 
+@pytest.mark.parametrize(
+    "values",
+    [
+        pd.Series([1, 2, 3]),
+        pd.Series([1, 2, None], dtype="Int64"),
+        pd.Series([1.5, 2.0], dtype="float32"),
+        pd.Series([True, False]),
+        pd.Series(["a", "b"], dtype="string"),
+        pd.Series(["a", "b"], dtype="category"),
+        pd.to_datetime(pd.Series(["2024-01-01", "2024-02-01"])),
+        pd.Series(pd.to_timedelta([1, 2], unit="D")),
+        pd.Series([1, 2], dtype=object),
+        pd.Series([True, False], dtype=object),
+        pd.Series(["a", "b"], dtype=object),
+        pd.Series([b"a", b"b"], dtype=object),
+        pd.Series([1, 2.5], dtype=object),
+        pd.Series([1.5, 2.5], dtype=object),
+        pd.Series(["a", 1], dtype=object),
+        pd.Series([1 + 2j, 3j]),
+        pd.Series([pd.Timestamp("2024-01-01")], dtype=object),
+        pd.Series([np.datetime64("2024-01-01")], dtype=object),
+        pd.Series([pd.Timestamp("2024-01-01").date()], dtype=object),
+        pd.Series([pd.Timestamp("2024-01-01").time()], dtype=object),
+        pd.Series([Decimal("1.5"), Decimal("2")]),
+        pd.Series([2**64, 1], dtype=object),
+    ],
+)
+def test_infer_kind(values):
+    """
+    - Test that the arrow engine labels columns like pandas' infer_dtype
+    """
+    pytest.importorskip("pyarrow")
+    assert get_engine("arrow").infer_kind(values) == get_engine(
+        "pandas"
+    ).infer_kind(values)
+
+
 @pytest.mark.parametrize(
     "dic, expected",
     [
@@ -515,3 +619,177 @@ def test_handle_missing_values(dic, expected):
         expected,
         check_dtype=True,
     )
+
+
+@pytest.mark.parametrize(
+    "dic, expected",
+    [
+        (
+            # dic0: integers to the narrowest width covering min/max
+            pd.DataFrame(
+                {
+                    "small": pd.Series([1, 2, None]).astype("Int64"),
+                    "negative": pd.Series([-300, 2, 3]).astype("Int64"),
+                    "large": pd.Series([0, 70000, None]).astype(
+                        "Int64"
+                    ),
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "small": pd.Series([1, 2, None]).astype("UInt8"),
+                    "negative": pd.Series([-300, 2, 3]).astype("Int16"),
+                    "large": pd.Series([0, 70000, None]).astype(
+                        "UInt32"
+                    ),
+                }
+            ),
+        ),
+        (
+            # dic1: floats only when exactly representable in 32 bits
+            pd.DataFrame(
+                {
+                    "exact": pd.Series([0.5, 1.25, None]).astype(
+                        "Float64"
+                    ),
+                    "inexact": pd.Series([0.1, 1.25, None]).astype(
+                        "Float64"
+                    ),
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "exact": pd.Series([0.5, 1.25, None]).astype(
+                        "Float32"
+                    ),
+                    "inexact": pd.Series([0.1, 1.25, None]).astype(
+                        "Float64"
+                    ),
+                }
+            ),
+        ),
+        (
+            # dic2: repetitive strings to category, unique ones kept
+            pd.DataFrame(
+                {
+                    "repetitive": pd.Series(["ab", "cd"] * 50).astype(
+                        "string"
+                    ),
+                    "unique": pd.Series(
+                        [f"name{n}" for n in range(100)]
+                    ).astype("string"),
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "repetitive": pd.Series(["ab", "cd"] * 50)
+                    .astype("string")
+                    .astype("category"),
+                    "unique": pd.Series(
+                        [f"name{n}" for n in range(100)]
+                    ).astype("string"),
+                }
+            ),
+        ),
+    ],
+)
+def test_downcast_types(dic, expected):
+    pd.testing.assert_frame_equal(
+        downcast_types(dic),
+        expected,
+        check_dtype=True,
+    )
+
+
+@pytest.mark.parametrize(
+    "dic, expected",
+    [
+        (
+            # dic0: separators, currency, percent and whitespace stripped
+            {
+                "count": [" 42 ", "1,234", "7", None],
+                "price": ["$1,200.50", "$3.00", "-$4", None],
+                "share": ["12%", "5.5%", "100%", None],
+            },
+            pd.DataFrame(
+                {
+                    "count": pd.Series([42, 1234, 7, None]).astype(
+                        "Int64"
+                    ),
+                    "price": pd.Series(
+                        [1200.5, 3.0, -4.0, None]
+                    ).astype("Float64"),
+                    "share": pd.Series([0.12, 0.055, 1.0, None]).astype(
+                        "Float64"
+                    ),
+                }
+            ),
+        ),
+        (
+            # dic1: text, zero-padded codes and ambiguous numbers are kept
+            {
+                "name": ["Alex", "42", "7", None],
+                "zip": ["02134", "10001", "30301", None],
+                "european": ["1.234,56", "7,5", "3", None],
+                "user_id": ["1,001", "1,002", "1,003", None],
+            },
+            pd.DataFrame(
+                {
+                    "name": pd.Series(["Alex", "42", "7", None]).astype(
+                        "string"
+                    ),
+                    "zip": pd.Series(
+                        ["02134", "10001", "30301", None]
+                    ).astype("string"),
+                    "european": pd.Series(
+                        ["1.234,56", "7,5", "3", None]
+                    ).astype("string"),
+                    "user_id": pd.Series(
+                        ["1,001", "1,002", "1,003", None]
+                    ).astype("string"),
+                }
+            ),
+        ),
+    ],
+)
+@pytest.mark.parametrize("engine", ENGINES)
+def test_recover_numeric_strings(dic, expected, engine):
+    df = pd.DataFrame(dic).astype("string")
+    pd.testing.assert_frame_equal(
+        recover_numeric_strings(df, engine),
+        expected,
+        check_dtype=True,
+    )
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_recover_numeric_strings_malformed(engine, monkeypatch):
+    """
+    - Test that values with more than one sign are not numbers
+    - Test that malformed cells of a numeric column become missing
+      instead of stopping the cleaning
+    - Test that values the pattern lets through but are no numbers are
+      missing too
+    """
+    parse = get_engine(engine).parse_numeric_text
+    text = pd.Series(
+        ["--5", "-$-5", "- -5", "+-5", "-$5", "$-5", "- 5", "+5"],
+        dtype="string",
+    )
+    expected = [np.nan] * 4 + [-5.0, -5.0, -5.0, 5.0]
+    assert parse(text).tolist() == pytest.approx(expected, nan_ok=True)
+
+    df = pd.DataFrame(
+        {"price": ["-$-5", "--5"] + [str(i) for i in range(500)]},
+        dtype="string",
+    )
+    price = recover_numeric_strings(df, engine)["price"]
+    assert price.dtype == "Int64"
+    assert price.isna().sum() == 2
+    assert "price" in clean_pipeline(df.iloc[:51], engine=engine)
+
+    # a pattern letting everything through
+    monkeypatch.setattr(
+        get_engine(engine), "_NUMERIC_TEXT_PATTERN", ".*"
+    )
+    assert parse(text).isna().tolist()[:3] == [True] * 3
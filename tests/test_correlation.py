@@ -0,0 +1,114 @@
+import pytest
+import pandas as pd
+import numpy as np
+from eda_cleaner import correlation
+from eda_cleaner.correlation import (
+    correlation_matrix,
+    strongest_subset,
+    top_correlated_pairs,
+)
+
+
+@pytest.fixture
+def numeric_df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(2000, 4)), columns=list("abcd"))
+    df["b"] += 3 * df["a"] + 1e6
+    df.loc[rng.integers(0, 2000, 300), "c"] = np.nan
+    df["e"] = pd.array(rng.integers(0, 5, 2000), dtype="Int64")
+    df.loc[3, "e"] = pd.NA
+    return df
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_correlation_matrix(numeric_df, chunked):
+    """
+    - Test that blockwise, pairwise-complete Pearson correlation matches
+      pandas, whether the rows are in memory or streamed in chunks
+    """
+    data = numeric_df
+    if chunked:
+        data = (
+            numeric_df.iloc[i : i + 300] for i in range(0, 2000, 300)
+        )
+    pd.testing.assert_frame_equal(
+        correlation_matrix(data),
+        numeric_df.astype("float64").corr(),
+        rtol=1e-9,
+    )
+
+
+def test_top_correlated_pairs(numeric_df):
+    """
+    - Test that the strongest pair comes first and self-pairs are excluded
+    """
+    pairs = top_correlated_pairs(correlation_matrix(numeric_df), k=3)
+    assert len(pairs) == 3
+    assert set(pairs.iloc[0][["column_1", "column_2"]]) == {"a", "b"}
+
+
+def test_correlation_matrix_spearman(numeric_df, monkeypatch):
+    """
+    - Test that Spearman correlation of in-memory rows matches pandas
+    - Test that streamed ranks do not depend on the first chunk, with
+      rows sorted so that every chunk covers a different range
+    - Test that merged rank sketches stay bounded and close to pandas
+    """
+    complete = numeric_df.drop(columns="c").dropna().astype("float64")
+    expected = complete.corr(method="spearman")
+    pd.testing.assert_frame_equal(
+        correlation_matrix(complete, method="spearman"),
+        expected,
+        rtol=1e-9,
+    )
+
+    trend = complete.sort_values("a")
+    trend["f"] = np.exp(trend["a"]) + np.arange(len(trend)) / 1e3
+    expected = trend.corr(method="spearman")
+    chunks = (
+        trend.iloc[i : i + 300] for i in range(0, len(trend), 300)
+    )
+    # few enough values that the sketch keeps all of them
+    pd.testing.assert_frame_equal(
+        correlation_matrix(chunks, method="spearman"),
+        expected,
+        rtol=1e-9,
+    )
+
+    monkeypatch.setattr(correlation, "RANK_SKETCH_SIZE", 64)
+    chunks = (
+        trend.iloc[i : i + 300] for i in range(0, len(trend), 300)
+    )
+    pd.testing.assert_frame_equal(
+        correlation_matrix(chunks, method="spearman"),
+        expected,
+        atol=0.01,
+    )
+
+
+def test_strongest_subset():
+    """
+    - Test that the columns of the strongest pairs are kept
+    - Test that correlated columns end up next to each other
+    """
+    rng = np.random.default_rng(1)
+    base = rng.normal(size=(500, 2))
+    df = pd.DataFrame(
+        {
+            "x1": base[:, 0],
+            "y1": base[:, 1],
+            "x2": base[:, 0] + rng.normal(scale=0.1, size=500),
+            "noise": rng.normal(size=500),
+            "y2": base[:, 1] + rng.normal(scale=0.1, size=500),
+        }
+    )
+    corr = correlation_matrix(df)
+    assert strongest_subset(corr, max_columns=5) is corr
+
+    subset = strongest_subset(corr, max_columns=4)
+    assert set(subset.index) == {"x1", "x2", "y1", "y2"}
+    assert list(subset.columns) == list(subset.index)
+    order = list(subset.index)
+    for pair in ({"x1", "x2"}, {"y1", "y2"}):
+        positions = sorted(order.index(col) for col in pair)
+        assert positions[1] - positions[0] == 1
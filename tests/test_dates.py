@@ -0,0 +1,101 @@
+import json
+import os
+import pytest
+import pandas as pd
+from eda_cleaner import dates
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        (["2020-01-01", "2021-03-04", None], "%Y-%m-%d"),
+        (["01/02/2020", "12/31/2020"], "%m/%d/%Y"),
+        (["13/01/2020", "01/02/2020"], "%d/%m/%Y"),
+        (["1600000000", "1700000000"], "epoch_s"),
+        (["1600000000000", None], "epoch_ms"),
+        (["22-05-23", "24-04-15T17:00", "2000-01-01"], dates.MIXED),
+    ],
+)
+def test_infer_format(values, expected):
+    """
+    - Test that common formats are inferred from the sample
+    - Test that dates of varying formats are reported as mixed
+    """
+    assert dates.infer_format(pd.Series(values)) == expected
+
+
+@pytest.mark.parametrize(
+    "values",
+    [["alex", "john"], ["12", "13"], ["2345-220-11", "2024-05-01"]],
+)
+def test_infer_format_rejects(values):
+    """
+    - Test that text that is not dates is rejected
+    """
+    with pytest.raises(ValueError):
+        dates.infer_format(pd.Series(values))
+
+
+def test_parse_datetimes(tmp_path):
+    """
+    - Test that the column is parsed with the inferred format
+    - Test that the format is cached under the input and column name
+    """
+    dates.use_format_cache(str(tmp_path), {"csv": "days.csv"})
+    series = pd.Series(["13/01/2020", "01/02/2020", None], name="day")
+
+    parsed = dates.parse_datetimes(series, column="day")
+
+    assert parsed.tolist()[:2] == [
+        pd.Timestamp("2020-01-13"),
+        pd.Timestamp("2020-02-01"),
+    ]
+    assert parsed.isna().tolist() == [False, False, True]
+    cache = json.loads((tmp_path / dates.FORMAT_CACHE_FILE).read_text())
+    assert cache == {os.path.abspath("days.csv"): {"day": "%d/%m/%Y"}}
+
+
+def test_format_cache(tmp_path):
+    """
+    - Test that a cached format is only taken for an unambiguous sample
+    - Test that the formats of another input are not used
+    """
+    dates.use_format_cache(str(tmp_path), {"csv": "days.csv"})
+    dates.parse_datetimes(pd.Series(["13/01/2020"]), column="day")
+
+    # fits the day-first format as well as the month-first one
+    assert dates.infer_format(pd.Series(["01/02/2020"]), "day") == (
+        "%m/%d/%Y"
+    )
+    assert dates.infer_format(pd.Series(["02/20/2020"]), "day") == (
+        "%m/%d/%Y"
+    )
+    dates.use_format_cache(str(tmp_path), {"csv": "other.csv"})
+    assert dates._cached_format("day") is None
+    dates.use_format_cache(str(tmp_path), {"csv": "days.csv"})
+    assert dates._cached_format("day") == "%d/%m/%Y"
+
+
+def test_format_cache_merge(tmp_path):
+    """
+    - Test that saving a format keeps the formats saved meanwhile by
+      another process
+    """
+    dates.use_format_cache(str(tmp_path), {"csv": "days.csv"})
+    assert dates._cached_format("day") is None
+    # written by another run after this one read the cache
+    path = tmp_path / dates.FORMAT_CACHE_FILE
+    other = {os.path.abspath("other.csv"): {"date": "%Y-%m-%d"}}
+    path.write_text(json.dumps(other))
+
+    dates.parse_datetimes(pd.Series(["13/01/2020"]), column="day")
+
+    assert json.loads(path.read_text()) == {
+        **other,
+        os.path.abspath("days.csv"): {"day": "%d/%m/%Y"},
+    }
+    # no temporary file is left behind
+    assert sorted(os.listdir(tmp_path)) == [
+        dates.FORMAT_CACHE_FILE,
+        f"{dates.FORMAT_CACHE_FILE}.lock",
+    ]
@@ -0,0 +1,97 @@
+import threading
+import time
+import pandas as pd
+from sqlalchemy import create_engine
+from concurrent.futures import ThreadPoolExecutor
+from eda_cleaner import governor
+from eda_cleaner.governor import (
+    estimate_row_bytes,
+    governed_map,
+    memory_budget,
+    plan_memory,
+    plan_table_memory,
+    start_governor,
+    stop_governor,
+)
+
+
+def test_memory_budget():
+    """
+    - Test that sizes are parsed and 'auto' reads the available memory
+    """
+    assert memory_budget("512M") == 512 * 1024**2
+    assert 0 < memory_budget("auto")
+
+
+def test_plan_memory(tmp_path):
+    """
+    - Test that the size of a row is estimated from the first rows
+    - Test that a small budget means fewer parse workers and out-of-core
+      deduplication
+    """
+    csv_file = tmp_path / "data.csv"
+    pd.DataFrame(
+        {"id": range(20_000), "name": ["some text"] * 20_000}
+    ).to_csv(csv_file, index=False)
+
+    row_bytes, disk_row_bytes = estimate_row_bytes(csv_file)
+    assert row_bytes > disk_row_bytes > 0
+
+    plan = plan_memory(csv_file, 1024**3, read_workers=4)
+    assert abs(plan["rows"] - 20_000) < 1000
+    assert plan["read_workers"] == 4 and plan["dedup_memory"] is None
+
+    plan = plan_memory(csv_file, 2 * 1024**2, read_workers=4)
+    assert plan["read_workers"] == 1 and plan["dedup_memory"] == 1024**2
+
+
+def test_plan_table_memory(tmp_path):
+    """
+    - Test that the rows and size of a row of a table are estimated
+    - Test that a small budget means out-of-core deduplication
+    """
+    uri = f"sqlite:///{tmp_path / 'data.db'}"
+    pd.DataFrame(
+        {"id": range(20_000), "name": ["some text"] * 20_000}
+    ).to_sql("data", create_engine(uri), index=False)
+
+    plan = plan_table_memory(uri, "data", 1024**3)
+    assert plan["rows"] == 20_000 and plan["row_bytes"] > 0
+    assert plan["dedup_memory"] is None
+
+    plan = plan_table_memory(uri, "data", 2 * 1024**2)
+    assert plan["dedup_memory"] == 1024**2
+    assert plan["chunk_rows"] >= governor.MIN_CHUNK_ROWS
+
+
+def test_governed_map(monkeypatch):
+    """
+    - Test that results come back in order, like pool.map
+    - Test that fewer tasks run at a time under memory pressure
+    """
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def task(x):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return x * 2
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(
+            governed_map(pool, task, range(20), max_workers=4)
+        ) == [x * 2 for x in range(20)]
+        assert peak[0] == 4
+
+        start_governor(1024**4, interval=0.01)
+        monkeypatch.setattr(governor._governor, "rss", lambda: 1024**4)
+        peak[0] = 0
+        assert list(
+            governed_map(pool, task, range(8), max_workers=4)
+        ) == [x * 2 for x in range(8)]
+        stop_governor()
+        assert peak[0] == 1
@@ -0,0 +1,149 @@
+import importlib
+import sys
+import time
+import numpy as np
+import pytest
+import pandas as pd
+from eda_cleaner import kernels
+
+INT64 = np.iinfo(np.int64)
+
+
+@pytest.fixture(params=[True, False], ids=["numba", "numpy"])
+def compiled(request, monkeypatch):
+    if request.param and not kernels.HAVE_NUMBA:
+        pytest.skip("numba is not installed")
+    monkeypatch.setattr(kernels, "HAVE_NUMBA", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize(
+    "series",
+    [
+        pd.Series([3, 1, None, 2], dtype="Int64"),
+        pd.Series([0, 1, 1, None], dtype="UInt8"),
+        pd.Series([1.5, None, -2.0], dtype="Float64"),
+        pd.Series([1.0, np.nan, 4.0]),
+        pd.Series([5, -3, 7], dtype="int16"),
+        pd.Series([True, None, False], dtype="boolean"),
+        pd.Series([True, True]),
+    ],
+)
+def test_column_stats(series, compiled):
+    """
+    - Test that the fused statistics match pandas' own reductions
+    - Test that min / max keep the column's scalar type
+    """
+    stats = kernels.column_stats(series)
+    values = series.dropna().astype("float64")
+
+    assert stats["count"] == series.count()
+    assert stats["missing"] == series.isna().sum()
+    assert stats["min"] == series.min()
+    assert type(stats["min"]) is type(series.min())
+    assert stats["max"] == series.max()
+    assert stats["sum"] == pytest.approx(values.sum())
+    assert stats["sum_sq"] == pytest.approx((values**2).sum())
+    assert stats["binary"] == values.isin([0, 1]).all()
+    assert stats["integral"] == (values % 1 == 0).all()
+
+
+def test_column_stats_edge_cases(compiled):
+    """
+    - Test that columns without values have no min / max
+    - Test that non-numeric columns are not supported
+    """
+    stats = kernels.column_stats(pd.Series([None, None], dtype="Int64"))
+    assert stats["count"] == 0
+    assert stats["missing"] == 2
+    assert stats["min"] is None and stats["max"] is None
+
+    assert kernels.column_stats(pd.Series(["a", "b"])) is None
+
+
+@pytest.mark.parametrize(
+    "series",
+    [
+        pd.Series([None, None, None], dtype="Int64"),
+        pd.Series([np.nan, np.nan]),
+        pd.Series([], dtype="float64"),
+        pd.Series([INT64.min, None, INT64.max, 0], dtype="Int64"),
+        pd.Series([INT64.max, INT64.min, INT64.max - 1]),
+        pd.Series([np.iinfo(np.uint64).max, 1], dtype="uint64"),
+        pd.Series([1.0, np.inf, -np.inf, np.nan]),
+    ],
+    ids=[
+        "all-na",
+        "all-nan",
+        "empty",
+        "Int64",
+        "int64",
+        "uint64",
+        "inf",
+    ],
+)
+def test_column_stats_paths_agree(series):
+    """
+    - Test that the loop compiled with numba and the NumPy fallback agree,
+      the loop also run uncompiled where numba is not installed
+    - Test that int64 extremes keep their exact min / max
+    """
+    values, mask = kernels._values_and_mask(series)
+    expected = kernels._numpy_stats(values, mask)
+    loops = [kernels._stats_loop]
+    if kernels.HAVE_NUMBA:
+        loops.append(kernels._fused_stats)
+    for loop in loops:
+        stats = loop(values, mask)
+        count = stats[0]
+        assert count == expected[0] == series.count()
+        if count:
+            assert stats[1:3] == expected[1:3]
+            assert stats[1:3] == (series.min(), series.max())
+        assert stats[3:5] == pytest.approx(expected[3:5], nan_ok=True)
+        assert stats[5:] == expected[5:]
+
+
+def test_column_stats_without_numba(monkeypatch):
+    """
+    - Test that the module falls back to NumPy when numba cannot be imported
+    - Test that the fallback gives the statistics of the compiled path
+    """
+    series = pd.Series([INT64.min, None, INT64.max, 1], dtype="Int64")
+    expected = kernels.column_stats(series)
+    monkeypatch.setitem(sys.modules, "numba", None)
+    try:
+        fallback = importlib.reload(kernels)
+        assert not fallback.HAVE_NUMBA
+        assert fallback._fused_stats is None
+        assert fallback.column_stats(series) == expected
+        assert fallback.column_stats(series)["min"] == INT64.min
+    finally:
+        monkeypatch.undo()
+        importlib.reload(kernels)
+
+
+def test_column_stats_benchmark():
+    """
+    - Test that the compiled pass is faster than pandas' separate
+      reductions on a large nullable column
+    """
+    if not kernels.HAVE_NUMBA:
+        pytest.skip("numba is not installed")
+    rng = np.random.default_rng(0)
+    series = pd.Series(rng.integers(0, 100, 5 * 10**6), dtype="Int64")
+    series[rng.integers(0, len(series), 10**5)] = None
+    kernels.column_stats(series.iloc[:10])  # compiles
+
+    start = time.perf_counter()
+    kernels.column_stats(series)
+    fused = time.perf_counter() - start
+
+    start = time.perf_counter()
+    values = series.dropna()
+    values.count(), series.isna().sum(), values.min(), values.max()
+    values.sum(), (values.astype("float64") ** 2).sum()
+    values.isin([0, 1]).all()
+    separate = time.perf_counter() - start
+
+    assert fused < separate
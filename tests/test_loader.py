@@ -1,6 +1,6 @@
 import pytest
 import pandas as pd
-from eda_cleaner.loader import pg_load, csv_load
+from eda_cleaner.loader import pg_load, csv_load, parallel_csv_load
 
 
 @pytest.mark.xfail(
@@ -56,3 +56,68 @@ def test_csv_load(csv_file, expected):
     - Test that invalid csv_paths are successfully returning None
     """
     assert type(csv_load(csv_file)) == expected
+
+
+def test_parallel_csv_load(tmp_path):
+    """
+    - Test that byte ranges are parsed into the same DataFrame as pandas
+    - Test that quoted newlines and late text values are handled
+    """
+    rows = [
+        f'{i},"note {i}\nsecond, line",{i * 0.5},{"x" if i == 180 else i}'
+        for i in range(200)
+    ]
+    csv_file = tmp_path / "quoted.csv"
+    csv_file.write_text("id,note,half,mixed\n" + "\n".join(rows) + "\n")
+
+    df = parallel_csv_load(csv_file, workers=2, range_bytes=500)
+
+    pd.testing.assert_frame_equal(df, pd.read_csv(csv_file))
+    assert df["note"][3] == "note 3\nsecond, line"
+
+
+def test_parallel_csv_load_bundled_dataset():
+    """
+    - Test that the bundled dataset loads the same in parallel
+    """
+    csv_file = "data/global-air-pollution-dataset.csv"
+    pd.testing.assert_frame_equal(
+        parallel_csv_load(csv_file, workers=2, range_bytes=2**17),
+        pd.read_csv(csv_file),
+    )
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".bz2", ".xz", ".zst"])
+def test_csv_load_compressed(tmp_path, suffix):
+    """
+    - Test that compressed files are streamed into the same DataFrame
+    """
+    if suffix == ".zst":
+        pytest.importorskip("zstandard")
+    csv_file = "data/global-air-pollution-dataset.csv"
+    expected = pd.read_csv(csv_file)
+    compressed = tmp_path / f"data.csv{suffix}"
+    expected.to_csv(compressed, index=False)
+
+    pd.testing.assert_frame_equal(
+        csv_load(compressed, workers=2), expected
+    )
+
+
+def test_parallel_csv_load_stray_quote(tmp_path):
+    """
+    - Test that a quote inside an unquoted field, which throws off the
+      quote counts of the byte ranges, falls back to a serial parse
+    """
+    heights = {3: '5 ft 2"'}
+    rows = [
+        f'{i},{heights.get(i, i)} tall,"note {i}\nsecond line"'
+        for i in range(200)
+    ]
+    csv_file = tmp_path / "stray.csv"
+    csv_file.write_text("id,height,note\n" + "\n".join(rows) + "\n")
+
+    df = parallel_csv_load(csv_file, workers=2, range_bytes=500)
+
+    pd.testing.assert_frame_equal(df, pd.read_csv(csv_file))
+    assert df["height"][3] == '5 ft 2" tall'
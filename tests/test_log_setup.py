@@ -0,0 +1,68 @@
+import io
+import json
+import logging
+import pytest
+from eda_cleaner.log_setup.setup import (
+    banner,
+    setup,
+    setup_queue,
+    stop_queue,
+)
+
+
+@pytest.fixture
+def package_logger():
+    yield logging.getLogger("eda_cleaner.test_module")
+    stop_queue()
+    logging.getLogger("eda_cleaner").propagate = True
+
+
+def test_setup_queue_verbosity(package_logger):
+    """
+    - Test that records go through the queue to the stream
+    - Test that per-column (debug) records only show in verbose mode
+    - Test that loggers set up after the switch use the queue too
+    """
+    stream = io.StringIO()
+    setup_queue("normal", stream=stream)
+    setup(package_logger)
+    package_logger.debug("Changed %s to %s", "a", "Int64")
+    package_logger.info("Column types: %s", "Int64: 1")
+    banner()
+    stop_queue()
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith(" - Column types: Int64: 1")
+    assert lines[1] == "*" * 90
+
+    stream = io.StringIO()
+    setup_queue("verbose", stream=stream)
+    package_logger.debug("Changed %s to %s", "a", "Int64")
+    stop_queue()
+    assert stream.getvalue().endswith(" - Changed a to Int64\n")
+
+    stream = io.StringIO()
+    setup_queue("quiet", stream=stream)
+    package_logger.info("Column types: %s", "Int64: 1")
+    package_logger.warning("No tables")
+    stop_queue()
+    assert stream.getvalue().endswith(" - No tables\n")
+
+    with pytest.raises(ValueError):
+        setup_queue("loud")
+
+
+def test_setup_queue_json(package_logger):
+    """
+    - Test that every record is one JSON object, without banners
+    """
+    stream = io.StringIO()
+    setup_queue(json_format=True, stream=stream)
+    package_logger.info("Saved %d plots", 3)
+    banner()
+    stop_queue()
+    (line,) = stream.getvalue().splitlines()
+    record = json.loads(line)
+    assert record["message"] == "Saved 3 plots"
+    assert record["level"] == "INFO"
+    assert record["logger"] == "eda_cleaner.test_module"
@@ -0,0 +1,121 @@
+import pytest
+import pandas as pd
+import numpy as np
+from eda_cleaner.cleaner import clean_pipeline
+from eda_cleaner.pipeline import run_pipeline
+from eda_cleaner.profiler import generate_summary
+from eda_cleaner.partitioned import (
+    partitioned_clean_pipeline,
+    partitioned_generate_summary,
+)
+
+
+@pytest.fixture
+def raw_df():
+    rng = np.random.default_rng(0)
+    n = 3000
+    return pd.DataFrame(
+        {
+            "User ID": rng.integers(0, 10**6, n),
+            "Score": np.where(np.arange(n) > n - 10, 0.5, 1.0),
+            "Answer": rng.choice(["yes", "No", None], n),
+            "Visited": rng.choice(
+                ["2021-01-01", "2022-03-04", None], n
+            ),
+            "Flag": rng.integers(0, 2, n),
+            "City": rng.choice(list("abcdefghijklmnopqrstuvwxyz"), n),
+            "Created": (
+                pd.Timestamp("2020-01-01")
+                + pd.to_timedelta(rng.integers(0, 10**3, n), unit="D")
+            ).strftime("%Y-%m-%d"),
+            "Amount": [
+                f"${v:,.2f}" for v in rng.integers(0, 10**8, n) / 100
+            ],
+        }
+    )
+
+
+def test_partitioned_clean_pipeline(raw_df):
+    """
+    - Test that the partitioned backend cleans exactly like the pandas one
+    """
+    pd.testing.assert_frame_equal(
+        partitioned_clean_pipeline(raw_df.copy(), workers=3),
+        clean_pipeline(raw_df.copy()),
+    )
+
+
+def test_partitioned_generate_summary(raw_df):
+    """
+    - Test that merged partition statistics match the pandas summary
+    """
+    df = clean_pipeline(raw_df)
+    assert repr(partitioned_generate_summary(df, workers=3)) == repr(
+        generate_summary(df)
+    )
+
+
+def test_partitioned_generate_summary_top_k(raw_df):
+    """
+    - Test that bounded value counts match the pandas summary
+    - Test that merged top-value sketches bound the true frequencies
+    """
+    df = clean_pipeline(raw_df)
+    merged = partitioned_generate_summary(df, workers=3, top_k=2)
+    serial = generate_summary(df, top_k=2)
+
+    assert (
+        merged["flag"]["value_counts"] == serial["flag"]["value_counts"]
+    )
+    for col in ["user_id", "city"]:
+        true_counts = df[col].value_counts()
+        error = merged[col]["top_values_max_error"]
+        for value, count in merged[col]["top_values"].items():
+            assert count - error <= true_counts.get(value, 0) <= count
+
+
+def test_partitioned_pipeline_dataset():
+    """
+    - Test that the partitioned backend cleans and profiles the bundled
+      dataset, tiled into many partitions, exactly like the pandas one
+    """
+    df = pd.read_csv("data/global-air-pollution-dataset.csv")
+    tiled = pd.concat([df] * 8, ignore_index=True)
+    # distinct tiles, so that duplicate removal keeps most rows
+    tiled["AQI Value"] += np.arange(len(tiled)) // len(df)
+    tiled.loc[::7, "CO AQI Value"] = None
+    serial = clean_pipeline(tiled.copy(), downcast=True)
+    merged = partitioned_clean_pipeline(
+        tiled.copy(), workers=4, downcast=True
+    )
+
+    pd.testing.assert_frame_equal(merged, serial)
+    summaries = [
+        partitioned_generate_summary(merged, workers=4),
+        generate_summary(serial),
+    ]
+    # memory sizes depend on how the string objects were created and on
+    # the lookup tables pandas caches, compared by dtypes only
+    for summary in summaries:
+        dataset = summary["_dataset_"]
+        del dataset["memory_usage"]
+        dataset["memory_report"] = {
+            col: (entry["dtype_before"], entry["dtype_after"])
+            for col, entry in dataset["memory_report"].items()
+        }
+    assert repr(summaries[0]) == repr(summaries[1])
+
+
+def test_partitioned_dedup_options(raw_df, tmp_path):
+    """
+    - Test that the partitioned backend rejects out-of-core duplicate
+      removal instead of ignoring it
+    """
+    with pytest.raises(ValueError):
+        run_pipeline(
+            raw_df, tmp_path, backend="partitioned", dedup_memory="1G"
+        )
+    with pytest.raises(ValueError):
+        run_pipeline(
+            raw_df, tmp_path, backend="partitioned", dedup_workers=2
+        )
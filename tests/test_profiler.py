@@ -0,0 +1,137 @@
+import json
+import pytest
+import pandas as pd
+from eda_cleaner.profiler import generate_summary
+from eda_cleaner.visualizer import _value_counts as _plot_counts
+from eda_cleaner import strings
+from eda_cleaner.strings import format_string_profile, string_profile
+
+
+@pytest.fixture
+def clean_df():
+    return pd.DataFrame(
+        {
+            "num": pd.Series([1, 2, 3, None]).astype("Int64"),
+            "cost": pd.Series([1.25, 1.5, None, 2.0]).astype("Float64"),
+            "married": pd.Series([True, False, True, None]).astype(
+                "boolean"
+            ),
+            "city": pd.Series(["a", "b", "a", None]).astype("category"),
+            "name": pd.Series(["Al", "Bo", "Cy", None]).astype(
+                "string"
+            ),
+            "date": pd.to_datetime(
+                ["2020-01-01", None, "2021-06-30 12:00", "2020-03-01"]
+            ),
+        }
+    )
+
+
+def test_generate_summary_arrow_engine(clean_df):
+    """
+    - Test that the arrow engine produces the same summary as pandas
+    """
+    pytest.importorskip("pyarrow")
+    summaries = [
+        generate_summary(clean_df, engine=engine)
+        for engine in ("arrow", "pandas")
+    ]
+    assert repr(summaries[0]) == repr(summaries[1])
+    # the scalar types too, numpy scalars are written as strings
+    assert json.dumps(summaries[0], default=str) == json.dumps(
+        summaries[1], default=str
+    )
+
+
+def test_generate_summary_top_k(clean_df):
+    """
+    - Test that value counts are bounded to the most frequent values
+    - Test that high-cardinality strings get approximate top values
+    """
+    summary = generate_summary(clean_df, top_k=1)
+
+    assert summary["city"]["value_counts"] == {"a": 2}
+    assert summary["city"]["value_counts_other"] == 2
+    assert summary["married"]["value_counts"] == {"True": 2}
+    assert summary["married"]["value_counts_other"] == 2
+    assert list(summary["name"]["top_values"].values()) == [1]
+    assert summary["name"]["top_values_max_error"] == 0
+
+
+def test_generate_summary_missing_value_key(clean_df):
+    """
+    - Test that missing values are counted under a string key, which
+      survives JSON (e.g. a summary loaded to resume a run)
+    - Test that plots leave the missing values out of the counts
+    """
+    summary = json.loads(
+        json.dumps(generate_summary(clean_df), default=str)
+    )
+
+    assert summary["city"]["value_counts"] == {"a": 2, "b": 1, "nan": 1}
+    assert summary["married"]["value_counts"] == {
+        "True": 2,
+        "False": 1,
+        "<NA>": 1,
+    }
+    assert _plot_counts(clean_df["city"], summary).to_dict() == {
+        "a": 2,
+        "b": 1,
+    }
+    assert _plot_counts(clean_df["married"], summary).to_dict() == {
+        "True": 2,
+        "False": 1,
+    }
+
+
+def test_generate_summary_strings(clean_df, monkeypatch):
+    """
+    - Test that string and object columns get lengths, blanks and patterns
+    - Test that profiles merged over chunks keep exact pattern counts
+    - Test that they bound them when there are more patterns than counters
+    """
+    clean_df["code"] = pd.Series(["AB-12", " ", "", "Zürich 8000"])
+    clean_df.loc[3, "name"] = "x" * 30
+    summary = generate_summary(clean_df)
+
+    assert summary["code"]["missing"] == 0
+    assert summary["code"]["length_histogram"] == {
+        "0": 1,
+        "1": 1,
+        "4-7": 1,
+        "8-15": 1,
+    }
+    assert summary["code"]["empty"] == 1
+    assert summary["code"]["whitespace"] == 1
+    assert summary["code"]["top_patterns"]["AAAAAA 9999"] == 1
+    assert summary["name"]["length_max"] == 30
+    assert summary["name"]["length_mean"] == 9.0
+    assert summary["name"]["top_patterns"] == {
+        "AA": 3,
+        "AAAAAAAAAAAAAAAAAAAA…": 1,
+    }
+
+    codes = pd.Series(["AB-1", "C-22", "AB-7", "D-3", "AB-9"] * 20)
+    true_counts = codes.str.replace(r"[A-Z]", "A", regex=True)
+    true_counts = true_counts.str.replace(r"[0-9]", "9", regex=True)
+    true_counts = true_counts.value_counts()
+
+    # few distinct patterns, merged counts stay exact
+    merged = format_string_profile(
+        string_profile(codes, top_k=2, chunk_rows=7)
+    )
+    assert merged == format_string_profile(
+        string_profile(codes, top_k=2)
+    )
+    assert merged["top_patterns"] == {"AA-9": 60, "A-9": 20}
+    assert merged["top_patterns_max_error"] == 0
+    assert merged["length_mean"] == codes.str.len().mean()
+
+    monkeypatch.setattr(strings, "PATTERN_COUNTERS", 2)
+    monkeypatch.setattr(strings, "PATTERN_COUNTERS_PER_TOP", 1)
+    merged = format_string_profile(
+        string_profile(codes, top_k=2, chunk_rows=7)
+    )
+    error = merged["top_patterns_max_error"]
+    for pattern, count in merged["top_patterns"].items():
+        assert count - error <= true_counts[pattern] <= count
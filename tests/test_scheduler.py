@@ -0,0 +1,96 @@
+import time
+import pytest
+from eda_cleaner import governor
+from eda_cleaner.governor import start_governor, stop_governor
+from eda_cleaner.scheduler import Stage, run_stages, critical_path
+
+
+def _slow_add(x, y=0, delay=0.0):
+    time.sleep(delay)
+    return x + y
+
+
+def test_run_stages():
+    """
+    - Test that dependency results are passed as keyword arguments
+    - Test that process stages run and return their results
+    """
+    results = run_stages(
+        {
+            "x": Stage(_slow_add, (1,)),
+            "y": Stage(abs, (-2,), kind="process"),
+            "total": Stage(_slow_add, deps=("x", "y")),
+        }
+    )
+
+    assert results == {"x": 1, "y": 2, "total": 3}
+
+
+def test_run_stages_overlap():
+    """
+    - Test that independent stages run concurrently
+    """
+    start = time.perf_counter()
+    run_stages(
+        {
+            name: Stage(_slow_add, (0, 0, 0.2))
+            for name in ["json", "csv", "plots"]
+        }
+    )
+
+    assert time.perf_counter() - start < 0.5
+
+
+def test_run_stages_governed(monkeypatch):
+    """
+    - Test that process stages run one at a time under memory pressure
+    """
+    start_governor(1024**4, interval=0.01)
+    try:
+        monkeypatch.setattr(governor._governor, "rss", lambda: 1024**4)
+        start = time.perf_counter()
+        run_stages(
+            {
+                name: Stage(_slow_add, (0, 0, 0.2), kind="process")
+                for name in ["json", "csv", "plots"]
+            }
+        )
+    finally:
+        stop_governor()
+
+    assert time.perf_counter() - start >= 0.6
+
+
+def test_run_stages_invalid():
+    """
+    - Test that unknown dependencies and cycles are rejected
+    """
+    with pytest.raises(ValueError):
+        run_stages({"a": Stage(_slow_add, (1,), deps=("b",))})
+    with pytest.raises(ValueError):
+        run_stages(
+            {
+                "a": Stage(_slow_add, deps=("b",)),
+                "b": Stage(_slow_add, deps=("a",)),
+            }
+        )
+
+
+def test_critical_path():
+    """
+    - Test that the path follows the dependency that finished last
+    """
+    stages = {
+        "summary": Stage(_slow_add),
+        "csv": Stage(_slow_add),
+        "json": Stage(_slow_add, deps=("summary",)),
+        "plots": Stage(_slow_add, deps=("summary", "csv")),
+    }
+    timings = {
+        "summary": (0, 1),
+        "csv": (0, 2),
+        "json": (1, 1.5),
+        "plots": (2, 5),
+    }
+
+    assert critical_path(stages, timings) == ["csv", "plots"]
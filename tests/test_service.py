@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+import pandas as pd
+from eda_cleaner.service import start_service
+
+
+async def _request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    content = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(content)}\r\n\r\n".encode() + content
+    )
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+async def _wait(port, job_id, timeout=60):
+    for _ in range(timeout * 10):
+        status, job = await _request(port, "GET", f"/jobs/{job_id}")
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.1)
+    raise TimeoutError(job_id)
+
+
+def test_service_jobs(tmp_path):
+    """
+    - Test that jobs run in the background and write to their own
+      directories
+    - Test that failing jobs and invalid requests are reported
+    """
+    csv_path = tmp_path / "data.csv"
+    pd.DataFrame(
+        {
+            "Amount": [1.5, 2.0, None, 4.0] * 5,
+            "Paid": ["yes", "no", "yes", None] * 5,
+        }
+    ).to_csv(csv_path, index=False)
+
+    async def scenario():
+        service = await start_service(
+            port=0, workers=1, output_root=str(tmp_path / "jobs")
+        )
+        port = service.server.sockets[0].getsockname()[1]
+        try:
+            status, job = await _request(
+                port,
+                "POST",
+                "/jobs",
+                {"csv": str(csv_path), "plots": False, "top_k": 2},
+            )
+            assert status == 202 and job["status"] == "queued"
+            _, missing = await _request(
+                port, "POST", "/jobs", {"csv": str(tmp_path / "no.csv")}
+            )
+            done = await _wait(port, job["id"])
+            failed = await _wait(port, missing["id"])
+
+            assert (await _request(port, "POST", "/jobs", {"x": 1}))[
+                0
+            ] == 400
+            assert (await _request(port, "GET", "/jobs/unknown"))[
+                0
+            ] == 404
+            _, jobs = await _request(port, "GET", "/jobs")
+            return done, failed, jobs
+        finally:
+            await service.close()
+
+    done, failed, jobs = asyncio.run(scenario())
+
+    assert done["status"] == "done"
+    assert done["result"]["rows"] == 20
+    assert done["output_dir"] == str(tmp_path / "jobs" / done["id"])
+    assert {"summary.json", "clean_data.csv"} <= set(
+        os.listdir(done["output_dir"])
+    )
+    assert failed["status"] == "failed" and failed["error"]
+    assert [job["id"] for job in jobs] == [done["id"], failed["id"]]
@@ -0,0 +1,69 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import pytest
+import pandas as pd
+from eda_cleaner.shm import attached, shared_frame, with_frame
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "a": pd.array([1, None, 3, 4], dtype="Int64"),
+            "b": pd.array([True, False, None, True], dtype="boolean"),
+            "c": pd.Series(list("xyxz")).astype("string"),
+            "d": pd.Series(list("xyxz"), dtype="string").astype(
+                "category"
+            ),
+            "e": pd.to_datetime(
+                ["2024-01-01", None, "2024-03-01", "2024-04-01"]
+            ),
+            "f": [0.5, 1.5, 2.5, 3.5],
+        },
+        index=[3, 5, 7, 9],
+    )
+
+
+def _shape(part: pd.DataFrame, extra: int = 0) -> tuple:
+    return part.shape[0] + extra, list(part.columns)
+
+
+def test_shared_frame(df):
+    """
+    - Test that workers map the frame with its dtypes, by columns and rows
+    - Test that the shared memory is released after the block
+    """
+    with shared_frame(df) as frame:
+        assert not isinstance(frame, pd.DataFrame)
+        with attached(frame) as mapped:
+            pd.testing.assert_frame_equal(
+                mapped, df.reset_index(drop=True)
+            )
+            del mapped
+        with attached(frame, ["f", "a"], 1, 3) as mapped:
+            pd.testing.assert_frame_equal(
+                mapped, df[["f", "a"]].iloc[1:3].reset_index(drop=True)
+            )
+            del mapped
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            shape = pool.submit(with_frame, _shape, frame, 1).result()
+        assert shape == (5, list(df.columns))
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(frame.name)
+
+
+def test_shared_frame_failure(df):
+    """
+    - Test that the shared memory is released when the block fails
+    - Test that frames that cannot be shared are handed over as they are
+    """
+    with pytest.raises(RuntimeError):
+        with shared_frame(df) as frame:
+            raise RuntimeError("worker died")
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(frame.name)
+
+    numbered = df.set_axis(range(df.shape[1]), axis=1)
+    with shared_frame(numbered) as frame:
+        assert frame is numbered
+        assert with_frame(_shape, frame) == (4, list(range(6)))
@@ -0,0 +1,95 @@
+import pytest
+import numpy as np
+import pandas as pd
+from eda_cleaner.timeseries import (
+    FREQS,
+    bucket_counts,
+    bucket_datetime_series,
+    choose_freq,
+    merge_bucket_counts,
+)
+
+
+@pytest.fixture
+def dates():
+    rng = np.random.default_rng(0)
+    # spans 1969 so that buckets before the epoch are floored too
+    start = pd.Timestamp("1969-11-03").value
+    offsets = rng.integers(0, 3 * 365 * 86400, 5000) * 10**9
+    s = pd.Series(pd.to_datetime(start + offsets))
+    s[rng.integers(0, 5000, 200)] = pd.NaT
+    return s
+
+
+def _period_counts(s: pd.Series, freq: str) -> pd.Series:
+    if s.dt.tz is not None:
+        s = s.dt.tz_localize(None)
+    counts = s.dt.to_period(freq).value_counts().sort_index()
+    return pd.Series(
+        counts.to_numpy(dtype="int64"),
+        index=pd.DatetimeIndex(counts.index.start_time.to_numpy()),
+        name="count",
+    )
+
+
+@pytest.mark.parametrize("freq", FREQS)
+def test_bucket_counts(dates, freq):
+    """
+    - Test that the counts per bucket match pandas periods
+    - Test that missing values are not counted
+    - Test that timezones keep the local wall time
+    """
+    expected = _period_counts(dates, freq)
+    counts = bucket_counts(dates)
+    pd.testing.assert_series_equal(counts[freq], expected)
+    assert counts[freq].sum() == dates.notna().sum()
+
+    local = dates.dt.tz_localize(
+        "Europe/Paris", ambiguous="NaT", nonexistent="NaT"
+    )
+    pd.testing.assert_series_equal(
+        bucket_counts(local, (freq,))[freq], _period_counts(local, freq)
+    )
+
+
+def test_bucket_counts_empty():
+    """
+    - Test that columns without values have no buckets
+    """
+    counts = bucket_counts(pd.Series([pd.NaT, pd.NaT]))
+    assert list(counts) == list(FREQS)
+    assert all(len(c) == 0 for c in counts.values())
+    with pytest.raises(ValueError):
+        bucket_counts(pd.Series([pd.NaT]), ("Q",))
+
+
+def test_merge_bucket_counts(dates):
+    """
+    - Test that counts of separate partitions add up to the whole column
+    """
+    parts = [
+        dates.iloc[i : i + 1300] for i in range(0, len(dates), 1300)
+    ]
+    merged = bucket_counts(parts[0])
+    for part in parts[1:]:
+        merged = merge_bucket_counts(merged, bucket_counts(part))
+    for freq, counts in bucket_counts(dates).items():
+        pd.testing.assert_series_equal(merged[freq], counts)
+
+
+@pytest.mark.parametrize(
+    "days, freq", [(1, "H"), (7, "H"), (8, "D"), (91, "W"), (731, "M")]
+)
+def test_choose_freq(dates, days, freq):
+    """
+    - Test that longer spans get coarser buckets
+    - Test that the granularity is chosen from the values when not given
+    """
+    start = pd.Timestamp("2024-01-01")
+    assert choose_freq(start, start + pd.Timedelta(days=days)) == freq
+
+    span = dates.min() + pd.Timedelta(days=days)
+    within = dates[dates <= span]
+    pd.testing.assert_series_equal(
+        bucket_datetime_series(within), _period_counts(within, freq)
+    )